@@ -0,0 +1,66 @@
+"""
+Модуль атомарной записи файлов.
+Файл записывается во временный файл в той же папке и заменяет целевой только
+после успешной записи, поэтому читатели не видят частично записанный файл,
+а прерванная запись оставляет прежнее содержимое.
+"""
+
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+
+def target_file_mode(file_path: str) -> int:
+    """
+    Определяет права доступа, с которыми должен остаться записываемый файл.
+
+    Args:
+        file_path (str): Путь к файлу.
+
+    Returns:
+        int: Права существующего файла или права нового файла по умолчанию с учетом umask.
+    """
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+@contextmanager
+def atomic_open(file_path: str, mode: str = 'w') -> Iterator[IO]:
+    """
+    Открывает временный файл в той же папке, который после успешной записи
+    заменяет целевой файл.
+
+    Временный файл mkstemp создается с правами 0600, поэтому перед заменой ему
+    назначаются права target_file_mode. При ошибке временный файл удаляется,
+    а целевой файл остается прежним.
+
+    Args:
+        file_path (str): Путь к целевому файлу.
+        mode (str): Режим открытия временного файла: 'w' или 'wb'.
+
+    Yields:
+        IO: Открытый временный файл.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    file_descriptor, temp_file_path = tempfile.mkstemp(
+        prefix=os.path.basename(file_path) + '.',
+        suffix='.tmp',
+        dir=directory
+    )
+    try:
+        encoding = None if 'b' in mode else 'utf-8'
+        with os.fdopen(file_descriptor, mode, encoding=encoding) as output_file:
+            yield output_file
+            output_file.flush()
+            os.fsync(output_file.fileno())
+        os.chmod(temp_file_path, target_file_mode(file_path))
+        os.replace(temp_file_path, file_path)
+    except BaseException:
+        os.remove(temp_file_path)
+        raise
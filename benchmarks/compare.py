@@ -0,0 +1,68 @@
+"""
+Сравнение двух отчетов benchmarks/run.py, например до и после коммита.
+
+Запуск из корня репозитория:
+    python benchmarks/compare.py base.json new.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict
+
+
+def load_report(file_path: str) -> Dict[str, Any]:
+    """
+    Загружает отчет бенчмарков.
+
+    Args:
+        file_path (str): Путь к JSON отчету.
+
+    Returns:
+        Dict[str, Any]: Содержимое отчета.
+    """
+    with open(file_path, 'r', encoding='utf-8') as report_file:
+        return json.load(report_file)
+
+
+def main() -> None:
+    """
+    Печатает изменение медианного времени этапов и завершается с кодом 1,
+    если какой-либо этап замедлился больше порога.
+    """
+    parser = argparse.ArgumentParser(description='Сравнение отчетов бенчмарков')
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Допустимое относительное замедление этапа')
+    args = parser.parse_args()
+
+    base = load_report(args.base)
+    new = load_report(args.new)
+    print(f"base: {base.get('commit')}  new: {new.get('commit')}")
+    if base.get('params') != new.get('params'):
+        print('Внимание: параметры запусков различаются')
+
+    regressions = []
+    print(f"{'Stage':<26}{'base, s':>12}{'new, s':>12}{'change':>10}")
+    for name in sorted(set(base['stages']) | set(new['stages'])):
+        base_stage = base['stages'].get(name, {})
+        new_stage = new['stages'].get(name, {})
+        if base_stage.get('status') != 'ok' or new_stage.get('status') != 'ok':
+            print(f"{name:<26}{'-':>12}{'-':>12}{'n/a':>10}")
+            continue
+
+        base_seconds = base_stage['median_seconds']
+        new_seconds = new_stage['median_seconds']
+        change = new_seconds / base_seconds - 1.0 if base_seconds > 0 else 0.0
+        print(f"{name:<26}{base_seconds:>12.4f}{new_seconds:>12.4f}{change:>+10.1%}")
+        if change > args.threshold:
+            regressions.append(name)
+
+    if regressions:
+        print(f"Замедление больше {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""
+Генератор синтетического корпуса резюме и вакансий для бенчмарков.
+Тексты повторяют структуру data_collector/ и разметку json_data/jsons/,
+а сущности покрывают метки из TAG_WEIGHTS.
+
+Запуск из корня репозитория:
+    python benchmarks/corpus.py --output bench_corpus --resumes 1000 --vacancies 10
+"""
+
+import argparse
+import json
+import os
+import random
+from collections import defaultdict
+from typing import Any, Dict, List, NamedTuple, Set, Tuple
+
+CORE_SKILLS = [
+    'python', 'postgresql', 'docker', 'git', 'django', 'fastapi', 'flask', 'redis',
+    'rabbitmq', 'celery', 'sql', 'linux', 'kubernetes', 'asyncio', 'aiohttp',
+    'sqlalchemy', 'pandas', 'numpy', 'kafka', 'mongodb', 'nginx', 'ci/cd', 'rest api',
+    'pytest', 'graphql', 'clickhouse', 'elasticsearch', 'airflow', 'gitlab', 'ооп'
+]
+SKILLS = [
+    'разработка программный обеспечение', 'база данных', 'английский язык',
+    'системный интеграция', 'автоматизация технологический и бизнес - процессов',
+    'проектирование архитектура', 'код ревью', 'тестирование', 'анализ данные',
+    'микросервисный архитектура', 'оптимизация запрос', 'работа в команда'
+]
+NAMES = [
+    'python developer', 'программист python', 'python backend developer',
+    'python разработчик', 'middle python developer', 'senior python developer'
+]
+SPECIALITIES = ['программист', 'разработчик', 'аналитик', 'дата - сайентист']
+CITIES = ['москва', 'санкт - петербург', 'казань', 'новосибирск', 'калуга', 'алматы']
+COUNTRIES = ['россия', 'казахстан', 'беларусь', 'армения']
+RELOCATION = ['не готовый к переезд', 'готов к переезд', 'хотеть переехать']
+BUSINESS_TRIPS = ['готовый к командировкам', 'не готовый к командировкам',
+                  'готовый к редкий командировкам']
+EMPLOYMENT = ['полный занятость', 'частичный занятость', 'проектный работа', 'стажировка']
+SCHEDULE = ['полный день', 'удалённый работа', 'гибкий график', 'сменный график']
+TRAVEL_TIME = ['не иметь значение', 'не более час', 'не более полтора час']
+EDUCATION = ['высокий', 'бакалавр', 'неоконченный высокий', 'магистр', 'средний специальный']
+LANGUAGES = ['английский — b1 — средний', 'английский — b2 — средний - продвинутый',
+             'английский — c1 — продвинутый', 'английский — a2 — элементарный']
+DRIVING = ['право категория b', 'иметься собственный автомобиль', 'право категория b , c']
+COMPANIES = ['атол , группа компания', 'soft - way', 'ооо ав софт', 'яндекс', 'тинькофф']
+MONTHS = ['январь', 'февраль', 'март', 'апрель', 'май', 'июнь', 'июль', 'август',
+          'сентябрь', 'октябрь', 'ноябрь', 'декабрь']
+FILLER = [
+    'отвечать за разработка и поддержка внутренний сервис компания',
+    'участвовать в проектирование архитектура и код ревью',
+    'увеличить скорость работа api , повысить надёжность система',
+    'общаться с заказчик , участвовать в деплое и тестирование',
+    'снизить нагрузка на технический поддержка , автоматизировать сценарий',
+    'разработать бэкенд для мобильный приложение и личный кабинет'
+]
+
+
+class Document(NamedTuple):
+    """
+    Синтетический документ с разметкой.
+    """
+    text: str
+    entities: List[Dict[str, Any]]
+
+
+class _Builder:
+    """
+    Собирает текст документа и одновременно запоминает смещения сущностей.
+    """
+
+    def __init__(self) -> None:
+        self.parts: List[str] = []
+        self.length = 0
+        self.entities: List[Dict[str, Any]] = []
+
+    def text(self, value: str) -> None:
+        self.parts.append(value)
+        self.length += len(value)
+
+    def entity(self, value: str, label: str) -> None:
+        self.entities.append({
+            'start_offset': self.length,
+            'end_offset': self.length + len(value),
+            'label': label
+        })
+        self.text(value)
+
+    def build(self) -> Document:
+        return Document(''.join(self.parts), self.entities)
+
+
+def generate_resume(rng: random.Random, filler_lines: int = 20) -> Document:
+    """
+    Генерирует резюме в формате data_collector/resume.
+
+    Args:
+        rng (random.Random): Генератор случайных чисел.
+        filler_lines (int): Количество строк описания опыта работы без сущностей.
+
+    Returns:
+        Document: Текст резюме и его разметка.
+    """
+    builder = _Builder()
+    builder.entity(rng.choice(['мужчина', 'женщина']), 'Sex')
+    builder.text(' , ')
+    builder.entity(f"{rng.randint(20, 45)} год", 'Age')
+    builder.text(f" , родиться {rng.randint(1, 28)} {rng.choice(MONTHS)} {rng.randint(1978, 2003)} \n проживать : ")
+    builder.entity(rng.choice(CITIES), 'Resides')
+    builder.text(' \n гражданство : ')
+    builder.entity(rng.choice(COUNTRIES), 'Nationality')
+    builder.text(' , быть разрешение на работа : ')
+    builder.entity(rng.choice(COUNTRIES), 'WorkPermit')
+    builder.text(' \n ')
+    builder.entity(rng.choice(RELOCATION), 'Relocation')
+    builder.text(' , ')
+    builder.entity(rng.choice(BUSINESS_TRIPS), 'BusinessTrips')
+    builder.text(' \n желаемая должность и зарплата \n ')
+    builder.entity(rng.choice(NAMES), 'Name')
+    builder.text(' \n специализация : \n — ')
+    builder.entity(rng.choice(SPECIALITIES), 'Speciality')
+    builder.text(' \n занятость : ')
+    builder.entity(rng.choice(EMPLOYMENT), 'Employment')
+    builder.text(' \n график работа : ')
+    for idx, schedule in enumerate(rng.sample(SCHEDULE, rng.randint(1, 3))):
+        if idx:
+            builder.text(' , ')
+        builder.entity(schedule, 'WorkShedule')
+    builder.text(' \n желательный время в путь до работа : ')
+    builder.entity(rng.choice(TRAVEL_TIME), 'DesirableTravellingTimeToWork')
+    builder.text(' \n опыт работа — ')
+    builder.entity(f"{rng.randint(1, 15)} год {rng.randint(1, 11)} месяц", 'WorkExperience')
+    builder.text(f" \n {rng.choice(COMPANIES)} \n {rng.choice(CITIES)} \n ")
+
+    for _ in range(filler_lines):
+        builder.text(rng.choice(FILLER) + ' \n ')
+        if rng.random() < 0.3:
+            builder.text('использовать ')
+            builder.entity(rng.choice(CORE_SKILLS), 'CoreSkills')
+            builder.text(' \n ')
+
+    builder.text('образование \n ')
+    builder.entity(rng.choice(EDUCATION), 'Education')
+    builder.text(' \n знание язык \n ')
+    builder.entity('русский — родной', 'LanguageSkills')
+    builder.text(' \n ')
+    builder.entity(rng.choice(LANGUAGES), 'LanguageSkills')
+    builder.text(' \n навык \n ')
+    for idx, skill in enumerate(rng.sample(CORE_SKILLS, rng.randint(5, 15))):
+        if idx:
+            builder.text(' ')
+        builder.entity(skill, 'CoreSkills')
+    builder.text(' \n ')
+    for idx, skill in enumerate(rng.sample(SKILLS, rng.randint(1, 4))):
+        if idx:
+            builder.text(' , ')
+        builder.entity(skill, 'Skill')
+    if rng.random() < 0.5:
+        builder.text(' \n опыт вождение \n ')
+        builder.entity(rng.choice(DRIVING), 'DrivingLicence')
+    builder.text(' \n')
+    return builder.build()
+
+
+def generate_vacancy(rng: random.Random) -> Document:
+    """
+    Генерирует вакансию в формате data_collector/vacancy.txt.
+
+    Args:
+        rng (random.Random): Генератор случайных чисел.
+
+    Returns:
+        Document: Текст вакансии и его разметка.
+    """
+    builder = _Builder()
+    builder.entity(rng.choice(NAMES), 'Name')
+    builder.text(f"\nдо {rng.randint(15, 45) * 10} 000 ₽ до вычета налогов\n")
+    builder.text(f"{rng.choice(COMPANIES)}\n")
+    builder.entity(rng.choice(CITIES), 'Resides')
+    builder.text('\nТребуемый опыт работы: ')
+    builder.entity(f"{rng.randint(1, 3)}–{rng.randint(4, 6)} год", 'WorkExperience')
+    builder.text('\n')
+    builder.entity(rng.choice(EMPLOYMENT), 'Employment')
+    builder.text(', ')
+    builder.entity(rng.choice(SCHEDULE), 'WorkShedule')
+    builder.text('\nЧто нужно будет делать:\n')
+    for line in rng.sample(FILLER, 3):
+        builder.text(f"• {line}\n")
+    builder.text('Необходимые навыки:\n• Опыт работы с ')
+    for idx, skill in enumerate(rng.sample(CORE_SKILLS, rng.randint(3, 8))):
+        if idx:
+            builder.text(', ')
+        builder.entity(skill, 'CoreSkills')
+    builder.text('\n• ')
+    builder.entity(rng.choice(SKILLS), 'Skill')
+    builder.text('\n• ')
+    builder.entity(rng.choice(LANGUAGES), 'LanguageSkills')
+    builder.text('\nОбразование: ')
+    builder.entity(rng.choice(EDUCATION), 'Education')
+    builder.text('\n')
+    return builder.build()
+
+
+def gold_entities(document: Document) -> Dict[str, Set[str]]:
+    """
+    Возвращает сущности документа по разметке в формате get_entity_text.
+
+    Args:
+        document (Document): Документ с разметкой.
+
+    Returns:
+        Dict[str, Set[str]]: Словарь с метками и множествами сущностей.
+    """
+    entity_text = defaultdict(set)
+    for entity in document.entities:
+        entity_text[entity['label']].add(
+            document.text[entity['start_offset']:entity['end_offset']].lower()
+        )
+    return entity_text
+
+
+def generate_corpus(
+    n_resumes: int,
+    n_vacancies: int,
+    seed: int = 0,
+    filler_lines: int = 20
+) -> Tuple[List[Document], List[Document]]:
+    """
+    Генерирует воспроизводимый корпус резюме и вакансий.
+
+    Args:
+        n_resumes (int): Количество резюме.
+        n_vacancies (int): Количество вакансий.
+        seed (int): Зерно генератора случайных чисел.
+        filler_lines (int): Количество строк описания опыта в каждом резюме.
+
+    Returns:
+        Tuple[List[Document], List[Document]]: Резюме и вакансии.
+    """
+    rng = random.Random(seed)
+    resumes = [generate_resume(rng, filler_lines) for _ in range(n_resumes)]
+    vacancies = [generate_vacancy(rng) for _ in range(n_vacancies)]
+    return resumes, vacancies
+
+
+def write_corpus(
+    output_dir: str,
+    resumes: List[Document],
+    vacancies: List[Document]
+) -> None:
+    """
+    Сохраняет корпус в структуре data_collector/ и разметку в JSONL.
+
+    Args:
+        output_dir (str): Папка корпуса.
+        resumes (List[Document]): Резюме.
+        vacancies (List[Document]): Вакансии.
+    """
+    for folder, prefix, documents in (('resume', 'resume', resumes),
+                                      ('vacancy', 'vacancy', vacancies)):
+        os.makedirs(os.path.join(output_dir, folder), exist_ok=True)
+        for idx, document in enumerate(documents):
+            file_path = os.path.join(output_dir, folder, f'{prefix}{idx + 1}.txt')
+            with open(file_path, 'w', encoding='utf-8') as output_file:
+                output_file.write(document.text)
+
+    with open(os.path.join(output_dir, 'annotations.jsonl'), 'w', encoding='utf-8') as output_file:
+        for idx, document in enumerate(resumes):
+            output_file.write(json.dumps({
+                'id': idx + 1,
+                'text': document.text,
+                'entities': document.entities
+            }, ensure_ascii=False) + '\n')
+
+
+def main() -> None:
+    """
+    Генерирует корпус и сохраняет его на диск.
+    """
+    parser = argparse.ArgumentParser(description='Генерация синтетического корпуса')
+    parser.add_argument('--output', default='bench_corpus')
+    parser.add_argument('--resumes', type=int, default=1000)
+    parser.add_argument('--vacancies', type=int, default=10)
+    parser.add_argument('--filler-lines', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    resumes, vacancies = generate_corpus(args.resumes, args.vacancies, args.seed, args.filler_lines)
+    write_corpus(args.output, resumes, vacancies)
+    print(f"Корпус сохранен в {args.output}: {len(resumes)} резюме, {len(vacancies)} вакансий")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Сравнение полной модели SpaCy и конвейера только с компонентами NER.
+Измеряет время загрузки, пиковую память и скорость обработки резюме,
+а также проверяет, что оба варианта находят одинаковые сущности.
+
+Запуск из корня репозитория:
+    python benchmarks/model_load.py --model nlp_model --resumes data_collector/resume
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spacy
+
+from similarity import BATCH_SIZE, get_entity_text, load_ner_model, read_text
+
+
+def measure(mode: str, model_path: str, texts: List[str], repeat: int) -> Dict[str, Any]:
+    """
+    Загружает модель в текущем процессе и измеряет ее характеристики.
+
+    Args:
+        mode (str): 'full' для полной модели или 'ner' для конвейера NER.
+        model_path (str): Путь к директории модели.
+        texts (List[str]): Тексты для обработки.
+        repeat (int): Сколько раз обработать тексты.
+
+    Returns:
+        Dict[str, Any]: Результаты измерений и найденные сущности.
+    """
+    start = time.perf_counter()
+    nlp = spacy.load(model_path) if mode == 'full' else load_ner_model(model_path)
+    load_seconds = time.perf_counter() - start
+    load_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    entities = []
+    n_words = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        entities = []
+        for doc in nlp.pipe(texts, batch_size=BATCH_SIZE):
+            n_words += len(doc)
+            entities.append({
+                label: sorted(values) for label, values in get_entity_text(doc).items()
+            })
+    pipe_seconds = time.perf_counter() - start
+
+    return {
+        'mode': mode,
+        'pipeline': list(nlp.pipe_names),
+        'load_seconds': load_seconds,
+        'load_rss_mb': load_rss_mb,
+        'docs_per_second': len(texts) * repeat / pipe_seconds,
+        'words_per_second': n_words / pipe_seconds,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'entities': entities
+    }
+
+
+def main() -> None:
+    """
+    Запускает измерения каждого варианта модели в отдельном процессе.
+    """
+    parser = argparse.ArgumentParser(description='Сравнение полной модели и конвейера NER')
+    parser.add_argument('--model', default='nlp_model')
+    parser.add_argument('--resumes', default='data_collector/resume')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None, help='JSON файл с результатами')
+    args = parser.parse_args()
+
+    texts = [
+        read_text(os.path.join(args.resumes, file_name))
+        for file_name in sorted(os.listdir(args.resumes))
+        if file_name.endswith('.txt')
+    ]
+
+    results = []
+    for mode in ('full', 'ner'):
+        # Каждый вариант загружается в новом процессе, чтобы память и время
+        # загрузки не зависели от предыдущего измерения
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            results.append(executor.submit(measure, mode, args.model, texts, args.repeat).result())
+
+    full, ner = results
+    same_entities = full.pop('entities') == ner.pop('entities')
+
+    print(f"{'':<20}{'full':>14}{'ner':>14}")
+    for key in ('load_seconds', 'load_rss_mb', 'peak_rss_mb', 'docs_per_second', 'words_per_second'):
+        print(f"{key:<20}{full[key]:>14.2f}{ner[key]:>14.2f}")
+    print(f"Компоненты full: {', '.join(full['pipeline'])}")
+    print(f"Компоненты ner: {', '.join(ner['pipeline'])}")
+    print(f"Сущности совпадают: {'да' if same_entities else 'нет'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(
+                {'full': full, 'ner': ner, 'same_entities': same_entities},
+                output_file,
+                ensure_ascii=False,
+                indent=2
+            )
+
+
+if __name__ == '__main__':
+    main()
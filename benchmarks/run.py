@@ -0,0 +1,299 @@
+"""
+Набор бенчмарков основных этапов SMART.HR на синтетическом корпусе.
+Измеряет загрузку модели, извлечение сущностей, расчет сходства, полный
+расчет calculate_avg_cosine_similarity, этапы очистки json_data и одну эпоху
+обучения. Результаты сохраняются в JSON отчет, который можно сравнить с
+отчетом другого коммита через benchmarks/compare.py.
+
+Запуск из корня репозитория:
+    python benchmarks/run.py --model nlp_model --resumes 500 --output benchmark.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'json_data'))
+
+import numpy as np
+import pandas as pd
+import sklearn
+import spacy
+
+import similarity
+from corpus import generate_corpus, gold_entities, write_corpus
+from overlaping_fix import process_records
+from overlaping_сheck import check_overlapping_records
+from pipeline import iter_jsonl, run_pipeline
+from space_controller import process_spaces_records
+from spacy_train import make_examples, setup_ner_pipe, train_model
+
+# Версия формата отчета; меняется при несовместимых изменениях структуры
+REPORT_VERSION = 1
+
+
+def git_revision() -> Dict[str, Any]:
+    """
+    Возвращает текущий коммит репозитория и признак незакоммиченных изменений.
+
+    Returns:
+        Dict[str, Any]: Хэш коммита и признак изменений, либо None вне git.
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+    return {'commit': commit, 'dirty': bool(status)}
+
+
+def time_stage(
+    func: Callable[[], Any],
+    items: int,
+    repeat: int,
+    warmup: int = 0
+) -> Dict[str, Any]:
+    """
+    Измеряет время выполнения этапа.
+
+    Args:
+        func (Callable[[], Any]): Измеряемая функция без аргументов.
+        items (int): Количество элементов, обрабатываемых за один запуск.
+        repeat (int): Количество измеряемых запусков.
+        warmup (int): Количество предварительных запусков без измерения.
+
+    Returns:
+        Dict[str, Any]: Время каждого запуска, минимум, медиана и пропускная способность.
+    """
+    for _ in range(warmup):
+        func()
+
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+
+    median = statistics.median(seconds)
+    return {
+        'status': 'ok',
+        'items': items,
+        'seconds': seconds,
+        'min_seconds': min(seconds),
+        'median_seconds': median,
+        'items_per_second': items / median if median > 0 else None
+    }
+
+
+def skipped(reason: str) -> Dict[str, Any]:
+    """
+    Формирует запись о пропущенном этапе.
+
+    Args:
+        reason (str): Причина пропуска.
+
+    Returns:
+        Dict[str, Any]: Запись этапа для отчета.
+    """
+    return {'status': 'skipped', 'reason': reason}
+
+
+def run_benchmarks(args: argparse.Namespace, corpus_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Генерирует корпус и измеряет все этапы.
+
+    Args:
+        args (argparse.Namespace): Параметры запуска.
+        corpus_dir (str): Папка для синтетического корпуса.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Результаты измерений по этапам.
+    """
+    resumes, vacancies = generate_corpus(
+        args.resumes, args.vacancies, args.seed, args.filler_lines
+    )
+    write_corpus(corpus_dir, resumes, vacancies)
+    resume_paths = [
+        os.path.join(corpus_dir, 'resume', f'resume{idx + 1}.txt') for idx in range(len(resumes))
+    ]
+    vacancy_paths = [
+        os.path.join(corpus_dir, 'vacancy', f'vacancy{idx + 1}.txt') for idx in range(len(vacancies))
+    ]
+    annotations_path = os.path.join(corpus_dir, 'annotations.jsonl')
+    resume_texts = [resume.text for resume in resumes]
+    stages: Dict[str, Dict[str, Any]] = {}
+
+    # Сходство считается по эталонной разметке, поэтому не зависит от модели
+    resume_gold = [gold_entities(resume) for resume in resumes]
+    vacancy_gold = [gold_entities(vacancy) for vacancy in vacancies]
+    stages['cosine_similarity'] = time_stage(
+        lambda: [
+            similarity.calculate_cosine_similarity(vacancy_entities, resume_entities)
+            for vacancy_entities in vacancy_gold
+            for resume_entities in resume_gold
+        ],
+        items=len(vacancy_gold) * len(resume_gold),
+        repeat=args.repeat
+    )
+
+    records = list(iter_jsonl(annotations_path))
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for name, stage in (('json_space_controller', process_spaces_records),
+                            ('json_overlapping_check', check_overlapping_records),
+                            ('json_overlapping_fix', process_records)):
+            stages[name] = time_stage(
+                lambda stage=stage: sum(1 for _ in stage(iter(records))),
+                items=len(records),
+                repeat=args.repeat
+            )
+
+        cleaned_path = os.path.join(corpus_dir, 'cleaned.jsonl')
+        stages['json_pipeline'] = time_stage(
+            lambda: run_pipeline(
+                annotations_path,
+                (process_spaces_records, check_overlapping_records, process_records),
+                cleaned_path
+            ),
+            items=len(records),
+            repeat=args.repeat
+        )
+
+    if os.path.isdir(args.model):
+        similarity.MODEL_PATH = args.model
+        stages['model_load'] = time_stage(
+            lambda: similarity.load_ner_model(args.model),
+            items=1,
+            repeat=args.repeat
+        )
+
+        nlp = similarity.get_nlp()
+        stages['entity_extraction'] = time_stage(
+            lambda: [
+                similarity.get_entity_text(doc)
+                for doc in nlp.pipe(resume_texts, batch_size=args.batch_size)
+            ],
+            items=len(resume_texts),
+            repeat=args.repeat,
+            warmup=1
+        )
+        stages['end_to_end'] = time_stage(
+            lambda: similarity.calculate_avg_cosine_similarity(
+                vacancy_paths[0], resume_paths,
+                batch_size=args.batch_size,
+                n_process=args.n_process,
+                use_cache=False
+            ),
+            items=len(resume_paths),
+            repeat=args.repeat
+        )
+    else:
+        reason = f'модель не найдена: {args.model}'
+        for name in ('model_load', 'entity_extraction', 'end_to_end'):
+            stages[name] = skipped(reason)
+
+    nlp = spacy.blank(args.train_lang)
+    train_data = records[:max(1, len(records) * 4 // 5)]
+    validate_data = records[len(train_data):] or train_data
+    train_examples = make_examples(nlp, train_data)
+    validate_examples = make_examples(nlp, validate_data)
+    setup_ner_pipe(nlp, records)
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        stages['training_epoch'] = time_stage(
+            lambda: train_model(nlp, train_examples, validate_examples, n_iterations=1),
+            items=len(train_examples),
+            repeat=1
+        )
+
+    return stages
+
+
+def print_report(stages: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Печатает таблицу результатов.
+
+    Args:
+        stages (Dict[str, Dict[str, Any]]): Результаты измерений по этапам.
+    """
+    print(f"{'Stage':<26}{'items':>8}{'median, s':>12}{'min, s':>12}{'items/s':>14}")
+    for name, result in stages.items():
+        if result['status'] != 'ok':
+            print(f"{name:<26}  skipped: {result['reason']}")
+            continue
+        print(
+            f"{name:<26}{result['items']:>8}{result['median_seconds']:>12.4f}"
+            f"{result['min_seconds']:>12.4f}{result['items_per_second'] or 0.0:>14.1f}"
+        )
+
+
+def main() -> None:
+    """
+    Запускает бенчмарки и сохраняет отчет.
+    """
+    parser = argparse.ArgumentParser(description='Бенчмарки SMART.HR')
+    parser.add_argument('--model', default='nlp_model')
+    parser.add_argument('--resumes', type=int, default=200)
+    parser.add_argument('--vacancies', type=int, default=5)
+    parser.add_argument('--filler-lines', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=similarity.BATCH_SIZE)
+    parser.add_argument('--n-process', type=int, default=None)
+    parser.add_argument('--train-lang', default='ru')
+    parser.add_argument('--corpus', default=None,
+                        help='Папка для корпуса; по умолчанию временная папка')
+    parser.add_argument('--output', default='benchmark.json', help='JSON файл отчета')
+    args = parser.parse_args()
+
+    corpus_dir = args.corpus or tempfile.mkdtemp(prefix='smarthr-bench-')
+    try:
+        stages = run_benchmarks(args, corpus_dir)
+    finally:
+        if args.corpus is None:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    print_report(stages)
+
+    params = vars(args).copy()
+    params.pop('output')
+    params.pop('corpus')
+    report = {
+        'version': REPORT_VERSION,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        **git_revision(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'spacy': spacy.__version__,
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'scikit-learn': sklearn.__version__
+        },
+        'params': params,
+        'stages': stages
+    }
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, ensure_ascii=False, indent=2)
+    print(f"Отчет сохранен в {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Сравнение словаря навыков (PhraseMatcher) с моделью NER.
+Измеряет скорость обоих способов и согласие по меткам CoreSkills и Skill:
+словаря с моделью, а также словаря, модели и их объединения с разметкой.
+
+Словарь строится по тренировочной части разметки (разбиение как в
+spacy_train.split_name), а сравнение выполняется на остальных записях.
+
+Запуск из корня репозитория:
+    python benchmarks/skill_matcher.py --model nlp_model --data json_data/jsons/all_pythons.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence, Set
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from similarity import BATCH_SIZE, get_entity_text, load_ner_model
+from skill_gazetteer import SKILL_LABELS, SkillMatcher, build_gazetteer, merge_entities
+from spacy_train import split_name
+
+
+def agreement(
+    predicted: Sequence[Dict[str, Set[str]]],
+    reference: Sequence[Dict[str, Set[str]]],
+    labels: Sequence[str] = SKILL_LABELS
+) -> Dict[str, Dict[str, float]]:
+    """
+    Считает совпадение множеств сущностей двух источников по каждой метке.
+
+    Args:
+        predicted (Sequence[Dict[str, Set[str]]]): Сущности проверяемого источника.
+        reference (Sequence[Dict[str, Set[str]]]): Сущности эталонного источника.
+        labels (Sequence[str]): Метки для сравнения.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Точность, полнота и F1 по меткам и в целом ('ALL').
+    """
+    counts = defaultdict(lambda: [0, 0, 0])
+    for predicted_entities, reference_entities in zip(predicted, reference):
+        for label in labels:
+            predicted_values = predicted_entities.get(label, set())
+            reference_values = reference_entities.get(label, set())
+            for key in (label, 'ALL'):
+                counts[key][0] += len(predicted_values & reference_values)
+                counts[key][1] += len(predicted_values)
+                counts[key][2] += len(reference_values)
+
+    result = {}
+    for key, (overlap, n_predicted, n_reference) in counts.items():
+        precision = overlap / n_predicted if n_predicted else 0.0
+        recall = overlap / n_reference if n_reference else 0.0
+        f_score = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        result[key] = {'p': precision, 'r': recall, 'f': f_score}
+    return result
+
+
+def throughput(texts: List[str], n_words: int, seconds: float) -> Dict[str, float]:
+    """
+    Формирует показатели скорости обработки.
+
+    Args:
+        texts (List[str]): Обработанные тексты.
+        n_words (int): Количество токенов в текстах.
+        seconds (float): Время обработки.
+
+    Returns:
+        Dict[str, float]: Время, документов и токенов в секунду.
+    """
+    return {
+        'seconds': seconds,
+        'docs_per_second': len(texts) / seconds,
+        'words_per_second': n_words / seconds
+    }
+
+
+def print_agreement(title: str, scores: Dict[str, Dict[str, float]]) -> None:
+    """
+    Печатает таблицу согласия.
+
+    Args:
+        title (str): Заголовок таблицы.
+        scores (Dict[str, Dict[str, float]]): Результат agreement.
+    """
+    print(title)
+    print(f"{'Label':<16}{'P':>8}{'R':>8}{'F1':>8}")
+    for label in (*SKILL_LABELS, 'ALL'):
+        if label in scores:
+            label_scores = scores[label]
+            print(
+                f"{label:<16}{label_scores['p'] * 100:>8.2f}"
+                f"{label_scores['r'] * 100:>8.2f}{label_scores['f'] * 100:>8.2f}"
+            )
+
+
+def main() -> None:
+    """
+    Строит словарь, измеряет скорость и согласие и сохраняет отчет.
+    """
+    parser = argparse.ArgumentParser(description='Сравнение словаря навыков и модели NER')
+    parser.add_argument('--data', default='json_data/jsons/all_pythons.jsonl')
+    parser.add_argument('--model', default='nlp_model')
+    parser.add_argument('--min-count', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='JSON файл отчета')
+    args = parser.parse_args()
+
+    gazetteer = build_gazetteer(
+        args.data,
+        min_count=args.min_count,
+        include=lambda text: split_name(text, args.seed) == 'train'
+    )
+    records = []
+    with open(args.data, 'r', encoding='utf-8') as data_file:
+        for line in data_file:
+            if line.strip():
+                item = json.loads(line)
+                if split_name(item['text'], args.seed) != 'train':
+                    records.append(item)
+    texts = [item['text'] for item in records]
+    gold = []
+    for item in records:
+        entity_text = defaultdict(set)
+        for entity in item['entities']:
+            entity_text[entity['label']].add(
+                item['text'][entity['start_offset']:entity['end_offset']].lower()
+            )
+        gold.append(entity_text)
+
+    start = time.perf_counter()
+    matcher = SkillMatcher(gazetteer)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    docs = list(matcher.nlp.tokenizer.pipe(texts))
+    rules = [matcher.entities(doc) for doc in docs]
+    report: Dict[str, Any] = {
+        'gazetteer_size': len(gazetteer),
+        'documents': len(texts),
+        'matcher_build_seconds': build_seconds,
+        'rules': throughput(texts, sum(len(doc) for doc in docs), time.perf_counter() - start),
+        'agreement': {'rules_vs_gold': agreement(rules, gold)}
+    }
+
+    if os.path.isdir(args.model):
+        nlp = load_ner_model(args.model)
+        start = time.perf_counter()
+        ner_docs = list(nlp.pipe(texts, batch_size=BATCH_SIZE))
+        ner = [get_entity_text(doc) for doc in ner_docs]
+        report['ner'] = throughput(texts, sum(len(doc) for doc in ner_docs), time.perf_counter() - start)
+        report['agreement']['rules_vs_ner'] = agreement(rules, ner)
+        report['agreement']['ner_vs_gold'] = agreement(ner, gold)
+        report['agreement']['both_vs_gold'] = agreement(
+            [merge_entities(entities, skills) for entities, skills in zip(ner, rules)],
+            gold
+        )
+    else:
+        print(f"Модель не найдена: {args.model}; сравнение с NER пропущено")
+
+    print(f"Словарь: {len(gazetteer)} фраз, документов для сравнения: {len(texts)}")
+    for name in ('rules', 'ner'):
+        if name in report:
+            print(
+                f"{name:<6} {report[name]['docs_per_second']:>10.1f} docs/s "
+                f"{report[name]['words_per_second']:>12.0f} words/s"
+            )
+    for title, scores in report['agreement'].items():
+        print_agreement(title, scores)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
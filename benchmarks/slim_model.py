@@ -0,0 +1,138 @@
+"""
+Сравнение полной модели SpaCy и облегченной модели из spacy_train.export_slim_model.
+Для полной модели, полной модели с конвейером только NER (как ее загружает
+similarity.load_ner_model) и облегченной модели измеряет размер на диске,
+время загрузки, память процесса, скорость обработки резюме и F1 сущностей
+на тестовом наборе корпуса DocBin.
+
+Запуск из корня репозитория:
+    python benchmarks/slim_model.py --model nlp_model --slim nlp_model_slim --corpus corpus/test
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spacy
+
+from similarity import BATCH_SIZE, get_entity_text, load_ner_model, read_text
+from spacy_train import DocBinCorpus, evaluate_model
+
+
+def directory_size_mb(path: str) -> float:
+    """
+    Считает размер файлов директории.
+
+    Args:
+        path (str): Путь к директории.
+
+    Returns:
+        float: Размер в мегабайтах.
+    """
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    ) / 1024 / 1024
+
+
+def measure(mode: str, model_path: str, texts: List[str], corpus_path: Optional[str]) -> Dict[str, Any]:
+    """
+    Загружает модель в текущем процессе и измеряет ее характеристики.
+
+    Args:
+        mode (str): 'full' - вся модель, 'ner' - только конвейер NER, 'slim' - облегченная модель.
+        model_path (str): Путь к директории модели.
+        texts (List[str]): Тексты резюме для обработки.
+        corpus_path (Optional[str]): Корпус DocBin для оценки F1; None - не оценивать.
+
+    Returns:
+        Dict[str, Any]: Результаты измерений и найденные сущности.
+    """
+    rss_before_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    start = time.perf_counter()
+    nlp = load_ner_model(model_path) if mode == 'ner' else spacy.load(model_path)
+    load_seconds = time.perf_counter() - start
+    load_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    start = time.perf_counter()
+    entities = [
+        {label: sorted(values) for label, values in get_entity_text(doc).items()}
+        for doc in nlp.pipe(texts, batch_size=BATCH_SIZE)
+    ]
+    pipe_seconds = time.perf_counter() - start
+
+    scores = evaluate_model(nlp, DocBinCorpus(corpus_path)(nlp)) if corpus_path else {}
+    return {
+        'mode': mode,
+        'pipeline': list(nlp.pipe_names),
+        'vectors': list(nlp.vocab.vectors.shape),
+        'disk_mb': directory_size_mb(model_path),
+        'load_seconds': load_seconds,
+        'model_rss_mb': load_rss_mb - rss_before_mb,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'docs_per_second': len(texts) / pipe_seconds,
+        'ents_f': scores.get('ents_f'),
+        'entities': entities
+    }
+
+
+def main() -> None:
+    """
+    Запускает измерения каждого варианта модели в отдельном процессе и выводит отчет.
+    """
+    parser = argparse.ArgumentParser(description='Сравнение полной и облегченной модели')
+    parser.add_argument('--model', default='nlp_model')
+    parser.add_argument('--slim', default='nlp_model_slim')
+    parser.add_argument('--resumes', default='data_collector/resume')
+    parser.add_argument('--corpus', default='corpus/test', help='Корпус DocBin для оценки F1')
+    parser.add_argument('--output', default=None, help='JSON файл отчета')
+    args = parser.parse_args()
+
+    texts = [
+        read_text(os.path.join(args.resumes, file_name))
+        for file_name in sorted(os.listdir(args.resumes))
+        if file_name.endswith('.txt')
+    ]
+    corpus_path = args.corpus if os.path.exists(args.corpus) else None
+    if corpus_path is None:
+        print(f"Корпус не найден: {args.corpus}; F1 не оценивается")
+
+    results = []
+    for mode, model_path in (('full', args.model), ('ner', args.model), ('slim', args.slim)):
+        # Каждый вариант загружается в новом процессе, чтобы память и время
+        # загрузки не зависели от предыдущего измерения
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            results.append(executor.submit(measure, mode, model_path, texts, corpus_path).result())
+
+    full_entities = results[0]['entities']
+    for result in results:
+        result['same_entities'] = result.pop('entities') == full_entities
+
+    print(f"{'':<18}" + ''.join(f"{result['mode']:>12}" for result in results))
+    for key in ('disk_mb', 'load_seconds', 'model_rss_mb', 'peak_rss_mb', 'docs_per_second', 'ents_f'):
+        values = [result[key] for result in results]
+        print(f"{key:<18}" + ''.join(
+            f"{value:>12.3f}" if value is not None else f"{'-':>12}" for value in values
+        ))
+    for result in results:
+        print(
+            f"{result['mode']}: {', '.join(result['pipeline'])}; векторы {result['vectors']}; "
+            f"сущности как у full: {'да' if result['same_entities'] else 'нет'}"
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
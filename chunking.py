@@ -0,0 +1,165 @@
+"""
+Модуль разбиения длинных документов на фрагменты для модели SpaCy.
+Текст делится по абзацам, а слишком длинные абзацы - по строкам,
+предложениям и пробелам, так что каждый фрагмент не длиннее заданного
+размера. Фрагменты всех документов обрабатываются одним потоком nlp.pipe,
+поэтому память на документ ограничена, а длинные документы пакетируются
+вместе с короткими.
+"""
+
+import re
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import spacy
+from spacy.tokens import Doc
+
+# Максимальная длина фрагмента в символах. Обычные резюме и вакансии
+# короче и обрабатываются одним фрагментом, как и без разбиения
+MAX_CHUNK_CHARS = 20000
+
+# Границы разбиения в порядке предпочтения: абзацы, строки, предложения, пробелы.
+# Разделитель остается в конце предыдущего фрагмента
+SPLIT_PATTERNS = (
+    re.compile(r'\n[^\S\n]*\n\s*'),
+    re.compile(r'\n'),
+    re.compile(r'(?<=[.!?;])\s+'),
+    re.compile(r'\s+')
+)
+
+
+def _split_range(
+    text: str,
+    start: int,
+    end: int,
+    max_chars: int,
+    level: int = 0
+) -> Iterator[Tuple[int, int]]:
+    """
+    Разбивает участок текста на смежные фрагменты не длиннее max_chars.
+
+    Соседние части, выделенные границами уровня level, объединяются,
+    пока фрагмент не превысит max_chars; слишком длинная часть делится
+    границами следующего уровня, а после последнего уровня - по max_chars.
+
+    Args:
+        text (str): Текст документа.
+        start (int): Начало участка.
+        end (int): Конец участка.
+        max_chars (int): Максимальная длина фрагмента.
+        level (int): Номер уровня границ в SPLIT_PATTERNS.
+
+    Yields:
+        Tuple[int, int]: Начало и конец очередного фрагмента.
+    """
+    if end - start <= max_chars:
+        yield start, end
+        return
+    if level == len(SPLIT_PATTERNS):
+        for offset in range(start, end, max_chars):
+            yield offset, min(offset + max_chars, end)
+        return
+
+    cuts = [match.end() for match in SPLIT_PATTERNS[level].finditer(text, start, end)]
+    pieces = zip([start, *cuts], [*cuts, end])
+
+    chunk_start = chunk_end = start
+    for piece_start, piece_end in pieces:
+        if piece_end == piece_start:
+            continue
+        if piece_end - chunk_start <= max_chars:
+            chunk_end = piece_end
+            continue
+        if chunk_end > chunk_start:
+            yield chunk_start, chunk_end
+        if piece_end - piece_start > max_chars:
+            yield from _split_range(text, piece_start, piece_end, max_chars, level + 1)
+            chunk_start = chunk_end = piece_end
+        else:
+            chunk_start, chunk_end = piece_start, piece_end
+    if chunk_end > chunk_start:
+        yield chunk_start, chunk_end
+
+
+def split_text(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[Tuple[int, str]]:
+    """
+    Разбивает текст на смежные фрагменты не длиннее max_chars.
+
+    Фрагменты покрывают текст без пропусков и пересечений, поэтому их
+    последовательное объединение дает исходный текст.
+
+    Args:
+        text (str): Текст документа.
+        max_chars (int): Максимальная длина фрагмента.
+
+    Returns:
+        List[Tuple[int, str]]: Смещение фрагмента в тексте и сам фрагмент;
+            для пустого текста - один пустой фрагмент.
+
+    Raises:
+        ValueError: Если max_chars не положительно.
+    """
+    if max_chars <= 0:
+        raise ValueError(f"Длина фрагмента должна быть положительной: {max_chars}")
+    if not text:
+        return [(0, text)]
+    return [(start, text[start:end]) for start, end in _split_range(text, 0, len(text), max_chars)]
+
+
+def pipe_chunks(
+    nlp: spacy.Language,
+    texts: Iterable[str],
+    max_chars: int = MAX_CHUNK_CHARS,
+    batch_size: int = 64,
+    n_process: Optional[int] = 1
+) -> Iterator[List[Doc]]:
+    """
+    Потоково обрабатывает тексты фрагментами через nlp.pipe.
+
+    Фрагменты разных текстов попадают в общие пакеты; тексты читаются
+    по мере обработки, а документы фрагментов текста возвращаются, как
+    только обработан его последний фрагмент.
+
+    Args:
+        nlp (spacy.Language): Модель SpaCy.
+        texts (Iterable[str]): Тексты документов.
+        max_chars (int): Максимальная длина фрагмента.
+        batch_size (int): Размер пакета фрагментов для nlp.pipe.
+        n_process (Optional[int]): Количество процессов для nlp.pipe.
+
+    Yields:
+        List[Doc]: Документы фрагментов очередного текста по порядку.
+    """
+    chunks = (
+        (chunk, idx)
+        for idx, text in enumerate(texts)
+        for _, chunk in split_text(text, max_chars)
+    )
+    docs = nlp.pipe(chunks, as_tuples=True, batch_size=batch_size, n_process=n_process or 1)
+
+    current_idx = 0
+    current: List[Doc] = []
+    for doc, idx in docs:
+        if idx != current_idx:
+            yield current
+            current_idx, current = idx, []
+        current.append(doc)
+    if current:
+        yield current
+
+
+def merge_chunk_docs(docs: Sequence[Doc]) -> Doc:
+    """
+    Собирает документ текста из документов его фрагментов.
+
+    Фрагменты смежные, поэтому текст собранного документа совпадает
+    с исходным, а смещения сущностей - с их положением в исходном тексте.
+
+    Args:
+        docs (Sequence[Doc]): Документы фрагментов по порядку.
+
+    Returns:
+        Doc: Документ всего текста.
+    """
+    if len(docs) == 1:
+        return docs[0]
+    return Doc.from_docs(list(docs), ensure_whitespace=False)
@@ -0,0 +1,281 @@
+"""
+Модуль поиска дубликатов резюме перед оценкой.
+Точные дубликаты определяются по хэшу содержимого, почти дубликаты (по
+желанию) - по оценке сходства Жаккара множеств словесных шинглов через
+MinHash и LSH. Каждая группа обрабатывается моделью один раз, а результат
+ее первого файла переносится на остальные.
+"""
+
+import json
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from entity_cache import text_hash
+
+# Путь к отчету о дубликатах по умолчанию
+DUPLICATES_PATH = 'duplicates.json'
+
+# Минимальное оценочное сходство Жаккара, при котором резюме считаются почти дубликатами
+NEAR_DUPLICATE_THRESHOLD = 0.9
+
+# Параметры MinHash: количество хэш-функций, количество полос LSH
+# (по NUM_PERM // LSH_BANDS строк) и длина шингла в словах
+NUM_PERM = 128
+LSH_BANDS = 16
+SHINGLE_SIZE = 3
+
+# Простое число Мерсенна и маска 32-битных значений для хэш-функций MinHash
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Слова текста для шинглов
+WORD_PATTERN = re.compile(r'\w+')
+
+
+class DuplicateMatch(NamedTuple):
+    """
+    Файл, результат которого берется у другого файла.
+    """
+    representative: str
+    kind: str
+    similarity: float
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """
+    Строит множество словесных шинглов текста без учета регистра.
+
+    Args:
+        text (str): Текст документа.
+        size (int): Количество слов в шингле.
+
+    Returns:
+        Set[str]: Шинглы; для текста короче size слов - один шингл из всех слов.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {' '.join(words)}
+    return {' '.join(words[idx:idx + size]) for idx in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """
+    Вычисляет подписи MinHash из num_perm значений для текстов.
+
+    Хэш-функции задаются зерном seed, поэтому подписи воспроизводимы между запусками.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE, seed: int = 1) -> None:
+        generator = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = generator.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Вычисляет подпись MinHash текста.
+
+        Args:
+            text (str): Текст документа.
+
+        Returns:
+            np.ndarray: Подпись размера num_perm.
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(text, self.shingle_size)),
+            dtype=np.uint64
+        )
+        permuted = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+
+def estimate_jaccard(first: np.ndarray, second: np.ndarray) -> float:
+    """
+    Оценивает сходство Жаккара двух текстов по их подписям MinHash.
+
+    Args:
+        first (np.ndarray): Подпись первого текста.
+        second (np.ndarray): Подпись второго текста.
+
+    Returns:
+        float: Доля совпадающих значений подписей.
+    """
+    return float(np.mean(first == second))
+
+
+class MinHashLSH:
+    """
+    Индекс LSH подписей MinHash: подпись делится на полосы, и тексты,
+    у которых совпала хотя бы одна полоса, становятся кандидатами.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = LSH_BANDS) -> None:
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) должно делиться на bands ({bands})")
+        self.rows = num_perm // bands
+        self.bands = bands
+        self._buckets: List[Dict[bytes, List[str]]] = [defaultdict(list) for _ in range(bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._position: Dict[str, int] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        """
+        Делит подпись на ключи полос.
+
+        Args:
+            signature (np.ndarray): Подпись MinHash.
+
+        Returns:
+            List[bytes]: Ключ каждой полосы.
+        """
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def insert(self, key: str, signature: np.ndarray) -> None:
+        """
+        Добавляет подпись в индекс.
+
+        Args:
+            key (str): Имя документа.
+            signature (np.ndarray): Подпись MinHash.
+        """
+        self._signatures[key] = signature
+        self._position[key] = len(self._position)
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            buckets[band_key].append(key)
+
+    def query(self, signature: np.ndarray, threshold: float) -> Optional[Tuple[str, float]]:
+        """
+        Находит самый похожий документ индекса среди кандидатов LSH.
+
+        Args:
+            signature (np.ndarray): Подпись MinHash.
+            threshold (float): Минимальное оценочное сходство Жаккара.
+
+        Returns:
+            Optional[Tuple[str, float]]: Имя документа и сходство или None,
+                если похожего документа нет. При равном сходстве выбирается
+                документ, добавленный раньше.
+        """
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+
+        best = None
+        for key in sorted(candidates, key=self._position.__getitem__):
+            similarity = estimate_jaccard(signature, self._signatures[key])
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+
+class Deduplicator:
+    """
+    Потоковое объединение документов в группы дубликатов.
+
+    Первый документ группы становится ее представителем. Точные дубликаты
+    находятся всегда; почти дубликаты - только при заданном near_threshold.
+    """
+
+    def __init__(
+        self,
+        near_threshold: Optional[float] = None,
+        num_perm: int = NUM_PERM,
+        bands: int = LSH_BANDS,
+        shingle_size: int = SHINGLE_SIZE
+    ) -> None:
+        self.near_threshold = near_threshold
+        self._by_hash: Dict[str, str] = {}
+        self._matches: Dict[str, DuplicateMatch] = {}
+        self._order: Dict[str, int] = {}
+        if near_threshold is not None:
+            self._hasher = MinHasher(num_perm, shingle_size)
+            self._lsh = MinHashLSH(num_perm, bands)
+
+    def add(self, name: str, text: str) -> Optional[DuplicateMatch]:
+        """
+        Добавляет документ и определяет, дубликатом какого документа он является.
+
+        Args:
+            name (str): Имя документа.
+            text (str): Текст документа.
+
+        Returns:
+            Optional[DuplicateMatch]: Представитель группы или None, если
+                документ уникален и сам становится представителем.
+        """
+        content_hash = text_hash(text)
+        representative = self._by_hash.get(content_hash)
+        if representative is not None:
+            # Копия почти дубликата относится к группе его представителя
+            match = self._matches.get(representative, DuplicateMatch(representative, 'exact', 1.0))
+            self._matches[name] = match
+            return match
+
+        self._by_hash[content_hash] = name
+        self._order[name] = len(self._order)
+        if self.near_threshold is None:
+            return None
+
+        signature = self._hasher.signature(text)
+        found = self._lsh.query(signature, self.near_threshold)
+        if found is not None:
+            match = DuplicateMatch(found[0], 'near', found[1])
+            self._matches[name] = match
+            return match
+        self._lsh.insert(name, signature)
+        return None
+
+    @property
+    def matches(self) -> Dict[str, DuplicateMatch]:
+        """
+        Возвращает найденные дубликаты.
+
+        Returns:
+            Dict[str, DuplicateMatch]: Имя дубликата и его представитель.
+        """
+        return self._matches
+
+    def groups(self) -> List[Dict[str, object]]:
+        """
+        Формирует отчет о группах дубликатов.
+
+        Returns:
+            List[Dict[str, object]]: Группы в порядке представителей:
+                представитель и список дубликатов с типом и сходством.
+        """
+        members: Dict[str, List[Dict[str, object]]] = defaultdict(list)
+        for name, match in self._matches.items():
+            members[match.representative].append({
+                'file': name,
+                'kind': match.kind,
+                'similarity': match.similarity
+            })
+        return [
+            {'representative': representative, 'duplicates': members[representative]}
+            for representative in sorted(members, key=self._order.__getitem__)
+        ]
+
+
+def write_duplicate_report(report_path: str, deduplicator: Deduplicator) -> None:
+    """
+    Записывает отчет о группах дубликатов в JSON файл.
+
+    Args:
+        report_path (str): Путь к файлу отчета.
+        deduplicator (Deduplicator): Объединение документов после добавления всех файлов.
+    """
+    groups = deduplicator.groups()
+    with open(report_path, 'w', encoding='utf-8') as report_file:
+        json.dump({
+            'near_threshold': deduplicator.near_threshold,
+            'duplicates': len(deduplicator.matches),
+            'groups': groups
+        }, report_file, ensure_ascii=False, indent=2)
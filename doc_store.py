@@ -0,0 +1,417 @@
+"""
+Модуль хранения обработанных документов SpaCy в файлах DocBin.
+Документы корпуса (резюме или вакансий) сохраняются шардами по SHARD_SIZE
+документов вместе с индексом имен, поэтому повторная загрузка тысяч
+документов не требует запуска модели, а отдельный документ читается из
+своего шарда по требованию.
+
+Запуск из корня репозитория:
+    python doc_store.py --folder data_collector/resume --store parsed/resume
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from spacy.tokens import Doc, DocBin
+from spacy.vocab import Vocab
+
+from atomic_write import atomic_open
+from chunking import merge_chunk_docs, pipe_chunks
+from entity_cache import text_hash
+from similarity import BATCH_SIZE, _resolve_n_process, get_entity_text, get_nlp, read_text
+
+# Количество документов в одном файле DocBin
+SHARD_SIZE = 1000
+
+# Атрибуты токенов в DocBin: текст и пробелы сохраняются всегда,
+# из разметки нужны только границы и метки сущностей
+DOC_ATTRS = ['ENT_IOB', 'ENT_TYPE']
+
+# Имя файла индекса в папке хранилища
+INDEX_FILE = 'index.json'
+
+# Версия формата индекса; индекс другой версии не используется
+STORE_VERSION = 1
+
+# Шарды переписываются без устаревших версий документов, когда таких версий
+# не меньше, чем актуальных документов, и не меньше одного шарда
+COMPACT_MIN_STALE_SHARDS = 1
+
+# Шарды также объединяются, когда их больше необходимого для актуальных
+# документов количества на MAX_EXTRA_SHARDS (неполные шарды коротких запусков)
+MAX_EXTRA_SHARDS = 4
+
+
+class DocStore:
+    """
+    Хранилище обработанных документов одного корпуса.
+
+    Документ, добавленный под уже существующим именем, записывается в новый
+    шард, а индекс начинает указывать на новую версию. Прежние версии остаются
+    в шардах до сжатия (см. compact), которое flush запускает сам, когда
+    устаревших версий становится не меньше, чем актуальных, или когда
+    накапливается много неполных шардов. Загруженные шарды хранятся в памяти
+    в количестве не более max_loaded_shards.
+    """
+
+    def __init__(
+        self,
+        store_path: str,
+        vocab: Optional[Vocab] = None,
+        shard_size: int = SHARD_SIZE,
+        max_loaded_shards: int = 4
+    ) -> None:
+        self.store_path = store_path
+        self.vocab = vocab if vocab is not None else Vocab()
+        self.shard_size = shard_size
+        self.max_loaded_shards = max_loaded_shards
+        self._shards: List[str] = []
+        self._documents: Dict[str, Tuple[int, int, str]] = {}
+        self._stale = 0
+        self._pending: List[Tuple[str, Doc, str]] = []
+        self._pending_index: Dict[str, int] = {}
+        self._loaded: 'OrderedDict[int, List[Doc]]' = OrderedDict()
+
+        os.makedirs(store_path, exist_ok=True)
+        index_path = os.path.join(store_path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as index_file:
+                index = json.load(index_file)
+            if index.get('version') == STORE_VERSION:
+                self._shards = index['shards']
+                self._stale = index.get('stale', 0)
+                self._documents = {
+                    name: (shard, position, content_hash)
+                    for name, (shard, position, content_hash) in index['documents'].items()
+                }
+
+    def __len__(self) -> int:
+        return len(set(self._documents) | {name for name, _, _ in self._pending})
+
+    def __contains__(self, name: str) -> bool:
+        return self.content_hash(name) is not None
+
+    def __enter__(self) -> 'DocStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+    def names(self) -> List[str]:
+        """
+        Возвращает имена сохраненных документов.
+
+        Returns:
+            List[str]: Имена документов в порядке сортировки.
+        """
+        return sorted(set(self._documents) | {name for name, _, _ in self._pending})
+
+    def content_hash(self, name: str) -> Optional[str]:
+        """
+        Возвращает хэш текста, из которого был получен сохраненный документ.
+
+        Args:
+            name (str): Имя документа.
+
+        Returns:
+            Optional[str]: Хэш текста или None, если документа нет.
+        """
+        if name in self._pending_index:
+            return self._pending[self._pending_index[name]][2]
+        if name in self._documents:
+            return self._documents[name][2]
+        return None
+
+    def add(self, name: str, doc: Doc, content_hash: Optional[str] = None) -> None:
+        """
+        Добавляет документ. Документы записываются на диск шардами.
+
+        Args:
+            name (str): Имя документа, например имя файла.
+            doc (Doc): Обработанный документ.
+            content_hash (Optional[str]): Хэш исходного текста; по умолчанию
+                рассчитывается по doc.text.
+        """
+        self._pending_index[name] = len(self._pending)
+        self._pending.append((name, doc, content_hash or text_hash(doc.text)))
+        if len(self._pending) >= self.shard_size:
+            self.flush()
+
+    @property
+    def stale(self) -> int:
+        """
+        Возвращает количество устаревших версий документов в шардах.
+
+        Returns:
+            int: Количество версий, замененных более поздними.
+        """
+        return self._stale
+
+    def flush(self) -> None:
+        """
+        Записывает добавленные документы в новый шард и обновляет индекс.
+        Если устаревших версий накопилось много, сжимает хранилище.
+        """
+        if not self._pending:
+            return
+
+        shard = len(self._shards)
+        doc_bin = DocBin(attrs=DOC_ATTRS, store_user_data=False)
+        for position, (name, doc, content_hash) in enumerate(self._pending):
+            doc_bin.add(doc)
+            if name in self._documents:
+                self._stale += 1
+            self._documents[name] = (shard, position, content_hash)
+        self._shards.append(self._write_shard(doc_bin))
+        self._pending = []
+        self._pending_index = {}
+        self._save_index()
+
+        if (
+            self._stale >= max(len(self._documents), COMPACT_MIN_STALE_SHARDS * self.shard_size)
+            or len(self._shards) > self._min_shards() + MAX_EXTRA_SHARDS
+        ):
+            self.compact()
+
+    def _min_shards(self) -> int:
+        """
+        Возвращает количество полных шардов, достаточное для актуальных документов.
+
+        Returns:
+            int: Минимальное количество шардов.
+        """
+        return -(-len(self._documents) // self.shard_size)
+
+    def compact(self) -> None:
+        """
+        Переписывает шарды, оставляя только актуальные версии документов
+        и объединяя неполные шарды.
+
+        Новые шарды записываются рядом со старыми, затем сохраняется индекс,
+        и только после этого старые шарды удаляются, поэтому прерванное сжатие
+        оставляет рабочее хранилище.
+        """
+        self.flush()
+        if not self._stale and len(self._shards) <= self._min_shards():
+            return
+
+        old_shards = self._shards
+        shards: List[str] = []
+        documents: Dict[str, Tuple[int, int, str]] = {}
+        doc_bin = DocBin(attrs=DOC_ATTRS, store_user_data=False)
+        for name, doc in self.iter_docs():
+            documents[name] = (len(shards), len(doc_bin), self._documents[name][2])
+            doc_bin.add(doc)
+            if len(doc_bin) >= self.shard_size:
+                shards.append(self._write_shard(doc_bin))
+                doc_bin = DocBin(attrs=DOC_ATTRS, store_user_data=False)
+        if len(doc_bin):
+            shards.append(self._write_shard(doc_bin))
+
+        self._shards = shards
+        self._documents = documents
+        self._stale = 0
+        self._loaded.clear()
+        self._save_index()
+        for shard_name in old_shards:
+            os.remove(os.path.join(self.store_path, shard_name))
+
+    def _write_shard(self, doc_bin: DocBin) -> str:
+        """
+        Записывает документы в файл шарда с еще не занятым именем.
+
+        Args:
+            doc_bin (DocBin): Документы шарда.
+
+        Returns:
+            str: Имя файла шарда в папке хранилища.
+        """
+        number = len(self._shards)
+        while os.path.exists(os.path.join(self.store_path, f'shard-{number:05d}.spacy')):
+            number += 1
+        shard_name = f'shard-{number:05d}.spacy'
+        doc_bin.to_disk(os.path.join(self.store_path, shard_name))
+        return shard_name
+
+    def _save_index(self) -> None:
+        """
+        Атомарно сохраняет индекс хранилища.
+        """
+        index = {
+            'version': STORE_VERSION,
+            'shards': self._shards,
+            'stale': self._stale,
+            'documents': {name: list(location) for name, location in sorted(self._documents.items())}
+        }
+        with atomic_open(os.path.join(self.store_path, INDEX_FILE)) as index_file:
+            json.dump(index, index_file, ensure_ascii=False)
+
+    def _read_shard(self, shard: int) -> Iterator[Doc]:
+        """
+        Лениво читает документы шарда с диска.
+
+        Args:
+            shard (int): Номер шарда.
+
+        Yields:
+            Doc: Документы шарда по порядку.
+        """
+        doc_bin = DocBin(attrs=DOC_ATTRS, store_user_data=False)
+        doc_bin.from_disk(os.path.join(self.store_path, self._shards[shard]))
+        yield from doc_bin.get_docs(self.vocab)
+
+    def _load_shard(self, shard: int) -> List[Doc]:
+        """
+        Возвращает документы шарда, загружая его при первом обращении.
+
+        Args:
+            shard (int): Номер шарда.
+
+        Returns:
+            List[Doc]: Документы шарда.
+        """
+        if shard in self._loaded:
+            self._loaded.move_to_end(shard)
+            return self._loaded[shard]
+
+        docs = list(self._read_shard(shard))
+        self._loaded[shard] = docs
+        if len(self._loaded) > self.max_loaded_shards:
+            self._loaded.popitem(last=False)
+        return docs
+
+    def get(self, name: str) -> Doc:
+        """
+        Возвращает сохраненный документ.
+
+        Args:
+            name (str): Имя документа.
+
+        Returns:
+            Doc: Документ.
+
+        Raises:
+            KeyError: Если документа нет в хранилище.
+        """
+        if name in self._pending_index:
+            return self._pending[self._pending_index[name]][1]
+        shard, position, _ = self._documents[name]
+        return self._load_shard(shard)[position]
+
+    def iter_docs(self) -> Iterator[Tuple[str, Doc]]:
+        """
+        Потоково перебирает актуальные версии всех документов, читая каждый
+        шард один раз и не удерживая его в памяти.
+
+        Yields:
+            Tuple[str, Doc]: Имя и документ.
+        """
+        by_shard: Dict[int, Dict[int, str]] = {}
+        for name, (shard, position, _) in self._documents.items():
+            by_shard.setdefault(shard, {})[position] = name
+
+        pending_names = {name for name, _, _ in self._pending}
+        for shard in sorted(by_shard):
+            positions = by_shard[shard]
+            for position, doc in enumerate(self._read_shard(shard)):
+                name = positions.get(position)
+                if name is not None and name not in pending_names:
+                    yield name, doc
+
+        latest = {name: doc for name, doc, _ in self._pending}
+        yield from latest.items()
+
+
+def parse_files(
+    store: DocStore,
+    file_paths: Sequence[str],
+    names: Optional[Sequence[str]] = None,
+    batch_size: int = BATCH_SIZE,
+    n_process: Optional[int] = None
+) -> List[Doc]:
+    """
+    Возвращает документы файлов, запуская модель только для файлов, которых
+    нет в хранилище или текст которых изменился.
+
+    Args:
+        store (DocStore): Хранилище документов.
+        file_paths (Sequence[str]): Пути к текстовым файлам.
+        names (Optional[Sequence[str]]): Имена документов в хранилище;
+            по умолчанию используются пути к файлам.
+        batch_size (int): Размер пакета документов для nlp.pipe.
+        n_process (Optional[int]): Количество процессов для nlp.pipe.
+
+    Returns:
+        List[Doc]: Документы в порядке файлов.
+    """
+    names = list(names) if names is not None else list(file_paths)
+    texts = [read_text(file_path) for file_path in file_paths]
+    hashes = [text_hash(text) for text in texts]
+
+    docs: List[Optional[Doc]] = [
+        store.get(name) if store.content_hash(name) == content_hash else None
+        for name, content_hash in zip(names, hashes)
+    ]
+
+    missing = [idx for idx, doc in enumerate(docs) if doc is None]
+    if missing:
+        missing_texts = [texts[idx] for idx in missing]
+        n_process = _resolve_n_process(len(missing_texts), batch_size, n_process)
+        parsed = pipe_chunks(get_nlp(), missing_texts, batch_size=batch_size, n_process=n_process)
+        for idx, chunk_docs in zip(missing, parsed):
+            doc = merge_chunk_docs(chunk_docs)
+            store.add(names[idx], doc, hashes[idx])
+            docs[idx] = doc
+        store.flush()
+
+    return docs
+
+
+def main() -> None:
+    """
+    Сохраняет документы папки в хранилище и измеряет время их повторной загрузки.
+    """
+    parser = argparse.ArgumentParser(description='Хранилище обработанных документов DocBin')
+    parser.add_argument('--folder', default='data_collector/resume', help='Папка с .txt файлами')
+    parser.add_argument('--store', default='parsed/resume', help='Папка хранилища')
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--n-process', type=int, default=None)
+    parser.add_argument('--compact', action='store_true',
+                        help='Удалить из шардов устаревшие версии документов')
+    args = parser.parse_args()
+
+    file_names = sorted(name for name in os.listdir(args.folder) if name.endswith('.txt'))
+    with DocStore(args.store, shard_size=args.shard_size) as store:
+        start = time.perf_counter()
+        parse_files(
+            store,
+            [os.path.join(args.folder, name) for name in file_names],
+            names=file_names,
+            batch_size=args.batch_size,
+            n_process=args.n_process
+        )
+        print(f"Обновление хранилища: {len(file_names)} файлов, {time.perf_counter() - start:.2f}s")
+        if args.compact:
+            stale = store.stale
+            store.compact()
+            print(f"Удалено устаревших версий: {stale}")
+
+    start = time.perf_counter()
+    n_entities = sum(
+        len(values)
+        for _, doc in DocStore(args.store).iter_docs()
+        for values in get_entity_text(doc).values()
+    )
+    print(
+        f"Загрузка {len(file_names)} документов из {args.store}: "
+        f"{time.perf_counter() - start:.2f}s, сущностей: {n_entities}"
+    )
+
+
+if __name__ == '__main__':
+    main()
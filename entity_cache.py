@@ -0,0 +1,209 @@
+"""
+Модуль дискового кэша извлеченных именованных сущностей.
+Хранит результаты get_entity_text по хэшу текста и отпечатку модели SpaCy,
+чтобы не запускать модель повторно на неизменившихся документах.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Set
+
+# Путь к файлу кэша по умолчанию
+DEFAULT_CACHE_PATH = '.entity_cache.sqlite3'
+
+# Максимальный объем сохраненных сущностей в байтах
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Ограничение на количество параметров в одном SQL запросе
+_QUERY_CHUNK_SIZE = 500
+
+
+def model_fingerprint(model_path: str) -> str:
+    """
+    Рассчитывает отпечаток модели SpaCy по ее файлам.
+
+    Учитываются содержимое meta.json, а также имена, размеры и время изменения
+    всех файлов модели, поэтому переобучение и повторное сохранение модели
+    меняют отпечаток.
+
+    Args:
+        model_path (str): Путь к директории модели.
+
+    Returns:
+        str: Шестнадцатеричный хэш модели.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(model_path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            stat = os.stat(file_path)
+            relative_path = os.path.relpath(file_path, model_path)
+            digest.update(f"{relative_path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+
+    meta_path = os.path.join(model_path, 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path, 'rb') as meta_file:
+            digest.update(meta_file.read())
+    return digest.hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """
+    Рассчитывает хэш содержимого текста.
+
+    Args:
+        text (str): Текст документа.
+
+    Returns:
+        str: Шестнадцатеричный хэш SHA-256.
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EntityCache:
+    """
+    Дисковый кэш сущностей на SQLite с вытеснением давно не использованных записей.
+
+    Записи принадлежат конкретному отпечатку модели: при открытии кэша записи
+    других версий модели удаляются.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        cache_path: str = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        """
+        Открывает кэш и удаляет записи устаревших моделей.
+
+        Args:
+            model_path (str): Путь к директории модели SpaCy.
+            cache_path (str): Путь к файлу кэша.
+            max_bytes (int): Максимальный объем сохраненных сущностей в байтах.
+        """
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
+        self.model = model_fingerprint(model_path)
+
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entities ("
+                "text_hash TEXT NOT NULL, "
+                "model TEXT NOT NULL, "
+                "value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "accessed REAL NOT NULL, "
+                "PRIMARY KEY (text_hash, model))"
+            )
+            connection.execute("DELETE FROM entities WHERE model != ?", (self.model,))
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Открывает соединение с файлом кэша в рамках одной транзакции.
+
+        Yields:
+            sqlite3.Connection: Соединение с базой данных.
+        """
+        connection = sqlite3.connect(self.cache_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[Dict[str, Set[str]]]]:
+        """
+        Возвращает сохраненные сущности для списка текстов.
+
+        Args:
+            texts (Sequence[str]): Тексты документов.
+
+        Returns:
+            List[Optional[Dict[str, Set[str]]]]: Сущности каждого текста
+                или None, если текста нет в кэше.
+        """
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+        now = time.time()
+
+        with self._connect() as connection:
+            for start in range(0, len(hashes), _QUERY_CHUNK_SIZE):
+                chunk = hashes[start:start + _QUERY_CHUNK_SIZE]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = connection.execute(
+                    f"SELECT text_hash, value FROM entities "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    (self.model, *chunk)
+                ).fetchall()
+                found.update(rows)
+                connection.execute(
+                    f"UPDATE entities SET accessed = ? "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    (now, self.model, *chunk)
+                )
+
+        result = []
+        for key in hashes:
+            if key in found:
+                entity_text = defaultdict(set)
+                for label, entities in json.loads(found[key]).items():
+                    entity_text[label].update(entities)
+                result.append(entity_text)
+            else:
+                result.append(None)
+        return result
+
+    def put_many(self, texts: Sequence[str], entities: Sequence[Dict[str, Set[str]]]) -> None:
+        """
+        Сохраняет сущности текстов и вытесняет старые записи при превышении объема.
+
+        Args:
+            texts (Sequence[str]): Тексты документов.
+            entities (Sequence[Dict[str, Set[str]]]): Сущности каждого текста.
+        """
+        now = time.time()
+        rows = []
+        for text, entity_text in zip(texts, entities):
+            value = json.dumps(
+                {label: sorted(values) for label, values in entity_text.items()},
+                ensure_ascii=False
+            )
+            rows.append((text_hash(text), self.model, value, len(value.encode('utf-8')), now))
+
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO entities (text_hash, model, value, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict(connection)
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """
+        Удаляет давно не использованные записи сверх максимального объема.
+
+        Args:
+            connection (sqlite3.Connection): Открытое соединение с кэшем.
+        """
+        connection.execute(
+            "DELETE FROM entities WHERE rowid IN ("
+            "SELECT rowid FROM ("
+            "SELECT rowid, SUM(size) OVER (ORDER BY accessed DESC, rowid DESC) AS total "
+            "FROM entities) WHERE total > ?)",
+            (self.max_bytes,)
+        )
+
+    def clear(self) -> None:
+        """
+        Удаляет все записи кэша.
+        """
+        with self._connect() as connection:
+            connection.execute("DELETE FROM entities")
@@ -0,0 +1,363 @@
+"""
+Модуль измерения времени этапов оценки резюме.
+Собирает счетчики и гистограммы задержек по этапам (чтение, NLP, извлечение
+сущностей, сходство по меткам, запись результатов). По умолчанию выключен:
+в этом случае каждый замер сводится к проверке одного флага.
+"""
+
+import bisect
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import pandas as pd
+
+T = TypeVar('T')
+
+# Верхние границы корзин гистограммы задержек в секундах
+LATENCY_BUCKETS = (
+    1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0, 10.0, float('inf')
+)
+
+# Общий выключатель. Проверяется до любых замеров
+_enabled = False
+_lock = threading.Lock()
+_stages: Dict[str, 'StageStats'] = {}
+_counters: Dict[str, int] = {}
+_NULL_CONTEXT = nullcontext()
+
+
+class StageStats:
+    """
+    Накопленная статистика одного этапа: количество, сумма, минимум, максимум
+    и гистограмма задержек.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def observe(self, seconds: float) -> None:
+        """
+        Добавляет одно измерение.
+
+        Args:
+            seconds (float): Длительность в секундах.
+        """
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def merge(self, other: 'StageStats') -> None:
+        """
+        Добавляет измерения другой статистики того же этапа.
+
+        Args:
+            other (StageStats): Статистика, например, собранная другим процессом.
+        """
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.buckets = [first + second for first, second in zip(self.buckets, other.buckets)]
+
+    def quantile(self, q: float) -> float:
+        """
+        Оценивает квантиль задержки по гистограмме (верхняя граница корзины).
+
+        Args:
+            q (float): Квантиль от 0 до 1.
+
+        Returns:
+            float: Оценка квантиля в секундах.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket in zip(LATENCY_BUCKETS, self.buckets):
+            seen += bucket
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику в виде словаря для отчета.
+
+        Returns:
+            Dict[str, Any]: Статистика этапа.
+        """
+        return {
+            'count': self.count,
+            'total_seconds': self.total,
+            'mean_seconds': self.total / self.count if self.count else 0.0,
+            'min_seconds': self.min if self.count else 0.0,
+            'max_seconds': self.max,
+            'p50_seconds': self.quantile(0.5),
+            'p95_seconds': self.quantile(0.95),
+            # Последняя корзина без верхней границы записывается как None
+            'histogram': [
+                {'le': bound if bound != float('inf') else None, 'count': bucket}
+                for bound, bucket in zip(LATENCY_BUCKETS, self.buckets)
+                if bucket
+            ]
+        }
+
+
+def enable() -> None:
+    """
+    Включает сбор статистики.
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """
+    Выключает сбор статистики. Накопленные данные сохраняются.
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """
+    Проверяет, включен ли сбор статистики.
+
+    Returns:
+        bool: True если статистика собирается.
+    """
+    return _enabled
+
+
+def reset() -> None:
+    """
+    Удаляет накопленную статистику.
+    """
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def take() -> Tuple[Dict[str, StageStats], Dict[str, int]]:
+    """
+    Возвращает накопленную статистику и удаляет ее, например, чтобы рабочий
+    процесс передал свои замеры родительскому (см. merge).
+
+    Returns:
+        Tuple[Dict[str, StageStats], Dict[str, int]]: Статистика этапов и значения счетчиков.
+    """
+    global _stages, _counters
+    with _lock:
+        stages, counters = _stages, _counters
+        _stages, _counters = {}, {}
+    return stages, counters
+
+
+def merge(stages: Dict[str, StageStats], counters: Dict[str, int]) -> None:
+    """
+    Добавляет к накопленной статистике замеры, полученные от take.
+
+    Args:
+        stages (Dict[str, StageStats]): Статистика этапов.
+        counters (Dict[str, int]): Значения счетчиков.
+    """
+    with _lock:
+        for name, other in stages.items():
+            stats = _stages.get(name)
+            if stats is None:
+                stats = _stages[name] = StageStats()
+            stats.merge(other)
+        for name, value in counters.items():
+            _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, seconds: float) -> None:
+    """
+    Записывает длительность этапа.
+
+    Args:
+        name (str): Название этапа.
+        seconds (float): Длительность в секундах.
+    """
+    with _lock:
+        stats = _stages.get(name)
+        if stats is None:
+            stats = _stages[name] = StageStats()
+        stats.observe(seconds)
+
+
+def count(name: str, value: int = 1) -> None:
+    """
+    Увеличивает счетчик, если сбор статистики включен.
+
+    Args:
+        name (str): Название счетчика.
+        value (int): Величина увеличения.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+@contextmanager
+def _timer(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def stage(name: str, label: Optional[str] = None):
+    """
+    Контекстный менеджер, измеряющий время блока кода.
+
+    Args:
+        name (str): Название этапа.
+        label (Optional[str]): Уточнение этапа, например метка сущности;
+            статистика записывается как '<name>.<label>'.
+
+    Returns:
+        Контекстный менеджер замера или пустой контекст, если сбор выключен.
+    """
+    if not _enabled:
+        return _NULL_CONTEXT
+    return _timer(name if label is None else f'{name}.{label}')
+
+
+def timed(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Декоратор, измеряющий время каждого вызова функции.
+
+    Args:
+        name (str): Название этапа.
+
+    Returns:
+        Callable: Декоратор функции.
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _timed_iter(name: str, iterable: Iterable[T]) -> Iterator[T]:
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        observe(name, time.perf_counter() - start)
+        yield item
+
+
+def timed_iter(name: str, iterable: Iterable[T]) -> Iterable[T]:
+    """
+    Измеряет время получения каждого элемента ленивого потока,
+    например документов из nlp.pipe.
+
+    Args:
+        name (str): Название этапа.
+        iterable (Iterable[T]): Поток элементов.
+
+    Returns:
+        Iterable[T]: Исходный поток, если сбор выключен, иначе поток с замерами.
+    """
+    if not _enabled:
+        return iterable
+    return _timed_iter(name, iterable)
+
+
+def summary() -> Dict[str, Any]:
+    """
+    Возвращает накопленную статистику.
+
+    Returns:
+        Dict[str, Any]: Статистика этапов и значения счетчиков.
+    """
+    with _lock:
+        return {
+            'stages': {name: stats.to_dict() for name, stats in sorted(_stages.items())},
+            'counters': dict(sorted(_counters.items()))
+        }
+
+
+def summary_frame() -> pd.DataFrame:
+    """
+    Возвращает статистику этапов в виде таблицы.
+
+    Returns:
+        pd.DataFrame: Таблица с количеством вызовов и задержками этапов в миллисекундах.
+    """
+    rows: List[Dict[str, Any]] = []
+    for name, stats in summary()['stages'].items():
+        rows.append({
+            'Stage': name,
+            'Count': stats['count'],
+            'Total, ms': stats['total_seconds'] * 1000,
+            'Mean, ms': stats['mean_seconds'] * 1000,
+            'p50, ms': stats['p50_seconds'] * 1000,
+            'p95, ms': stats['p95_seconds'] * 1000,
+            'Max, ms': stats['max_seconds'] * 1000
+        })
+    return pd.DataFrame(
+        rows,
+        columns=['Stage', 'Count', 'Total, ms', 'Mean, ms', 'p50, ms', 'p95, ms', 'Max, ms']
+    )
+
+
+def format_summary() -> str:
+    """
+    Форматирует накопленную статистику для вывода в консоль.
+
+    Returns:
+        str: Таблица этапов и список счетчиков.
+    """
+    data = summary()
+    lines = [
+        f"{'Stage':<32}{'count':>9}{'total, ms':>12}{'mean, ms':>11}"
+        f"{'p50, ms':>10}{'p95, ms':>10}{'max, ms':>10}"
+    ]
+    for name, stats in data['stages'].items():
+        lines.append(
+            f"{name:<32}{stats['count']:>9}{stats['total_seconds'] * 1000:>12.2f}"
+            f"{stats['mean_seconds'] * 1000:>11.3f}{stats['p50_seconds'] * 1000:>10.3f}"
+            f"{stats['p95_seconds'] * 1000:>10.3f}{stats['max_seconds'] * 1000:>10.3f}"
+        )
+    for name, value in data['counters'].items():
+        lines.append(f"{name}: {value}")
+    return '\n'.join(lines)
+
+
+def dump(file_path: str) -> None:
+    """
+    Сохраняет накопленную статистику в JSON файл для последующего анализа.
+
+    Args:
+        file_path (str): Путь к JSON файлу.
+    """
+    data = summary()
+    data['timestamp'] = time.time()
+    with open(file_path, 'w', encoding='utf-8') as output_file:
+        json.dump(data, output_file, ensure_ascii=False, indent=2)
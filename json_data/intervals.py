@@ -0,0 +1,90 @@
+"""
+Модуль поиска перекрывающихся сущностей.
+Сортирует сущности по смещениям и находит все перекрывающиеся пары за один
+проход, вместо попарного сравнения всех сущностей записи.
+"""
+
+import heapq
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+
+def check_overlap(entity1: Dict[str, Any], entity2: Dict[str, Any]) -> bool:
+    """
+    Проверяет, перекрываются ли две сущности в тексте.
+
+    Args:
+        entity1 (Dict[str, Any]): Первая сущность с ключами 'start_offset' и 'end_offset'.
+        entity2 (Dict[str, Any]): Вторая сущность с ключами 'start_offset' и 'end_offset'.
+
+    Returns:
+        bool: True если сущности перекрываются, False в противном случае.
+    """
+    return (entity1['start_offset'] < entity2['end_offset'] and
+            entity1['end_offset'] > entity2['start_offset'])
+
+
+def find_overlapping_pairs(entities: Sequence[Dict[str, Any]]) -> List[Tuple[int, int]]:
+    """
+    Находит все пары перекрывающихся сущностей.
+
+    Сущности обходятся в порядке начальных смещений; в куче по конечному
+    смещению хранятся только те, что еще могут перекрыть следующие сущности.
+    Сложность O(n log n + k), где k - количество найденных пар. Сущности с
+    концом раньше начала сравниваются со всеми остальными напрямую.
+
+    Args:
+        entities (Sequence[Dict[str, Any]]): Сущности с ключами 'start_offset' и 'end_offset'.
+
+    Returns:
+        List[Tuple[int, int]]: Пары индексов (i, j), i < j, в порядке возрастания.
+    """
+    valid = []
+    malformed = []
+    for idx, entity in enumerate(entities):
+        if entity['end_offset'] < entity['start_offset']:
+            malformed.append(idx)
+        else:
+            valid.append(idx)
+
+    valid.sort(key=lambda idx: (entities[idx]['start_offset'], entities[idx]['end_offset'], idx))
+
+    pairs = []
+    active: List[Tuple[int, int]] = []
+    for idx in valid:
+        start = entities[idx]['start_offset']
+        end = entities[idx]['end_offset']
+
+        # Сущности, закончившиеся до начала текущей, не перекрывают ни ее, ни следующие
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+
+        for _, other in active:
+            if end > entities[other]['start_offset']:
+                pairs.append((min(idx, other), max(idx, other)))
+        heapq.heappush(active, (end, idx))
+
+    for idx in malformed:
+        for other in range(len(entities)):
+            if other != idx and (other not in malformed or other > idx) \
+                    and check_overlap(entities[idx], entities[other]):
+                pairs.append((min(idx, other), max(idx, other)))
+
+    pairs.sort()
+    return pairs
+
+
+def find_overlapping_indices(entities: Sequence[Dict[str, Any]]) -> Set[int]:
+    """
+    Находит индексы сущностей, перекрывающихся хотя бы с одной другой сущностью.
+
+    Args:
+        entities (Sequence[Dict[str, Any]]): Сущности с ключами 'start_offset' и 'end_offset'.
+
+    Returns:
+        Set[int]: Индексы перекрывающихся сущностей.
+    """
+    indices = set()
+    for first, second in find_overlapping_pairs(entities):
+        indices.add(first)
+        indices.add(second)
+    return indices
@@ -1,35 +1,62 @@
 """
 Основной модуль для обработки JSON файлов.
-Выполняет последовательную обработку файла:
-1. Корректировка пробелов в сущностях
-2. Проверка перекрытий сущностей
+Выполняет обработку файла за один потоковый проход, применяя к каждой записи:
+1. Корректировку пробелов в сущностях
+2. Проверку перекрытий сущностей
 3. Исправление перекрытий
 """
 
-from space_controller import process_spaces_jsonl
-from overlaping_check import check_overlapping
-from overlaping_fix import fix_overlapping
+import argparse
+from typing import Optional
 
+from pipeline import run_pipeline
+from sharding import process_sharded
+from space_controller import process_spaces_records
+from overlaping_сheck import check_overlapping_records
+from overlaping_fix import process_records
 
-def process_json_file(file_path: str) -> None:
+# Этапы обработки записей в порядке применения
+STAGES = (process_spaces_records, check_overlapping_records, process_records)
+
+
+def process_json_file(
+    file_path: str,
+    output_path: Optional[str] = None,
+    workers: int = 1,
+    n_shards: Optional[int] = None
+) -> None:
     """
     Выполняет полную обработку JSON файла.
 
     Args:
         file_path (str): Путь к JSON файлу для обработки.
+        output_path (Optional[str]): Путь к выходному файлу. По умолчанию
+            входной файл перезаписывается.
+        workers (int): Количество процессов; при значении больше 1 файл
+            обрабатывается по диапазонам в пуле процессов.
+        n_shards (Optional[int]): Количество диапазонов при параллельной обработке.
     """
-
-    process_spaces_jsonl(file_path)
-    check_overlapping(file_path)
-    fix_overlapping(file_path)
+    if workers > 1:
+        process_sharded(file_path, STAGES, output_path, workers=workers, n_shards=n_shards)
+    else:
+        run_pipeline(file_path, STAGES, output_path)
 
 
 def main() -> None:
     """
     Основная функция для обработки JSON файла.
     """
-    json_path = 'json_data/jsons/all.jsonl'
-    process_json_file(json_path)
+    parser = argparse.ArgumentParser(description='Обработка JSONL файла с разметкой')
+    parser.add_argument('json_path', nargs='?', default='json_data/jsons/all.jsonl')
+    parser.add_argument('--output', default=None,
+                        help='Выходной файл; по умолчанию входной файл перезаписывается')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Количество процессов для параллельной обработки')
+    parser.add_argument('--shards', type=int, default=None,
+                        help='Количество диапазонов файла при параллельной обработке')
+    args = parser.parse_args()
+
+    process_json_file(args.json_path, args.output, workers=args.workers, n_shards=args.shards)
 
 
 if __name__ == '__main__':
@@ -3,25 +3,10 @@
 Удаляет перекрывающиеся сущности, сохраняя только одну из них.
 """
 
-import os
-from typing import Dict, List, Iterator, Any
+from typing import Dict, Iterable, List, Iterator, Any
 
-import jsonlines
-
-
-def check_overlap(entity1: Dict[str, int], entity2: Dict[str, int]) -> bool:
-    """
-    Проверяет, перекрываются ли две сущности в тексте.
-
-    Args:
-        entity1 (Dict[str, int]): Первая сущность с ключами 'start_offset' и 'end_offset'.
-        entity2 (Dict[str, int]): Вторая сущность с ключами 'start_offset' и 'end_offset'.
-
-    Returns:
-        bool: True если сущности перекрываются, False в противном случае.
-    """
-    return (entity1['start_offset'] < entity2['end_offset'] and
-            entity1['end_offset'] > entity2['start_offset'])
+from intervals import find_overlapping_indices
+from pipeline import run_pipeline
 
 
 def remove_overlapping_entities(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -35,26 +20,16 @@ def remove_overlapping_entities(entities: List[Dict[str, Any]]) -> List[Dict[str
     Returns:
         List[Dict[str, Any]]: Список сущностей без перекрытий.
     """
-    entities_to_keep = []
-
-    for i, entity1 in enumerate(entities):
-        overlapping = False
-        for j, entity2 in enumerate(entities):
-            if i != j and check_overlap(entity1, entity2):
-                overlapping = True
-                break
-        if not overlapping:
-            entities_to_keep.append(entity1)
-
-    return entities_to_keep
+    overlapping = find_overlapping_indices(entities)
+    return [entity for idx, entity in enumerate(entities) if idx not in overlapping]
 
 
-def process_records(records: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+def process_records(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
     """
     Обрабатывает записи, удаляя перекрывающиеся сущности в каждой записи.
 
     Args:
-        records (List[Dict[str, Any]]): Список записей, каждая из которых содержит
+        records (Iterable[Dict[str, Any]]): Поток записей, каждая из которых содержит
             ключ 'entities' со списком сущностей.
 
     Yields:
@@ -74,16 +49,4 @@ def fix_overlapping(file_path: str) -> None:
     Args:
         file_path (str): Путь к файлу JSON для обработки.
     """
-    temp_file_path = file_path + '.tmp'
-    
-    with jsonlines.open(file_path) as reader, jsonlines.open(temp_file_path, 'w') as writer:
-        records = list(reader)
-        new_records = process_records(records)
-        writer.write_all(new_records)
-
-    with open(temp_file_path, 'r', encoding='utf-8') as temp_file, \
-         open(file_path, 'w', encoding='utf-8') as output_file:
-        output_file.write(temp_file.read())
-
-    os.remove(temp_file_path)
-
+    run_pipeline(file_path, [process_records])
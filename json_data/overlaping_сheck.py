@@ -3,23 +3,42 @@
 Выявляет и выводит информацию о перекрывающихся сущностях в тексте.
 """
 
-from typing import Dict, Any
+from typing import Dict, Iterable, Iterator, Any
 
-import jsonlines
+from intervals import find_overlapping_pairs
+from pipeline import iter_jsonl
 
-def check_overlap(entity1: Dict[str, Any], entity2: Dict[str, Any]) -> bool:
+
+def check_overlapping_records(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
     """
-    Проверяет, перекрываются ли две сущности в тексте.
+    Выводит информацию о перекрывающихся сущностях и передает записи дальше без изменений.
+    Каждая перекрывающаяся пара выводится один раз.
 
     Args:
-        entity1 (Dict[str, Any]): Первая сущность с ключами 'start_offset' и 'end_offset'.
-        entity2 (Dict[str, Any]): Вторая сущность с ключами 'start_offset' и 'end_offset'.
+        records (Iterable[Dict[str, Any]]): Записи с ключами 'id', 'entities' и 'text'.
 
-    Returns:
-        bool: True если сущности перекрываются, False в противном случае.
+    Yields:
+        Dict[str, Any]: Исходная запись.
     """
-    return (entity1['start_offset'] < entity2['end_offset'] and
-            entity1['end_offset'] > entity2['start_offset'])
+    for record in records:
+        entities = record['entities']
+        for i, j in find_overlapping_pairs(entities):
+            entity1 = entities[i]
+            entity2 = entities[j]
+            print(f"Overlap detected in record {record['id']}:")
+            print(
+                f"Entity {entity1['label']} "
+                f"({entity1['start_offset']} - {entity1['end_offset']}) "
+                f"overlaps with Entity {entity2['label']} "
+                f"({entity2['start_offset']} - {entity2['end_offset']})"
+            )
+            print(
+                f"Text: {record['text'][entity1['start_offset']:entity1['end_offset']]} | "
+                f"{record['text'][entity2['start_offset']:entity2['end_offset']]}"
+            )
+            print("-" * 60)
+        yield record
+
 
 def check_overlapping(file_path: str) -> None:
     """
@@ -34,23 +53,5 @@ def check_overlapping(file_path: str) -> None:
         - 'entities': список сущностей
         - 'text': текст записи
     """
-    with jsonlines.open(file_path) as reader:
-        for record in reader:
-            entities = record['entities']
-            for i, entity1 in enumerate(entities):
-                for j, entity2 in enumerate(entities):
-                    if i != j and check_overlap(entity1, entity2):
-                        print(f"Overlap detected in record {record['id']}:")
-                        print(
-                            f"Entity {entity1['label']} "
-                            f"({entity1['start_offset']} - {entity1['end_offset']}) "
-                            f"overlaps with Entity {entity2['label']} "
-                            f"({entity2['start_offset']} - {entity2['end_offset']})"
-                        )
-                        print(
-                            f"Text: {record['text'][entity1['start_offset']:entity1['end_offset']]} | "
-                            f"{record['text'][entity2['start_offset']:entity2['end_offset']]}"
-                        )
-                        print("-" * 60)
-
-
+    for _ in check_overlapping_records(iter_jsonl(file_path)):
+        pass
@@ -0,0 +1,96 @@
+"""
+Модуль потоковой обработки JSONL файлов.
+Читает записи по одной, пропускает их через цепочку этапов обработки
+и атомарно записывает результат, поэтому объем памяти не зависит от размера файла.
+"""
+
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from atomic_write import atomic_open
+
+# Этап обработки: принимает поток записей и возвращает новый поток записей
+Stage = Callable[[Iterable[Dict[str, Any]]], Iterator[Dict[str, Any]]]
+
+
+def iter_jsonl(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Лениво читает записи JSONL файла.
+
+    Args:
+        file_path (str): Путь к JSONL файлу.
+
+    Yields:
+        Dict[str, Any]: Очередная запись файла.
+    """
+    with open(file_path, 'r', encoding='utf-8') as input_file:
+        for line in input_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_jsonl_atomic(file_path: str, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Записывает записи в JSONL файл через временный файл в той же папке.
+
+    Целевой файл заменяется только после успешной записи всех записей, поэтому
+    его можно использовать и как источник записей. Права доступа существующего
+    файла сохраняются.
+
+    Args:
+        file_path (str): Путь к выходному JSONL файлу.
+        records (Iterable[Dict[str, Any]]): Записи для записи.
+
+    Returns:
+        int: Количество записанных записей.
+    """
+    count = 0
+    with atomic_open(file_path) as output_file:
+        for record in records:
+            output_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def apply_stages(
+    records: Iterable[Dict[str, Any]],
+    stages: Sequence[Stage]
+) -> Iterable[Dict[str, Any]]:
+    """
+    Последовательно соединяет этапы обработки в один поток.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): Исходный поток записей.
+        stages (Sequence[Stage]): Этапы обработки.
+
+    Returns:
+        Iterable[Dict[str, Any]]: Поток обработанных записей.
+    """
+    for stage in stages:
+        records = stage(records)
+    return records
+
+
+def run_pipeline(
+    input_path: str,
+    stages: Sequence[Stage],
+    output_path: Optional[str] = None
+) -> int:
+    """
+    Обрабатывает JSONL файл за один проход.
+
+    Args:
+        input_path (str): Путь к входному JSONL файлу.
+        stages (Sequence[Stage]): Этапы обработки.
+        output_path (Optional[str]): Путь к выходному файлу. По умолчанию
+            входной файл перезаписывается.
+
+    Returns:
+        int: Количество обработанных записей.
+    """
+    records = apply_stages(iter_jsonl(input_path), stages)
+    return write_jsonl_atomic(output_path or input_path, records)
@@ -0,0 +1,189 @@
+"""
+Модуль параллельной обработки больших JSONL файлов.
+Делит файл на диапазоны байтов по границам строк, обрабатывает их в пуле
+процессов и собирает результат в исходном порядке записей.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from pipeline import Stage, apply_stages, atomic_open
+
+
+class ShardResult(NamedTuple):
+    """
+    Результат обработки одного диапазона файла.
+    """
+    idx: int
+    start: int
+    end: int
+    records: int
+    seconds: float
+    output_path: str
+    report_path: str
+
+
+def split_byte_ranges(file_path: str, n_shards: int) -> List[Tuple[int, int]]:
+    """
+    Делит файл на диапазоны байтов, границы которых совпадают с началами строк.
+
+    Args:
+        file_path (str): Путь к JSONL файлу.
+        n_shards (int): Желаемое количество диапазонов.
+
+    Returns:
+        List[Tuple[int, int]]: Непустые диапазоны [начало, конец) по порядку.
+    """
+    size = os.path.getsize(file_path)
+    boundaries = [0]
+    with open(file_path, 'rb') as input_file:
+        for shard in range(1, n_shards):
+            position = max(size * shard // n_shards, boundaries[-1])
+            input_file.seek(position)
+            if position > boundaries[-1]:
+                # Переходим к началу следующей строки
+                input_file.seek(position - 1)
+                input_file.readline()
+            boundaries.append(input_file.tell())
+    boundaries.append(size)
+
+    return [
+        (start, end)
+        for start, end in zip(boundaries, boundaries[1:])
+        if end > start
+    ]
+
+
+def iter_range_records(file_path: str, start: int, end: int) -> Iterator[Dict[str, Any]]:
+    """
+    Лениво читает записи JSONL, строки которых начинаются в диапазоне байтов.
+
+    Args:
+        file_path (str): Путь к JSONL файлу.
+        start (int): Начало диапазона (начало строки).
+        end (int): Конец диапазона.
+
+    Yields:
+        Dict[str, Any]: Очередная запись диапазона.
+    """
+    with open(file_path, 'rb') as input_file:
+        input_file.seek(start)
+        while input_file.tell() < end:
+            line = input_file.readline()
+            if not line:
+                break
+            if line.strip():
+                yield json.loads(line)
+
+
+def process_shard(
+    idx: int,
+    input_path: str,
+    start: int,
+    end: int,
+    stages: Sequence[Stage],
+    temp_dir: str
+) -> ShardResult:
+    """
+    Обрабатывает один диапазон файла и записывает результат во временный файл.
+
+    Сообщения этапов обработки сохраняются в отдельный файл отчета, чтобы
+    вывод разных процессов не перемешивался.
+
+    Args:
+        idx (int): Номер диапазона.
+        input_path (str): Путь к входному JSONL файлу.
+        start (int): Начало диапазона.
+        end (int): Конец диапазона.
+        stages (Sequence[Stage]): Этапы обработки.
+        temp_dir (str): Папка для временных файлов.
+
+    Returns:
+        ShardResult: Результат обработки диапазона.
+    """
+    started = time.perf_counter()
+    output_path = os.path.join(temp_dir, f'shard-{idx:05d}.jsonl')
+    report_path = os.path.join(temp_dir, f'shard-{idx:05d}.log')
+    records = 0
+
+    with open(output_path, 'w', encoding='utf-8') as output_file, \
+         open(report_path, 'w', encoding='utf-8') as report_file, \
+         redirect_stdout(report_file):
+        for record in apply_stages(iter_range_records(input_path, start, end), stages):
+            output_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            records += 1
+
+    return ShardResult(
+        idx, start, end, records, time.perf_counter() - started, output_path, report_path
+    )
+
+
+def merge_shards(output_path: str, shard_paths: Sequence[str]) -> None:
+    """
+    Атомарно объединяет обработанные диапазоны в выходной файл с сохранением
+    прав доступа существующего файла.
+
+    Args:
+        output_path (str): Путь к выходному JSONL файлу.
+        shard_paths (Sequence[str]): Файлы диапазонов в исходном порядке.
+    """
+    with atomic_open(output_path, 'wb') as output_file:
+        for shard_path in shard_paths:
+            with open(shard_path, 'rb') as shard_file:
+                shutil.copyfileobj(shard_file, output_file)
+
+
+def process_sharded(
+    input_path: str,
+    stages: Sequence[Stage],
+    output_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    n_shards: Optional[int] = None
+) -> List[ShardResult]:
+    """
+    Обрабатывает JSONL файл по диапазонам в пуле процессов.
+
+    Args:
+        input_path (str): Путь к входному JSONL файлу.
+        stages (Sequence[Stage]): Этапы обработки записей.
+        output_path (Optional[str]): Путь к выходному файлу. По умолчанию
+            входной файл перезаписывается.
+        workers (Optional[int]): Количество процессов. По умолчанию - число ядер.
+        n_shards (Optional[int]): Количество диапазонов. По умолчанию
+            четыре диапазона на процесс.
+
+    Returns:
+        List[ShardResult]: Результаты обработки диапазонов в исходном порядке.
+    """
+    output_path = output_path or input_path
+    workers = workers or os.cpu_count() or 1
+    ranges = split_byte_ranges(input_path, n_shards or workers * 4)
+    temp_root = os.path.dirname(os.path.abspath(output_path))
+
+    with tempfile.TemporaryDirectory(dir=temp_root) as temp_dir:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(process_shard, idx, input_path, start, end, stages, temp_dir)
+                for idx, (start, end) in enumerate(ranges)
+            ]
+            results = [future.result() for future in futures]
+
+        for result in results:
+            with open(result.report_path, 'r', encoding='utf-8') as report_file:
+                shutil.copyfileobj(report_file, sys.stdout)
+
+        merge_shards(output_path, [result.output_path for result in results])
+
+    for result in results:
+        print(
+            f"Shard {result.idx}: bytes {result.start}-{result.end}, "
+            f"{result.records} records, {result.seconds:.3f}s"
+        )
+    return results
@@ -3,8 +3,9 @@
 Удаляет лишние пробелы в начале и конце сущностей.
 """
 
-import json
-from typing import Dict, List, Any
+from typing import Dict, Iterable, Iterator, List, Any
+
+from pipeline import run_pipeline
 
 
 def correct_offsets(text: str, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -49,6 +50,21 @@ def correct_offsets(text: str, entities: List[Dict[str, Any]]) -> List[Dict[str,
     return corrected_entities
 
 
+def process_spaces_records(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Корректирует пробелы в сущностях каждой записи потока.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): Записи с ключами 'text' и 'entities'.
+
+    Yields:
+        Dict[str, Any]: Запись со скорректированными сущностями.
+    """
+    for data in records:
+        data['entities'] = correct_offsets(data['text'], data['entities'])
+        yield data
+
+
 def process_spaces_jsonl(input_file_path: str) -> None:
     """
     Обрабатывает JSONL-файл, корректируя пробелы в сущностях.
@@ -61,20 +77,4 @@ def process_spaces_jsonl(input_file_path: str) -> None:
         - 'text': текст записи
         - 'entities': список сущностей
     """
-    with open(input_file_path, 'r', encoding='utf-8') as file:
-        lines = file.readlines()
-
-    output_data = []
-
-    for line in lines:
-        data = json.loads(line.strip())
-        text = data['text']
-        entities = data['entities']
-        corrected_entities = correct_offsets(text, entities)
-
-        data['entities'] = corrected_entities
-        output_data.append(data)
-
-    with open(input_file_path, 'w', encoding='utf-8') as output_file:
-        for data in output_data:
-            output_file.write(json.dumps(data, ensure_ascii=False) + '\n')
+    run_pipeline(input_file_path, [process_spaces_records])
@@ -0,0 +1,430 @@
+"""
+Модуль матричной оценки нескольких вакансий по нескольким резюме.
+Каждый документ обрабатывается моделью один раз, а сходство всех пар
+вакансия-резюме считается матричными операциями по каждой метке.
+Сходство по меткам хранится без весов, поэтому веса меток можно менять
+без повторного расчета: общая близость - векторная свертка по меткам.
+"""
+
+import argparse
+import os
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from similarity import (
+    BATCH_SIZE,
+    TAG_WEIGHTS,
+    count_similarity_matrix,
+    extract_entities,
+    read_text,
+    vectorize_entities
+)
+
+# Максимальное количество сущностей резюме в одном блоке матрицы сходства
+RESUME_BLOCK_SIZE = 20000
+
+
+def _flatten_label(
+    documents: Sequence[Dict[str, Set[str]]],
+    label: str
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Собирает сущности одной метки из всех документов в общий список.
+
+    Args:
+        documents (Sequence[Dict[str, Set[str]]]): Сущности документов.
+        label (str): Метка.
+
+    Returns:
+        Tuple[List[str], np.ndarray]: Сущности всех документов подряд и
+            количество сущностей каждого документа.
+    """
+    entity_list = []
+    counts = np.zeros(len(documents), dtype=np.int64)
+    for idx, entities in enumerate(documents):
+        values = entities.get(label, ())
+        entity_list.extend(values)
+        counts[idx] = len(values)
+    return entity_list, counts
+
+
+def _group_max(similarity: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Берет максимум сходства по столбцам каждой группы сущностей резюме.
+
+    Args:
+        similarity (np.ndarray): Матрица сходства (сущности вакансий, сущности резюме).
+        counts (np.ndarray): Количество столбцов каждого резюме.
+
+    Returns:
+        np.ndarray: Матрица (сущности вакансий, резюме); для резюме без
+            сущностей метки сходство равно нулю.
+    """
+    result = np.zeros((similarity.shape[0], len(counts)))
+    non_empty = counts > 0
+    if similarity.shape[0] and non_empty.any():
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[non_empty]
+        result[:, non_empty] = np.maximum.reduceat(similarity, starts, axis=1)
+    return result
+
+
+def _resume_blocks(counts: np.ndarray, block_size: int) -> List[Tuple[int, int]]:
+    """
+    Делит резюме на блоки с ограниченным суммарным количеством сущностей.
+
+    Args:
+        counts (np.ndarray): Количество сущностей каждого резюме.
+        block_size (int): Максимальное количество сущностей в блоке.
+
+    Returns:
+        List[Tuple[int, int]]: Границы блоков по индексам резюме.
+    """
+    blocks = []
+    start = 0
+    total = 0
+    for idx, count in enumerate(counts):
+        if total and total + count > block_size:
+            blocks.append((start, idx))
+            start, total = idx, 0
+        total += count
+    blocks.append((start, len(counts)))
+    return blocks
+
+
+def label_score_matrix(
+    vacancy_entities: Sequence[Dict[str, Set[str]]],
+    resume_entities: Sequence[Dict[str, Set[str]]],
+    block_size: int = RESUME_BLOCK_SIZE
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Рассчитывает сходство всех пар вакансия-резюме по каждой метке без весов.
+
+    Args:
+        vacancy_entities (Sequence[Dict[str, Set[str]]]): Сущности N вакансий.
+        resume_entities (Sequence[Dict[str, Set[str]]]): Сущности M резюме.
+        block_size (int): Максимальное количество сущностей резюме,
+            обрабатываемых за один шаг; ограничивает объем памяти.
+
+    Returns:
+        Tuple[List[str], np.ndarray]: L меток, встречающихся в вакансиях, и
+            матрица N×M×L средних максимальных сходств сущностей. Для вакансий
+            без метки значения этой метки равны NaN.
+    """
+    n_vacancies, n_resumes = len(vacancy_entities), len(resume_entities)
+    labels = sorted({
+        label
+        for entities in vacancy_entities
+        for label, values in entities.items()
+        if values
+    })
+
+    label_scores = np.full((n_vacancies, n_resumes, len(labels)), np.nan)
+    for label_idx, label in enumerate(labels):
+        vacancy_list, vacancy_counts = _flatten_label(vacancy_entities, label)
+        resume_list, resume_counts = _flatten_label(resume_entities, label)
+        counts = vectorize_entities([*vacancy_list, *resume_list])
+        vacancy_matrix = counts[:len(vacancy_list)]
+        resume_matrix = counts[len(vacancy_list):]
+
+        has_label = vacancy_counts > 0
+        vacancy_starts = np.concatenate(([0], np.cumsum(vacancy_counts)[:-1]))[has_label]
+        resume_offsets = np.concatenate(([0], np.cumsum(resume_counts)))
+
+        for block_start, block_end in _resume_blocks(resume_counts, block_size):
+            similarity = count_similarity_matrix(
+                vacancy_matrix,
+                resume_matrix[resume_offsets[block_start]:resume_offsets[block_end]]
+            )
+            max_similarity = _group_max(similarity, resume_counts[block_start:block_end])
+            entity_similarity = (
+                np.add.reduceat(max_similarity, vacancy_starts, axis=0)
+                / vacancy_counts[has_label][:, None]
+            )
+            label_scores[has_label, block_start:block_end, label_idx] = entity_similarity
+    return labels, label_scores
+
+
+def weight_vector(
+    labels: Sequence[str],
+    weights: Optional[Dict[str, float]] = None
+) -> np.ndarray:
+    """
+    Собирает веса меток в вектор в порядке labels.
+
+    Args:
+        labels (Sequence[str]): Метки.
+        weights (Optional[Dict[str, float]]): Веса меток; для меток без веса
+            используется TAG_WEIGHTS.
+
+    Returns:
+        np.ndarray: Вектор весов длины len(labels).
+    """
+    weights = weights or {}
+    return np.array(
+        [weights.get(label, TAG_WEIGHTS.get(label, 1.0)) for label in labels],
+        dtype=np.float64
+    )
+
+
+def apply_weights(
+    label_scores: np.ndarray,
+    labels: Sequence[str],
+    weights: Optional[Dict[str, float]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Взвешивает сходство по меткам и сворачивает его в общую близость.
+
+    Сходство метки умножается на ее вес и ограничивается единицей, общая
+    близость - среднее по меткам вакансии, как в calculate_cosine_similarity
+    и calculate_average_similarity.
+
+    Args:
+        label_scores (np.ndarray): Сходство без весов формы (..., L); NaN - метки нет в вакансии.
+        labels (Sequence[str]): L меток в порядке последней оси.
+        weights (Optional[Dict[str, float]]): Веса меток. По умолчанию TAG_WEIGHTS.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Общая близость формы (...) и взвешенное
+            сходство по меткам формы (..., L).
+    """
+    weighted = np.minimum(label_scores * weight_vector(labels, weights), 1.0)
+    present = ~np.isnan(weighted)
+    total = np.where(present, weighted, 0.0).sum(axis=-1) / np.maximum(1, present.sum(axis=-1))
+    return total, weighted
+
+
+def score_matrix(
+    vacancy_entities: Sequence[Dict[str, Set[str]]],
+    resume_entities: Sequence[Dict[str, Set[str]]],
+    weights: Optional[Dict[str, float]] = None,
+    block_size: int = RESUME_BLOCK_SIZE
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Рассчитывает сходство всех пар вакансия-резюме.
+
+    Значения совпадают с calculate_cosine_similarity и
+    calculate_average_similarity для каждой пары по отдельности.
+
+    Args:
+        vacancy_entities (Sequence[Dict[str, Set[str]]]): Сущности N вакансий.
+        resume_entities (Sequence[Dict[str, Set[str]]]): Сущности M резюме.
+        weights (Optional[Dict[str, float]]): Веса меток. По умолчанию TAG_WEIGHTS.
+        block_size (int): Максимальное количество сущностей резюме,
+            обрабатываемых за один шаг; ограничивает объем памяти.
+
+    Returns:
+        Tuple[np.ndarray, Dict[str, np.ndarray]]: Матрица общей близости N×M и
+            матрицы взвешенного сходства N×M по каждой метке. Для вакансий без
+            метки значения этой метки равны NaN.
+    """
+    labels, label_scores = label_score_matrix(vacancy_entities, resume_entities, block_size)
+    total, weighted = apply_weights(label_scores, labels, weights)
+    return total, {label: weighted[:, :, idx] for idx, label in enumerate(labels)}
+
+
+def _collect_paths(paths: Sequence[str]) -> List[str]:
+    """
+    Раскрывает папки в списки .txt файлов.
+
+    Args:
+        paths (Sequence[str]): Пути к файлам и папкам.
+
+    Returns:
+        List[str]: Пути к файлам.
+    """
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            result.extend(
+                os.path.join(path, file_name)
+                for file_name in sorted(os.listdir(path))
+                if file_name.endswith('.txt')
+            )
+        else:
+            result.append(path)
+    return result
+
+
+def file_label_scores(
+    vacancy_paths: Sequence[str],
+    resume_paths: Sequence[str],
+    batch_size: int = BATCH_SIZE,
+    n_process: Optional[int] = None
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Извлекает сущности всех вакансий и резюме за один проход и рассчитывает
+    сходство всех пар по меткам без весов.
+
+    Args:
+        vacancy_paths (Sequence[str]): Пути к файлам вакансий.
+        resume_paths (Sequence[str]): Пути к файлам резюме.
+        batch_size (int): Размер пакета документов для nlp.pipe.
+        n_process (Optional[int]): Количество процессов для nlp.pipe.
+
+    Returns:
+        Tuple[List[str], np.ndarray]: Метки и матрица вакансии×резюме×метки.
+    """
+    texts = [read_text(path) for path in (*vacancy_paths, *resume_paths)]
+    entities = extract_entities(texts, batch_size=batch_size, n_process=n_process)
+    return label_score_matrix(entities[:len(vacancy_paths)], entities[len(vacancy_paths):])
+
+
+def score_files(
+    vacancy_paths: Sequence[str],
+    resume_paths: Sequence[str],
+    weights: Optional[Dict[str, float]] = None,
+    batch_size: int = BATCH_SIZE,
+    n_process: Optional[int] = None
+) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """
+    Извлекает сущности всех вакансий и резюме за один проход и оценивает все пары.
+
+    Args:
+        vacancy_paths (Sequence[str]): Пути к файлам вакансий.
+        resume_paths (Sequence[str]): Пути к файлам резюме.
+        weights (Optional[Dict[str, float]]): Веса меток. По умолчанию TAG_WEIGHTS.
+        batch_size (int): Размер пакета документов для nlp.pipe.
+        n_process (Optional[int]): Количество процессов для nlp.pipe.
+
+    Returns:
+        Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]: Матрица общей близости и
+            матрицы взвешенного сходства по меткам; строки - вакансии, столбцы - резюме.
+    """
+    labels, label_scores = file_label_scores(
+        vacancy_paths,
+        resume_paths,
+        batch_size=batch_size,
+        n_process=n_process
+    )
+    total, weighted = apply_weights(label_scores, labels, weights)
+
+    def to_frame(matrix: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(matrix, index=list(vacancy_paths), columns=list(resume_paths))
+
+    return to_frame(total), {label: to_frame(weighted[:, :, idx]) for idx, label in enumerate(labels)}
+
+
+def save_label_scores(
+    file_path: str,
+    vacancy_paths: Sequence[str],
+    resume_paths: Sequence[str],
+    labels: Sequence[str],
+    label_scores: np.ndarray
+) -> None:
+    """
+    Сохраняет сходство по меткам без весов в NPZ файл.
+
+    Args:
+        file_path (str): Путь к NPZ файлу.
+        vacancy_paths (Sequence[str]): Пути к файлам вакансий.
+        resume_paths (Sequence[str]): Пути к файлам резюме.
+        labels (Sequence[str]): Метки.
+        label_scores (np.ndarray): Матрица вакансии×резюме×метки.
+    """
+    np.savez_compressed(
+        file_path,
+        vacancies=np.array(vacancy_paths),
+        resumes=np.array(resume_paths),
+        labels=np.array(labels),
+        label_scores=label_scores
+    )
+
+
+def load_label_scores(file_path: str) -> Tuple[List[str], List[str], List[str], np.ndarray]:
+    """
+    Загружает сходство по меткам, сохраненное save_label_scores.
+
+    Args:
+        file_path (str): Путь к NPZ файлу.
+
+    Returns:
+        Tuple[List[str], List[str], List[str], np.ndarray]: Пути вакансий,
+            пути резюме, метки и матрица вакансии×резюме×метки.
+    """
+    with np.load(file_path) as data:
+        return (
+            data['vacancies'].tolist(),
+            data['resumes'].tolist(),
+            data['labels'].tolist(),
+            data['label_scores']
+        )
+
+
+def parse_weights(values: Sequence[str]) -> Dict[str, float]:
+    """
+    Разбирает веса меток из аргументов вида 'Метка=вес'.
+
+    Args:
+        values (Sequence[str]): Аргументы командной строки.
+
+    Returns:
+        Dict[str, float]: Веса меток.
+
+    Raises:
+        ValueError: Если аргумент имеет неверный формат или метка неизвестна.
+    """
+    weights = {}
+    for value in values:
+        label, separator, weight = value.partition('=')
+        if not separator:
+            raise ValueError(f"Вес должен быть задан как Метка=вес: {value}")
+        if label not in TAG_WEIGHTS:
+            raise ValueError(f"Неизвестная метка: {label}")
+        weights[label] = float(weight)
+    return weights
+
+
+def main() -> None:
+    """
+    Оценивает все пары вакансия-резюме и сохраняет матрицы на диск.
+    """
+    parser = argparse.ArgumentParser(description='Матричная оценка вакансий и резюме')
+    parser.add_argument('--vacancies', nargs='+', default=None,
+                        help='Файлы вакансий или папки с .txt вакансиями')
+    parser.add_argument('--resumes', nargs='+', default=None,
+                        help='Файлы резюме или папки с .txt резюме')
+    parser.add_argument('--rerank', default=None,
+                        help='NPZ файл из --labels-output: пересчитать близость с новыми весами без NLP')
+    parser.add_argument('--weight', action='append', default=[], metavar='LABEL=WEIGHT',
+                        help='Вес метки вместо TAG_WEIGHTS; можно указать несколько раз')
+    parser.add_argument('--output', default='similarity_matrix.csv',
+                        help='CSV файл с матрицей общей близости')
+    parser.add_argument('--labels-output', default=None,
+                        help='NPZ файл со сходством по меткам без весов')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--n-process', type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        weights = parse_weights(args.weight)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.rerank:
+        vacancy_paths, resume_paths, labels, label_scores = load_label_scores(args.rerank)
+    elif args.vacancies and args.resumes:
+        vacancy_paths = _collect_paths(args.vacancies)
+        resume_paths = _collect_paths(args.resumes)
+        labels, label_scores = file_label_scores(
+            vacancy_paths,
+            resume_paths,
+            batch_size=args.batch_size,
+            n_process=args.n_process
+        )
+    else:
+        parser.error('нужны --vacancies и --resumes или --rerank')
+
+    total, _ = apply_weights(label_scores, labels, weights)
+    total = pd.DataFrame(total, index=vacancy_paths, columns=resume_paths)
+    total.to_csv(args.output)
+    print(f"Матрица {total.shape[0]}×{total.shape[1]} сохранена в {args.output}")
+
+    if args.labels_output:
+        save_label_scores(args.labels_output, vacancy_paths, resume_paths, labels, label_scores)
+        print(f"Матрицы по меткам сохранены в {args.labels_output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Модуль инвертированного индекса резюме.
+Хранит извлеченные сущности резюме и для каждой метки сопоставляет термины
+сущностей с резюме, в которых они встречаются. Поиск лучших резюме для
+вакансии оценивает только кандидатов, у которых есть общие с вакансией термины.
+"""
+
+import heapq
+import json
+import os
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from matrix_scoring import score_matrix
+from similarity import BATCH_SIZE, TOKEN_PATTERN, extract_entities, read_text
+
+_TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+
+def entity_tokens(entities: Iterable[str]) -> Set[str]:
+    """
+    Разбивает сущности на нормализованные термины.
+
+    Термины совпадают с терминами TF-IDF сравнения сущностей, поэтому резюме
+    без общих с вакансией терминов имеют нулевое сходство и не являются кандидатами.
+
+    Args:
+        entities (Iterable[str]): Тексты сущностей.
+
+    Returns:
+        Set[str]: Множество терминов.
+    """
+    tokens = set()
+    for entity in entities:
+        tokens.update(_TOKEN_RE.findall(entity.lower()))
+    return tokens
+
+
+class ResumeIndex:
+    """
+    Инвертированный индекс резюме по меткам и терминам сущностей.
+    """
+
+    def __init__(self) -> None:
+        """
+        Создает пустой индекс.
+        """
+        self._postings: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        self._entities: Dict[str, Dict[str, Set[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __contains__(self, resume_id: str) -> bool:
+        return resume_id in self._entities
+
+    def add(self, resume_id: str, entities: Dict[str, Set[str]]) -> None:
+        """
+        Добавляет резюме в индекс. Ранее добавленное резюме с тем же
+        идентификатором заменяется.
+
+        Args:
+            resume_id (str): Идентификатор резюме.
+            entities (Dict[str, Set[str]]): Сущности резюме.
+        """
+        if resume_id in self._entities:
+            self.remove(resume_id)
+
+        self._entities[resume_id] = entities
+        for label, values in entities.items():
+            label_postings = self._postings[label]
+            for token in entity_tokens(values):
+                label_postings[token].add(resume_id)
+
+    def remove(self, resume_id: str) -> None:
+        """
+        Удаляет резюме из индекса.
+
+        Args:
+            resume_id (str): Идентификатор резюме.
+
+        Raises:
+            KeyError: Если резюме нет в индексе.
+        """
+        entities = self._entities.pop(resume_id)
+        for label, values in entities.items():
+            label_postings = self._postings[label]
+            for token in entity_tokens(values):
+                postings = label_postings[token]
+                postings.discard(resume_id)
+                if not postings:
+                    del label_postings[token]
+            if not label_postings:
+                del self._postings[label]
+
+    def add_folder(
+        self,
+        resume_folder: str,
+        batch_size: int = BATCH_SIZE,
+        n_process: Optional[int] = None
+    ) -> None:
+        """
+        Добавляет в индекс все .txt резюме из папки. Идентификатором резюме
+        служит имя файла.
+
+        Args:
+            resume_folder (str): Путь к папке с резюме.
+            batch_size (int): Размер пакета документов для nlp.pipe.
+            n_process (Optional[int]): Количество процессов для nlp.pipe.
+        """
+        resume_files = sorted(
+            resume_file for resume_file in os.listdir(resume_folder)
+            if resume_file.endswith('.txt')
+        )
+        resume_texts = [
+            read_text(os.path.join(resume_folder, resume_file))
+            for resume_file in resume_files
+        ]
+        resume_entities = extract_entities(
+            resume_texts,
+            batch_size=batch_size,
+            n_process=n_process
+        )
+        for resume_file, entities in zip(resume_files, resume_entities):
+            self.add(resume_file, entities)
+
+    def candidates(self, vacancy_entities: Dict[str, Set[str]]) -> Set[str]:
+        """
+        Находит резюме, у которых хотя бы в одной метке есть общий с вакансией термин.
+
+        Args:
+            vacancy_entities (Dict[str, Set[str]]): Сущности вакансии.
+
+        Returns:
+            Set[str]: Идентификаторы резюме-кандидатов.
+        """
+        found = set()
+        for label, values in vacancy_entities.items():
+            label_postings = self._postings.get(label)
+            if not label_postings:
+                continue
+            for token in entity_tokens(values):
+                found.update(label_postings.get(token, ()))
+        return found
+
+    def query(
+        self,
+        vacancy_entities: Dict[str, Set[str]],
+        top_k: int = 10
+    ) -> List[Tuple[str, float]]:
+        """
+        Возвращает наиболее похожие на вакансию резюме.
+
+        Args:
+            vacancy_entities (Dict[str, Set[str]]): Сущности вакансии.
+            top_k (int): Количество возвращаемых резюме.
+
+        Returns:
+            List[Tuple[str, float]]: Идентификаторы резюме и значения общей
+                близости по убыванию близости.
+        """
+        candidates = sorted(self.candidates(vacancy_entities))
+        if not candidates:
+            return []
+
+        total, _ = score_matrix(
+            [vacancy_entities],
+            [self._entities[resume_id] for resume_id in candidates]
+        )
+        scored = zip(candidates, total[0].tolist())
+        return heapq.nlargest(top_k, scored, key=lambda item: item[1])
+
+    def save(self, index_path: str) -> None:
+        """
+        Сохраняет сущности проиндексированных резюме в JSON файл.
+
+        Args:
+            index_path (str): Путь к файлу индекса.
+        """
+        data = {
+            resume_id: {label: sorted(values) for label, values in entities.items()}
+            for resume_id, entities in self._entities.items()
+        }
+        with open(index_path, 'w', encoding='utf-8') as index_file:
+            json.dump(data, index_file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, index_path: str) -> 'ResumeIndex':
+        """
+        Загружает индекс из JSON файла, созданного методом save.
+
+        Args:
+            index_path (str): Путь к файлу индекса.
+
+        Returns:
+            ResumeIndex: Восстановленный индекс.
+        """
+        with open(index_path, 'r', encoding='utf-8') as index_file:
+            data = json.load(index_file)
+
+        index = cls()
+        for resume_id, entities in data.items():
+            index.add(resume_id, {label: set(values) for label, values in entities.items()})
+        return index
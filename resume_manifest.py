@@ -0,0 +1,134 @@
+"""
+Модуль манифеста папки резюме для инкрементальной оценки.
+Хранит для каждого файла время изменения, размер, хэш содержимого,
+извлеченные сущности и последние оценки, а также отпечатки модели и вакансии,
+по которым эти данные были получены.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, NamedTuple, Optional, Set
+
+from atomic_write import atomic_open
+
+# Путь к манифесту по умолчанию
+DEFAULT_MANIFEST_PATH = '.resume_manifest.json'
+
+# Версия формата манифеста; манифест другой версии не используется
+MANIFEST_VERSION = 1
+
+
+class ManifestEntry(NamedTuple):
+    """
+    Сохраненное состояние одного файла резюме.
+    """
+    mtime_ns: int
+    size: int
+    hash: str
+    entities: Dict[str, Set[str]]
+    label_scores: Dict[str, float]
+    score: float
+
+
+def entities_hash(entities: Dict[str, Set[str]]) -> str:
+    """
+    Рассчитывает хэш набора сущностей, не зависящий от порядка.
+
+    Args:
+        entities (Dict[str, Set[str]]): Словарь с метками и множествами сущностей.
+
+    Returns:
+        str: Шестнадцатеричный хэш SHA-256.
+    """
+    data = json.dumps(
+        {label: sorted(values) for label, values in entities.items() if values},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class ResumeManifest:
+    """
+    Манифест папки резюме.
+
+    Записи действительны только для модели с отпечатком model, оценки - только
+    для вакансии с хэшем сущностей vacancy_hash.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        vacancy_hash: Optional[str] = None,
+        entries: Optional[Dict[str, ManifestEntry]] = None
+    ) -> None:
+        self.model = model
+        self.vacancy_hash = vacancy_hash
+        self.entries: Dict[str, ManifestEntry] = entries or {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def save(self, manifest_path: str) -> None:
+        """
+        Атомарно сохраняет манифест в JSON файл.
+
+        Args:
+            manifest_path (str): Путь к файлу манифеста.
+        """
+        data = {
+            'version': MANIFEST_VERSION,
+            'model': self.model,
+            'vacancy_hash': self.vacancy_hash,
+            'files': {
+                name: {
+                    'mtime_ns': entry.mtime_ns,
+                    'size': entry.size,
+                    'hash': entry.hash,
+                    'entities': {label: sorted(values) for label, values in entry.entities.items()},
+                    'labels': entry.label_scores,
+                    'score': entry.score
+                }
+                for name, entry in sorted(self.entries.items())
+            }
+        }
+
+        with atomic_open(manifest_path) as manifest_file:
+            json.dump(data, manifest_file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, manifest_path: str, model: str) -> 'ResumeManifest':
+        """
+        Загружает манифест из JSON файла.
+
+        Если файла нет, он другой версии или создан другой моделью,
+        возвращается пустой манифест.
+
+        Args:
+            manifest_path (str): Путь к файлу манифеста.
+            model (str): Отпечаток текущей модели.
+
+        Returns:
+            ResumeManifest: Загруженный или пустой манифест.
+        """
+        if not os.path.exists(manifest_path):
+            return cls(model)
+
+        with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+            data = json.load(manifest_file)
+        if data.get('version') != MANIFEST_VERSION or data.get('model') != model:
+            return cls(model)
+
+        entries = {
+            name: ManifestEntry(
+                entry['mtime_ns'],
+                entry['size'],
+                entry['hash'],
+                {label: set(values) for label, values in entry['entities'].items()},
+                entry['labels'],
+                entry['score']
+            )
+            for name, entry in data['files'].items()
+        }
+        return cls(model, data.get('vacancy_hash'), entries)
@@ -0,0 +1,435 @@
+"""
+Локальный сервис оценки резюме.
+Держит модель SpaCy загруженной, объединяет одновременные запросы в
+микропакеты для nlp.pipe и отдает метрики очереди и задержек.
+
+Запуск из корня репозитория:
+    python scoring_service.py --port 8765
+
+Эндпоинты:
+    POST /entities  {"texts": [...]}                           -> {"entities": [...]}
+    POST /score     {"vacancy": "...", "resumes": [{"name": "...", "text": "..."}]}
+    GET  /metrics   метрики очереди, пакетов и задержек
+    GET  /health
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set
+
+import similarity
+from instrumentation import StageStats
+from similarity import (
+    BATCH_SIZE,
+    calculate_average_similarity,
+    calculate_cosine_similarity,
+    extract_entities,
+    get_nlp
+)
+
+# Адрес сервиса по умолчанию
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+
+# Сколько ждать следующих запросов после первого запроса в пакете, в секундах
+MAX_WAIT = 0.01
+
+
+class _Request(NamedTuple):
+    """
+    Запрос на извлечение сущностей, ожидающий в очереди.
+    """
+    texts: List[str]
+    future: Future
+    enqueued: float
+
+
+class MicroBatcher:
+    """
+    Объединяет тексты одновременных запросов в пакеты для nlp.pipe.
+
+    Пакет обрабатывается, когда в нем набралось max_batch_size текстов или
+    с момента поступления первого запроса прошло max_wait секунд. Модель
+    вызывается из одного рабочего потока.
+    """
+
+    def __init__(self, max_batch_size: int = BATCH_SIZE, max_wait: float = MAX_WAIT) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: 'queue.Queue[Optional[_Request]]' = queue.Queue()
+        self._lock = threading.Lock()
+        self._queue_wait = StageStats()
+        self._batch_latency = StageStats()
+        self._requests = 0
+        self._texts = 0
+        self._batches = 0
+        self._errors = 0
+        self._max_queue_depth = 0
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        """
+        Ставит тексты в очередь на извлечение сущностей.
+
+        Args:
+            texts (Sequence[str]): Тексты документов.
+
+        Returns:
+            Future: Результат - список сущностей в порядке текстов.
+        """
+        future: Future = Future()
+        self._queue.put(_Request(list(texts), future, time.perf_counter()))
+        with self._lock:
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return future
+
+    def close(self) -> None:
+        """
+        Останавливает рабочий поток после обработки уже поставленных запросов.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first: _Request) -> List[Optional[_Request]]:
+        """
+        Собирает пакет запросов, начиная с первого.
+
+        Args:
+            first (_Request): Первый запрос пакета.
+
+        Returns:
+            List[Optional[_Request]]: Запросы пакета; None в конце означает остановку.
+        """
+        batch: List[Optional[_Request]] = [first]
+        n_texts = len(first.texts)
+        deadline = time.perf_counter() + self.max_wait
+        while n_texts < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(request)
+            if request is None:
+                break
+            n_texts += len(request.texts)
+        return batch
+
+    def _run(self) -> None:
+        """
+        Цикл рабочего потока: собирает пакеты и извлекает из них сущности.
+        """
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._collect(first)
+            stop = batch[-1] is None
+            requests = [request for request in batch if request is not None]
+            texts = [text for request in requests for text in request.texts]
+
+            started = time.perf_counter()
+            try:
+                entities = extract_entities(texts, batch_size=self.max_batch_size, n_process=1)
+            except Exception as exc:
+                with self._lock:
+                    self._errors += len(requests)
+                for request in requests:
+                    request.future.set_exception(exc)
+            else:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._batches += 1
+                    self._requests += len(requests)
+                    self._texts += len(texts)
+                    self._batch_latency.observe(finished - started)
+                    for request in requests:
+                        self._queue_wait.observe(started - request.enqueued)
+
+                offset = 0
+                for request in requests:
+                    request.future.set_result(entities[offset:offset + len(request.texts)])
+                    offset += len(request.texts)
+
+            if stop:
+                return
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Возвращает метрики очереди и пакетов.
+
+        Returns:
+            Dict[str, Any]: Глубина очереди, количество пакетов и задержки.
+        """
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self._max_queue_depth,
+                'requests': self._requests,
+                'texts': self._texts,
+                'batches': self._batches,
+                'errors': self._errors,
+                'mean_batch_size': self._texts / self._batches if self._batches else 0.0,
+                'queue_wait': self._queue_wait.to_dict(),
+                'batch_latency': self._batch_latency.to_dict()
+            }
+
+
+def entities_to_json(entity_text: Dict[str, Set[str]]) -> Dict[str, List[str]]:
+    """
+    Преобразует сущности документа в JSON-совместимый вид.
+
+    Args:
+        entity_text (Dict[str, Set[str]]): Словарь с метками и множествами сущностей.
+
+    Returns:
+        Dict[str, List[str]]: Словарь с метками и отсортированными списками сущностей.
+    """
+    return {label: sorted(values) for label, values in entity_text.items()}
+
+
+def entities_from_json(entity_json: Dict[str, List[str]]) -> Dict[str, Set[str]]:
+    """
+    Восстанавливает сущности документа из JSON.
+
+    Args:
+        entity_json (Dict[str, List[str]]): Словарь с метками и списками сущностей.
+
+    Returns:
+        Dict[str, Set[str]]: Словарь с метками и множествами сущностей.
+    """
+    return {label: set(values) for label, values in entity_json.items()}
+
+
+class ScoringService:
+    """
+    Обработчик запросов сервиса поверх MicroBatcher.
+    """
+
+    def __init__(self, batcher: MicroBatcher) -> None:
+        self.batcher = batcher
+        self._lock = threading.Lock()
+        self._latency: Dict[str, StageStats] = {}
+
+    def _observe(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._latency.get(endpoint)
+            if stats is None:
+                stats = self._latency[endpoint] = StageStats()
+            stats.observe(seconds)
+
+    def entities(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Извлекает сущности из текстов запроса.
+
+        Args:
+            payload (Dict[str, Any]): Тело запроса с ключом 'texts'.
+
+        Returns:
+            Dict[str, Any]: Сущности каждого текста.
+        """
+        texts = payload['texts']
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise ValueError("'texts' должен быть списком строк")
+        started = time.perf_counter()
+        entities = self.batcher.submit(texts).result()
+        self._observe('entities', time.perf_counter() - started)
+        return {'entities': [entities_to_json(entity_text) for entity_text in entities]}
+
+    def score(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Оценивает резюме запроса по вакансии.
+
+        Args:
+            payload (Dict[str, Any]): Тело запроса с ключами 'vacancy' (текст) и
+                'resumes' (список {'name', 'text'}).
+
+        Returns:
+            Dict[str, Any]: Сущности вакансии и оценки резюме в порядке запроса.
+        """
+        vacancy = payload['vacancy']
+        resumes = payload['resumes']
+        if not isinstance(vacancy, str) or not isinstance(resumes, list):
+            raise ValueError("'vacancy' должен быть строкой, 'resumes' - списком")
+
+        started = time.perf_counter()
+        texts = [vacancy, *(resume['text'] for resume in resumes)]
+        vacancy_entities, *resume_entities = self.batcher.submit(texts).result()
+
+        results = []
+        for idx, (resume, entity_text) in enumerate(zip(resumes, resume_entities)):
+            similarity_dict = calculate_cosine_similarity(vacancy_entities, entity_text)
+            results.append({
+                'name': resume.get('name', str(idx)),
+                'score': calculate_average_similarity(similarity_dict),
+                'labels': similarity_dict
+            })
+        self._observe('score', time.perf_counter() - started)
+        return {'vacancy_entities': entities_to_json(vacancy_entities), 'results': results}
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Возвращает метрики сервиса.
+
+        Returns:
+            Dict[str, Any]: Метрики очереди и задержки запросов по эндпоинтам.
+        """
+        with self._lock:
+            latency = {endpoint: stats.to_dict() for endpoint, stats in self._latency.items()}
+        return {**self.batcher.metrics(), 'request_latency': latency}
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP обработчик сервиса. Сервис доступен как self.server.service.
+    """
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/metrics':
+            self._send_json(200, self.server.service.metrics())
+        else:
+            self._send_json(404, {'error': f'Неизвестный путь: {self.path}'})
+
+    def do_POST(self) -> None:
+        handlers = {
+            '/entities': self.server.service.entities,
+            '/score': self.server.service.score
+        }
+        handler = handlers.get(self.path)
+        if handler is None:
+            self._send_json(404, {'error': f'Неизвестный путь: {self.path}'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+            response = handler(payload)
+        except (KeyError, TypeError, ValueError) as exc:
+            self._send_json(400, {'error': f'Некорректный запрос: {exc}'})
+            return
+        except Exception as exc:
+            self._send_json(500, {'error': str(exc)})
+            return
+        self._send_json(200, response)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Журнал каждого запроса отключен: метрики доступны через /metrics
+        pass
+
+
+class ScoringClient:
+    """
+    Клиент сервиса оценки для Streamlit и пакетных заданий.
+    """
+
+    def __init__(self, url: str = f'http://{SERVICE_HOST}:{SERVICE_PORT}', timeout: float = 300.0) -> None:
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        data = None if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(
+            self.url + path,
+            data=data,
+            headers={'Content-Type': 'application/json; charset=utf-8'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as exc:
+            message = json.loads(exc.read().decode('utf-8')).get('error', exc.reason)
+            raise RuntimeError(f'Сервис оценки вернул {exc.code}: {message}') from exc
+
+    def entities(self, texts: Sequence[str]) -> List[Dict[str, Set[str]]]:
+        """
+        Извлекает сущности из текстов.
+
+        Args:
+            texts (Sequence[str]): Тексты документов.
+
+        Returns:
+            List[Dict[str, Set[str]]]: Сущности каждого документа.
+        """
+        response = self._request('/entities', {'texts': list(texts)})
+        return [entities_from_json(entity_json) for entity_json in response['entities']]
+
+    def score(self, vacancy: str, resumes: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Оценивает резюме по вакансии.
+
+        Args:
+            vacancy (str): Текст вакансии.
+            resumes (Dict[str, str]): Имена и тексты резюме.
+
+        Returns:
+            List[Dict[str, Any]]: Оценки резюме ('name', 'score', 'labels').
+        """
+        response = self._request('/score', {
+            'vacancy': vacancy,
+            'resumes': [{'name': name, 'text': text} for name, text in resumes.items()]
+        })
+        return response['results']
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Возвращает метрики сервиса.
+
+        Returns:
+            Dict[str, Any]: Метрики очереди и задержек.
+        """
+        return self._request('/metrics')
+
+
+def main() -> None:
+    """
+    Загружает модель и запускает HTTP сервис.
+    """
+    parser = argparse.ArgumentParser(description='Сервис оценки резюме')
+    parser.add_argument('--host', default=SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    parser.add_argument('--model', default=similarity.MODEL_PATH)
+    parser.add_argument('--max-batch-size', type=int, default=BATCH_SIZE,
+                        help='Максимальное количество текстов в пакете')
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT * 1000,
+                        help='Ожидание следующих запросов для пакета, мс')
+    args = parser.parse_args()
+
+    similarity.MODEL_PATH = args.model
+    get_nlp()
+
+    batcher = MicroBatcher(args.max_batch_size, args.max_wait_ms / 1000)
+    server = ThreadingHTTPServer((args.host, args.port), ScoringRequestHandler)
+    server.service = ScoringService(batcher)
+    print(f"Сервис оценки запущен на http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+
+
+if __name__ == '__main__':
+    main()
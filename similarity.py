@@ -3,18 +3,88 @@
 Использует SpaCy для извлечения именованных сущностей и косинусное сходство для их сравнения.
 """
 
+import argparse
+import atexit
+import csv
+import gc
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
 import os
-from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+import shutil
+import threading
+from collections import defaultdict, deque
+from typing import (
+    TYPE_CHECKING, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set,
+    Tuple, TypeVar
+)
 
+import numpy as np
 import pandas as pd
 import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
 
+import instrumentation
+from chunking import MAX_CHUNK_CHARS, merge_chunk_docs, pipe_chunks
+from dedup import (
+    DUPLICATES_PATH, NEAR_DUPLICATE_THRESHOLD, Deduplicator, DuplicateMatch, write_duplicate_report
+)
+from entity_cache import EntityCache, model_fingerprint, text_hash
+from resume_manifest import DEFAULT_MANIFEST_PATH, ManifestEntry, ResumeManifest, entities_hash
+from skill_gazetteer import GAZETTEER_PATH, SKILL_MODES, SkillMatcher, load_gazetteer, merge_entities
 
-# Загрузка предобученной модели SpaCy
-nlp = spacy.load('nlp_model')
+if TYPE_CHECKING:
+    from doc_store import DocStore
+
+
+# Путь к обученной модели SpaCy
+MODEL_PATH = 'nlp_model'
+
+# Фабрики компонентов, которые формируют doc.ents
+NER_FACTORIES = ('ner', 'beam_ner', 'entity_ruler')
+
+# Фабрики общих векторизаторов, которые могут слушать компоненты NER
+TOK2VEC_FACTORIES = ('tok2vec', 'transformer')
+
+T = TypeVar('T')
+
+# Модель SpaCy, загружается при первом обращении
+_nlp: Optional[spacy.Language] = None
+_nlp_lock = threading.Lock()
+
+# Дисковый кэш сущностей, создается при первом обращении
+_entity_cache: Optional[EntityCache] = None
+
+# Хранилище обработанных документов (см. configure_doc_store); None - документы
+# после извлечения сущностей не сохраняются
+_doc_store: Optional['DocStore'] = None
+
+# Режим извлечения навыков (см. SKILL_MODES) и словарь навыков для режимов
+# 'rules' и 'both'
+_skill_mode = 'ner'
+_skill_matcher: Optional[SkillMatcher] = None
+
+# Размер пакета документов для nlp.pipe
+BATCH_SIZE = 64
+
+# Количество пакетов на один процесс в блоке потоковой обработки резюме
+STREAM_BLOCK_BATCHES = 4
+
+# Сущности вакансии и размер пакета, унаследованные рабочими процессами при fork
+_worker_task: Optional[Tuple[Dict[str, Set[str]], int]] = None
+
+# Количество лучших резюме и файл для их записи по умолчанию
+TOP_K = 10
+RESULTS_PATH = 'scored.jsonl'
+
+# Разбиение сущностей на термины, как в TfidfVectorizer по умолчанию
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+# IDF термина, который встречается только в одной строке из сравниваемой пары
+UNSHARED_IDF = 1.0 + math.log(1.5)
 
 # Веса тегов для изменения приоритетов
 TAG_WEIGHTS = {
@@ -39,28 +109,108 @@ TAG_WEIGHTS = {
 }
 
 
-def get_entity_vacancy_UI(doc_path: str) -> pd.DataFrame:
+def ner_pipeline_components(config: spacy.util.Config) -> List[str]:
     """
-    Извлекает именованные сущности и их метки из документа с вакансией.
+    Определяет компоненты конвейера, необходимые для распознавания сущностей.
+
+    Кроме самих компонентов NER оставляются общие векторизаторы, которые
+    они слушают через Tok2VecListener или TransformerListener.
 
     Args:
-        doc_path (str): Путь к файлу с вакансией.
+        config (spacy.util.Config): Конфигурация модели.
+
+    Returns:
+        List[str]: Имена необходимых компонентов в порядке конвейера.
+    """
+    components = config['components']
+    pipeline = config['nlp']['pipeline']
+    ner_names = [
+        name for name in pipeline
+        if components[name].get('factory') in NER_FACTORIES
+    ]
+
+    required = set(ner_names)
+    for name in ner_names:
+        tok2vec = components[name].get('model', {}).get('tok2vec', {})
+        if 'Listener' not in tok2vec.get('@architectures', ''):
+            continue
+        upstream = tok2vec.get('upstream', '*')
+        if upstream == '*':
+            required.update(
+                other for other in pipeline
+                if components[other].get('factory') in TOK2VEC_FACTORIES
+            )
+        else:
+            required.add(upstream)
+
+    return [name for name in pipeline if name in required]
+
+
+def load_ner_model(model_path: str = MODEL_PATH) -> spacy.Language:
+    """
+    Загружает модель SpaCy только с компонентами, нужными для NER.
+
+    Остальные компоненты (теггер, парсер, лемматизатор и т.д.) не загружаются
+    и не запускаются на документах.
+
+    Args:
+        model_path (str): Путь к директории модели.
+
+    Returns:
+        spacy.Language: Загруженная модель.
+    """
+    config = spacy.util.load_config(os.path.join(model_path, 'config.cfg'))
+    required = ner_pipeline_components(config)
+    exclude = [name for name in config['nlp']['pipeline'] if name not in required]
+    return spacy.load(model_path, exclude=exclude)
+
+
+def get_nlp() -> spacy.Language:
+    """
+    Возвращает общую для процесса модель SpaCy, загружая ее при первом обращении.
+
+    Returns:
+        spacy.Language: Модель с компонентами NER.
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                with instrumentation.stage('model_load'):
+                    _nlp = load_ner_model(MODEL_PATH)
+    return _nlp
+
+
+def entities_to_frame(entity_text: Dict[str, Set[str]]) -> pd.DataFrame:
+    """
+    Преобразует сущности документа в таблицу для отображения.
+
+    Args:
+        entity_text (Dict[str, Set[str]]): Словарь с метками и множествами сущностей.
 
     Returns:
         pd.DataFrame: DataFrame с метками и значениями сущностей.
     """
-    with open(doc_path, 'r', encoding='utf-8') as vacancy_file:
-        vacancy_text = vacancy_file.read()
-    vacancy_doc = nlp(vacancy_text)
-    entity_text = defaultdict(set)
-    for ent in vacancy_doc.ents:
-        entity_text[ent.label_].add(ent.text.lower())
     return pd.DataFrame({
         "Label": list(entity_text),
         "Value": [", ".join(x) for x in entity_text.values()]
     })
 
 
+def get_entity_vacancy_UI(doc_path: str) -> pd.DataFrame:
+    """
+    Извлекает именованные сущности и их метки из документа с вакансией.
+
+    Args:
+        doc_path (str): Путь к файлу с вакансией.
+
+    Returns:
+        pd.DataFrame: DataFrame с метками и значениями сущностей.
+    """
+    vacancy_doc = parse_text(read_text(doc_path))
+    return entities_to_frame(get_entity_text(vacancy_doc))
+
+
 def get_entity_resume_UI(file_path: str) -> pd.DataFrame:
     """
     Извлекает именованные сущности и их метки из документа с резюме.
@@ -71,18 +221,11 @@ def get_entity_resume_UI(file_path: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame с метками и значениями сущностей.
     """
-    with open(file_path, 'r', encoding='utf-8') as resume_file:
-        resume_text = resume_file.read()
-    resume_doc = nlp(resume_text)
-    entity_text = defaultdict(set)
-    for ent in resume_doc.ents:
-        entity_text[ent.label_].add(ent.text.lower())
-    return pd.DataFrame({
-        "Label": list(entity_text),
-        "Value": [", ".join(x) for x in entity_text.values()]
-    })
+    resume_doc = parse_text(read_text(file_path))
+    return entities_to_frame(get_entity_text(resume_doc))
 
 
+@instrumentation.timed('extraction')
 def get_entity_text(doc: spacy.tokens.Doc) -> Dict[str, Set[str]]:
     """
     Извлекает именованные сущности и их метки из обработанного SpaCy документа.
@@ -99,6 +242,376 @@ def get_entity_text(doc: spacy.tokens.Doc) -> Dict[str, Set[str]]:
     return entity_text
 
 
+def get_chunks_entity_text(docs: Sequence[spacy.tokens.Doc]) -> Dict[str, Set[str]]:
+    """
+    Извлекает именованные сущности текста из документов его фрагментов.
+
+    Args:
+        docs (Sequence[spacy.tokens.Doc]): Документы фрагментов текста.
+
+    Returns:
+        Dict[str, Set[str]]: Объединенный словарь с метками и множествами сущностей.
+    """
+    if len(docs) == 1:
+        return get_entity_text(docs[0])
+    entity_text = defaultdict(set)
+    for doc in docs:
+        for label, values in get_entity_text(doc).items():
+            entity_text[label].update(values)
+    return entity_text
+
+
+def parse_text(text: str, max_chars: int = MAX_CHUNK_CHARS) -> spacy.tokens.Doc:
+    """
+    Обрабатывает текст моделью по фрагментам не длиннее max_chars, поэтому
+    длинные документы не упираются в nlp.max_length и память на обработку
+    ограничена.
+    Если задано хранилище документов (см. configure_doc_store), документ
+    берется из него без запуска модели, а новый документ в него сохраняется.
+
+    Args:
+        text (str): Текст документа.
+        max_chars (int): Максимальная длина фрагмента.
+
+    Returns:
+        spacy.tokens.Doc: Документ всего текста со смещениями сущностей в нем.
+    """
+    content_hash = text_hash(text)
+    if _doc_store is not None and content_hash in _doc_store:
+        return _doc_store.get(content_hash)
+
+    doc = merge_chunk_docs(next(pipe_chunks(get_nlp(), [text], max_chars)))
+    if _doc_store is not None:
+        _doc_store.add(content_hash, doc, content_hash)
+    return doc
+
+
+@instrumentation.timed('read')
+def read_text(file_path: str) -> str:
+    """
+    Читает текстовый файл целиком.
+
+    Args:
+        file_path (str): Путь к файлу.
+
+    Returns:
+        str: Содержимое файла.
+    """
+    with open(file_path, 'r', encoding='utf-8') as text_file:
+        return text_file.read()
+
+
+def get_entity_cache() -> EntityCache:
+    """
+    Возвращает общий для процесса дисковый кэш сущностей модели MODEL_PATH.
+
+    Returns:
+        EntityCache: Кэш сущностей.
+    """
+    global _entity_cache
+    if _entity_cache is None:
+        _entity_cache = EntityCache(MODEL_PATH)
+    return _entity_cache
+
+
+def configure_doc_store(store_path: Optional[str]) -> None:
+    """
+    Задает хранилище обработанных документов для parse_text и extract_entities.
+
+    Документы хранятся под хэшем своего текста в подпапке отпечатка модели
+    MODEL_PATH, поэтому переобученная модель не получает чужие документы.
+    Новые документы накапливаются в памяти и записываются полными шардами;
+    остаток записывается flush_doc_store, сменой хранилища или при выходе
+    из процесса.
+
+    Args:
+        store_path (Optional[str]): Папка хранилища; None - не сохранять документы.
+    """
+    # doc_store сам импортирует этот модуль, поэтому импортируется при вызове
+    from doc_store import DocStore
+
+    global _doc_store
+    if _doc_store is not None:
+        _doc_store.flush()
+    if store_path is None:
+        _doc_store = None
+    else:
+        _doc_store = DocStore(os.path.join(store_path, model_fingerprint(MODEL_PATH)[:16]))
+        atexit.register(_doc_store.flush)
+
+
+def flush_doc_store() -> None:
+    """
+    Записывает накопленные документы в хранилище, заданное configure_doc_store.
+    """
+    if _doc_store is not None:
+        _doc_store.flush()
+
+
+def configure_skills(mode: str, gazetteer_path: str = GAZETTEER_PATH) -> None:
+    """
+    Задает режим извлечения навыков CoreSkills и Skill для extract_entities
+    и parse_vacancy.
+
+    Args:
+        mode (str): 'ner' - только модель; 'rules' - только словарь навыков,
+            модель не запускается; 'both' - сущности модели и навыки из словаря.
+        gazetteer_path (str): Путь к словарю навыков для режимов 'rules' и 'both'.
+
+    Raises:
+        ValueError: Если режим неизвестен.
+    """
+    global _skill_mode, _skill_matcher
+    if mode not in SKILL_MODES:
+        raise ValueError(f"Неизвестный режим навыков: {mode}")
+    _skill_matcher = SkillMatcher(load_gazetteer(gazetteer_path)) if mode != 'ner' else None
+    _skill_mode = mode
+
+
+def extraction_fingerprint() -> str:
+    """
+    Возвращает отпечаток способа извлечения сущностей: модели и, в режимах
+    со словарем, режима и содержимого словаря навыков.
+
+    Returns:
+        str: Отпечаток для проверки сохраненных сущностей.
+    """
+    if _skill_mode == 'ner':
+        return model_fingerprint(MODEL_PATH)
+    if _skill_mode == 'rules':
+        return f"rules:{_skill_matcher.fingerprint}"
+    return f"{model_fingerprint(MODEL_PATH)}:{_skill_mode}:{_skill_matcher.fingerprint}"
+
+
+def parse_vacancy(vacancy_text: str) -> Tuple[spacy.tokens.Doc, Dict[str, Set[str]]]:
+    """
+    Обрабатывает текст вакансии в текущем режиме извлечения навыков.
+
+    Args:
+        vacancy_text (str): Текст вакансии.
+
+    Returns:
+        Tuple[spacy.tokens.Doc, Dict[str, Set[str]]]: Документ вакансии и ее сущности.
+    """
+    if _skill_mode == 'rules':
+        vacancy_doc = _skill_matcher.nlp(vacancy_text)
+        return vacancy_doc, _skill_matcher.entities(vacancy_doc)
+
+    with instrumentation.stage('nlp'):
+        vacancy_doc = parse_text(vacancy_text)
+    entity_text = get_entity_text(vacancy_doc)
+    if _skill_mode == 'both':
+        skills = _skill_matcher.entities(_skill_matcher.nlp(vacancy_text))
+        entity_text = merge_entities(entity_text, skills)
+    return vacancy_doc, entity_text
+
+
+def _resolve_n_process(n_texts: int, batch_size: int, n_process: Optional[int]) -> int:
+    """
+    Определяет количество процессов для nlp.pipe.
+
+    Если количество не задано явно, используется не больше процессов, чем
+    ядер процессора и полных пакетов документов: для небольших наборов
+    запуск дополнительных процессов дороже самой обработки.
+
+    Args:
+        n_texts (int): Количество документов.
+        batch_size (int): Размер пакета.
+        n_process (Optional[int]): Явно заданное количество процессов.
+
+    Returns:
+        int: Количество процессов.
+    """
+    if n_process is not None:
+        return n_process
+    return max(1, min(os.cpu_count() or 1, n_texts // batch_size))
+
+
+def extract_entities(
+    texts: Sequence[str],
+    batch_size: int = BATCH_SIZE,
+    n_process: Optional[int] = None,
+    use_cache: bool = True
+) -> List[Dict[str, Set[str]]]:
+    """
+    Пакетно извлекает именованные сущности из текстов с помощью nlp.pipe.
+
+    Тексты, сущности которых уже есть в дисковом кэше или документы которых
+    есть в хранилище (см. configure_doc_store), моделью не обрабатываются,
+    а одинаковые тексты обрабатываются один раз. Новые документы сохраняются
+    в хранилище.
+    Длинные тексты обрабатываются фрагментами не длиннее MAX_CHUNK_CHARS
+    в общих с остальными текстами пакетах.
+    Навыки из словаря (см. configure_skills) в кэш не попадают и
+    добавляются к результату модели или заменяют его.
+
+    Args:
+        texts (Sequence[str]): Тексты документов.
+        batch_size (int): Размер пакета документов.
+        n_process (Optional[int]): Количество процессов. По умолчанию
+            подбирается по числу ядер и объему данных.
+        use_cache (bool): Использовать ли дисковый кэш сущностей.
+
+    Returns:
+        List[Dict[str, Set[str]]]: Сущности каждого документа в порядке входных текстов.
+    """
+    if _skill_mode == 'rules':
+        with instrumentation.stage('skill_matcher'):
+            return list(_skill_matcher.pipe(texts))
+
+    cache = get_entity_cache() if use_cache else None
+    entities = cache.get_many(texts) if cache is not None else [None] * len(texts)
+
+    missing = [idx for idx, entity_text in enumerate(entities) if entity_text is None]
+    instrumentation.count('cache_misses', len(missing))
+    instrumentation.count('cache_hits', len(texts) - len(missing))
+    if missing:
+        missing_indices: Dict[str, List[int]] = defaultdict(list)
+        for idx in missing:
+            missing_indices[texts[idx]].append(idx)
+        missing_texts = list(missing_indices)
+        parsed_by_text: Dict[str, Dict[str, Set[str]]] = {}
+        if _doc_store is not None:
+            for text in missing_texts:
+                content_hash = text_hash(text)
+                if content_hash in _doc_store:
+                    parsed_by_text[text] = get_entity_text(_doc_store.get(content_hash))
+            instrumentation.count('doc_store_hits', len(parsed_by_text))
+
+        parse_texts = [text for text in missing_texts if text not in parsed_by_text]
+        if parse_texts:
+            n_process = _resolve_n_process(len(parse_texts), batch_size, n_process)
+            chunk_docs = pipe_chunks(
+                get_nlp(),
+                parse_texts,
+                batch_size=batch_size,
+                n_process=n_process
+            )
+            for text, docs in zip(parse_texts, instrumentation.timed_iter('nlp', chunk_docs)):
+                parsed_by_text[text] = get_chunks_entity_text(docs)
+                if _doc_store is not None:
+                    content_hash = text_hash(text)
+                    _doc_store.add(content_hash, merge_chunk_docs(docs), content_hash)
+
+        parsed = [parsed_by_text[text] for text in missing_texts]
+        for indices, entity_text in zip(missing_indices.values(), parsed):
+            for idx in indices:
+                entities[idx] = entity_text
+        if cache is not None:
+            cache.put_many(missing_texts, parsed)
+
+    if _skill_mode == 'both':
+        with instrumentation.stage('skill_matcher'):
+            entities = [
+                merge_entities(entity_text, skills)
+                for entity_text, skills in zip(entities, _skill_matcher.pipe(texts))
+            ]
+    return entities
+
+
+def count_similarity_matrix(
+    vacancy_counts: sparse.spmatrix,
+    resume_counts: sparse.spmatrix
+) -> np.ndarray:
+    """
+    Рассчитывает попарное косинусное сходство TF-IDF по матрицам частот терминов.
+
+    Результат совпадает с обучением отдельного TfidfVectorizer на каждой паре
+    строк: в такой паре IDF общего термина равен 1, а термина из одной строки -
+    UNSHARED_IDF. Поэтому числители и нормы всех пар считаются разреженными
+    матричными произведениями по общему словарю.
+
+    Args:
+        vacancy_counts (sparse.spmatrix): Частоты терминов сущностей вакансии.
+        resume_counts (sparse.spmatrix): Частоты терминов сущностей резюме
+            в том же словаре.
+
+    Returns:
+        np.ndarray: Матрица сходства размером (сущности вакансии, сущности резюме).
+    """
+    # Копии не делят массив индексов с матрицами вызывающего кода: сортировка
+    # индексов при умножении иначе испортила бы их
+    vacancy_counts = sparse.csr_matrix(vacancy_counts).astype(np.float64, copy=True)
+    resume_counts = sparse.csr_matrix(resume_counts).astype(np.float64, copy=True)
+    vacancy_counts.sort_indices()
+    resume_counts.sort_indices()
+    similarity = np.zeros((vacancy_counts.shape[0], resume_counts.shape[0]))
+    if similarity.size == 0:
+        return similarity
+
+    vacancy_squares = vacancy_counts.multiply(vacancy_counts).tocsr()
+    resume_squares = resume_counts.multiply(resume_counts).tocsr()
+    vacancy_present = (vacancy_counts > 0).astype(np.float64)
+    resume_present = (resume_counts > 0).astype(np.float64)
+
+    # Общие термины входят в скалярное произведение и нормы с IDF 1,
+    # остальные - только в нормы с IDF UNSHARED_IDF
+    dot = (vacancy_counts @ resume_counts.T).toarray()
+    vacancy_shared = (vacancy_squares @ resume_present.T).toarray()
+    resume_shared = (vacancy_present @ resume_squares.T).toarray()
+
+    unshared_idf_sq = UNSHARED_IDF ** 2
+    vacancy_norms = (
+        unshared_idf_sq * np.asarray(vacancy_squares.sum(axis=1))
+        - (unshared_idf_sq - 1.0) * vacancy_shared
+    )
+    resume_norms = (
+        unshared_idf_sq * np.asarray(resume_squares.sum(axis=1)).T
+        - (unshared_idf_sq - 1.0) * resume_shared
+    )
+    denominator = np.sqrt(np.maximum(vacancy_norms * resume_norms, 0.0))
+    np.divide(dot, denominator, out=similarity, where=denominator > 0)
+    return similarity
+
+
+def vectorize_entities(entity_list: Sequence[str]) -> sparse.csr_matrix:
+    """
+    Строит матрицу частот терминов для списка сущностей в общем словаре.
+
+    Args:
+        entity_list (Sequence[str]): Тексты сущностей.
+
+    Returns:
+        sparse.csr_matrix: Матрица размером (сущности, термины) с отсортированными
+            индексами. Если ни в одной сущности нет терминов, матрица имеет
+            ноль столбцов.
+    """
+    try:
+        counts = CountVectorizer(token_pattern=TOKEN_PATTERN).fit_transform(entity_list).tocsr()
+        counts.sort_indices()
+        return counts
+    except ValueError:
+        # Ни в одной строке нет терминов
+        return sparse.csr_matrix((len(entity_list), 0), dtype=np.int64)
+
+
+def entity_similarity_matrix(
+    vacancy_entity_list: Sequence[str],
+    resume_entity_list: Sequence[str]
+) -> np.ndarray:
+    """
+    Рассчитывает попарное косинусное сходство TF-IDF между сущностями.
+
+    Словарь терминов строится один раз для всех строк вакансии и резюме.
+
+    Args:
+        vacancy_entity_list (Sequence[str]): Сущности вакансии.
+        resume_entity_list (Sequence[str]): Сущности резюме.
+
+    Returns:
+        np.ndarray: Матрица сходства размером (сущности вакансии, сущности резюме).
+    """
+    if not len(vacancy_entity_list) or not len(resume_entity_list):
+        return np.zeros((len(vacancy_entity_list), len(resume_entity_list)))
+
+    counts = vectorize_entities([*vacancy_entity_list, *resume_entity_list])
+    return count_similarity_matrix(
+        counts[:len(vacancy_entity_list)],
+        counts[len(vacancy_entity_list):]
+    )
+
+
+@instrumentation.timed('similarity')
 def calculate_cosine_similarity(
     vacancy_entities: Dict[str, Set[str]],
     resume_entities: Dict[str, Set[str]]
@@ -115,33 +628,45 @@ def calculate_cosine_similarity(
     """
     similarity_dict = {}
     for label, vacancy_entity_list in vacancy_entities.items():
-        resume_entity_list = resume_entities.get(label, [])
-        similarity_list = []
+        if not vacancy_entity_list:
+            continue
 
-        for vacancy_entity in vacancy_entity_list:
-            max_similarity = 0.0
+        with instrumentation.stage('similarity', label):
+            similarity = entity_similarity_matrix(
+                list(vacancy_entity_list),
+                list(resume_entities.get(label, []))
+            )
+            if similarity.shape[1]:
+                max_similarity = similarity.max(axis=1)
+            else:
+                max_similarity = np.zeros(similarity.shape[0])
 
-            for resume_entity in resume_entity_list:
-                tfidf_vectorizer = TfidfVectorizer()
-                tfidf_matrix = tfidf_vectorizer.fit_transform([vacancy_entity, resume_entity])
-                similarity = cosine_similarity(tfidf_matrix[0], tfidf_matrix[1])[0][0]
+        entity_similarity = float(max_similarity.mean())
+        weighted_similarity = min(entity_similarity * TAG_WEIGHTS[label], 1.0)
+        similarity_dict[label] = weighted_similarity
 
-                if similarity > max_similarity:
-                    max_similarity = similarity
+    return similarity_dict
 
-            similarity_list.append(max_similarity)
 
-        if similarity_list:
-            entity_similarity = sum(similarity_list) / len(similarity_list)
-            weighted_similarity = min(entity_similarity * TAG_WEIGHTS[label], 1.0)
-            similarity_dict[label] = weighted_similarity
+def calculate_average_similarity(similarity_dict: Dict[str, float]) -> float:
+    """
+    Рассчитывает общую близость резюме как среднее сходство по меткам.
 
-    return similarity_dict
+    Args:
+        similarity_dict (Dict[str, float]): Словарь с метками и значениями сходства.
+
+    Returns:
+        float: Среднее сходство.
+    """
+    return sum(similarity_dict.values()) / max(1, len(similarity_dict))
 
 
 def calculate_avg_cosine_similarity(
     vacancy_path: str,
-    resume_list: List[str]
+    resume_list: List[str],
+    batch_size: int = BATCH_SIZE,
+    n_process: Optional[int] = None,
+    use_cache: bool = True
 ) -> pd.DataFrame:
     """
     Рассчитывает среднее косинусное сходство между вакансией и списком резюме.
@@ -149,49 +674,523 @@ def calculate_avg_cosine_similarity(
     Args:
         vacancy_path (str): Путь к файлу вакансии.
         resume_list (List[str]): Список путей к файлам резюме.
+        batch_size (int): Размер пакета документов для nlp.pipe.
+        n_process (Optional[int]): Количество процессов для nlp.pipe.
+        use_cache (bool): Использовать ли дисковый кэш сущностей.
 
     Returns:
         pd.DataFrame: DataFrame с именами файлов и значениями сходства.
     """
+    vacancy_text = read_text(vacancy_path)
+    resume_texts = [read_text(resume) for resume in resume_list]
+    unique_vacancy_entities, *resume_entities = extract_entities(
+        [vacancy_text, *resume_texts],
+        batch_size=batch_size,
+        n_process=n_process,
+        use_cache=use_cache
+    )
+
     avg_list = []
-    with open(vacancy_path, 'r', encoding='utf-8') as vacancy_file:
-        vacancy_text = vacancy_file.read()
-        vacancy_doc = nlp(vacancy_text)
-        unique_vacancy_entities = get_entity_text(vacancy_doc)
+    for resume_entity_text in resume_entities:
+        similarity_dict = calculate_cosine_similarity(
+            unique_vacancy_entities,
+            resume_entity_text
+        )
+
+        avg_list.append(calculate_average_similarity(similarity_dict))
+
+    return pd.DataFrame({
+        'Filename': resume_list,
+        'Similarity': avg_list
+    })
+
+
+class ResumeScore(NamedTuple):
+    """
+    Результат оценки одного резюме.
+    """
+    idx: int
+    filename: str
+    entities: Dict[str, Set[str]]
+    label_scores: Dict[str, float]
+    score: float
+
+
+def _iter_blocks(items: Iterable[T], block_size: int) -> Iterator[List[T]]:
+    """
+    Разбивает поток элементов на списки фиксированного размера.
+
+    Args:
+        items (Iterable[T]): Поток элементов.
+        block_size (int): Размер блока.
+
+    Yields:
+        List[T]: Очередной блок элементов.
+    """
+    iterator = iter(items)
+    while True:
+        block = list(itertools.islice(iterator, block_size))
+        if not block:
+            return
+        yield block
+
+
+def _stream_block_size(batch_size: int, n_process: Optional[int]) -> int:
+    """
+    Определяет количество документов, одновременно находящихся в памяти
+    при потоковой обработке.
+
+    Args:
+        batch_size (int): Размер пакета документов для nlp.pipe.
+        n_process (Optional[int]): Количество процессов для nlp.pipe.
+
+    Returns:
+        int: Размер блока документов.
+    """
+    workers = n_process if n_process is not None and n_process > 0 else (os.cpu_count() or 1)
+    return batch_size * workers * STREAM_BLOCK_BATCHES
+
+
+def iter_resume_files(resume_folder: str) -> Iterator[Tuple[int, str]]:
+    """
+    Лениво перечисляет .txt файлы резюме в папке.
+
+    Args:
+        resume_folder (str): Путь к папке с резюме.
+
+    Yields:
+        Tuple[int, str]: Порядковый номер файла в папке и имя файла.
+    """
+    with os.scandir(resume_folder) as entries:
+        for idx, entry in enumerate(entries):
+            if entry.name.endswith('.txt'):
+                yield idx, entry.name
+
+
+def iter_resume_texts(resume_folder: str) -> Iterator[Tuple[int, str, str]]:
+    """
+    Лениво читает .txt файлы резюме в папке.
+
+    Args:
+        resume_folder (str): Путь к папке с резюме.
+
+    Yields:
+        Tuple[int, str, str]: Порядковый номер файла в папке, имя файла и его текст.
+    """
+    for idx, resume_file in iter_resume_files(resume_folder):
+        yield idx, resume_file, read_text(os.path.join(resume_folder, resume_file))
+
+
+def _score_documents(
+    block: Sequence[Tuple[int, str, str]],
+    unique_vacancy_entities: Dict[str, Set[str]],
+    batch_size: int,
+    n_process: Optional[int]
+) -> List[ResumeScore]:
+    """
+    Оценивает блок прочитанных резюме.
+
+    Args:
+        block (Sequence[Tuple[int, str, str]]): Номера, имена файлов и тексты резюме.
+        unique_vacancy_entities (Dict[str, Set[str]]): Сущности из вакансии.
+        batch_size (int): Размер пакета документов для nlp.pipe.
+        n_process (Optional[int]): Количество процессов для nlp.pipe.
+
+    Returns:
+        List[ResumeScore]: Результаты оценки в порядке блока.
+    """
+    resume_entities = extract_entities(
+        [resume_text for _, _, resume_text in block],
+        batch_size=batch_size,
+        n_process=n_process
+    )
+    results = []
+    for (idx, resume_file, _), resume_entity_text in zip(block, resume_entities):
+        similarity_dict = calculate_cosine_similarity(unique_vacancy_entities, resume_entity_text)
+        results.append(ResumeScore(
+            idx,
+            resume_file,
+            resume_entity_text,
+            similarity_dict,
+            calculate_average_similarity(similarity_dict)
+        ))
+    return results
+
+
+def iter_resume_scores(
+    resume_folder: str,
+    unique_vacancy_entities: Dict[str, Set[str]],
+    batch_size: int = BATCH_SIZE,
+    n_process: Optional[int] = None,
+    documents: Optional[Iterable[Tuple[int, str, str]]] = None
+) -> Iterator[ResumeScore]:
+    """
+    Потоково оценивает резюме из папки. В памяти одновременно находится
+    только один блок текстов.
+
+    Args:
+        resume_folder (str): Путь к папке с резюме.
+        unique_vacancy_entities (Dict[str, Set[str]]): Сущности из вакансии.
+        batch_size (int): Размер пакета документов для nlp.pipe.
+        n_process (Optional[int]): Количество процессов для nlp.pipe.
+        documents (Optional[Iterable[Tuple[int, str, str]]]): Номера, имена
+            и тексты оцениваемых резюме; по умолчанию - все резюме папки
+            (см. iter_resume_texts).
+
+    Yields:
+        ResumeScore: Результат оценки резюме в порядке файлов в папке.
+    """
+    if documents is None:
+        documents = iter_resume_texts(resume_folder)
+    block_size = _stream_block_size(batch_size, n_process)
+    for block in _iter_blocks(documents, block_size):
+        yield from _score_documents(block, unique_vacancy_entities, batch_size, n_process)
+
+
+def _score_resume_block(
+    block: List[Tuple[int, str, str]]
+) -> Tuple[List[ResumeScore], Optional[Tuple[Dict[str, instrumentation.StageStats], Dict[str, int]]]]:
+    """
+    Оценивает блок резюме в рабочем процессе iter_resume_scores_parallel.
+
+    Модель, словарь навыков и задание рабочий процесс наследует от
+    родительского процесса при fork.
+
+    Args:
+        block (List[Tuple[int, str, str]]): Номера, имена файлов и тексты резюме.
+
+    Returns:
+        Tuple[List[ResumeScore], Optional[Tuple[Dict[str, StageStats], Dict[str, int]]]]:
+            Результаты оценки в порядке блока и замеры этапов блока (см.
+            instrumentation.take) или None, если сбор статистики выключен.
+    """
+    unique_vacancy_entities, batch_size = _worker_task
+    results = _score_documents(block, unique_vacancy_entities, batch_size, 1)
+    return results, instrumentation.take() if instrumentation.is_enabled() else None
+
+
+def iter_resume_scores_parallel(
+    resume_folder: str,
+    unique_vacancy_entities: Dict[str, Set[str]],
+    workers: int,
+    batch_size: int = BATCH_SIZE,
+    documents: Optional[Iterable[Tuple[int, str, str]]] = None
+) -> Iterator[ResumeScore]:
+    """
+    Оценивает резюме из папки в нескольких процессах, созданных через fork
+    после загрузки модели.
+
+    Модель загружается один раз в родительском процессе, а рабочие процессы
+    используют ее страницы памяти совместно (copy-on-write); gc.freeze не дает
+    сборщику мусора копировать эти страницы в каждый процесс. Родительский
+    процесс читает тексты окнами по STREAM_BLOCK_BATCHES пакетов на процесс,
+    раздает пакеты окна свободным процессам и возвращает результаты в порядке
+    файлов, поэтому итог совпадает с iter_resume_scores, а в памяти находится
+    одно окно текстов. Замеры этапов (см. instrumentation) рабочие процессы
+    возвращают вместе с результатами, и они добавляются к статистике
+    родительского процесса.
+
+    Если fork недоступен (Windows), резюме оцениваются в текущем процессе.
+    Хранилище документов (см. configure_doc_store) рабочие процессы не
+    разделяют, поэтому вместе с ним оценка не запускается.
+
+    Args:
+        resume_folder (str): Путь к папке с резюме.
+        unique_vacancy_entities (Dict[str, Set[str]]): Сущности из вакансии.
+        workers (int): Количество рабочих процессов.
+        batch_size (int): Размер пакета документов для nlp.pipe и блока файлов.
+        documents (Optional[Iterable[Tuple[int, str, str]]]): Номера, имена
+            и тексты оцениваемых резюме; по умолчанию - все резюме папки.
+
+    Yields:
+        ResumeScore: Результат оценки резюме в порядке файлов в папке.
+
+    Raises:
+        ValueError: Если задано хранилище документов.
+    """
+    global _worker_task
+    if _doc_store is not None:
+        raise ValueError("Хранилище документов не используется с несколькими рабочими процессами")
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        print("fork недоступен, резюме оцениваются в одном процессе")
+        yield from iter_resume_scores(resume_folder, unique_vacancy_entities, batch_size, 1, documents)
+        return
+
+    if _skill_mode != 'rules':
+        get_nlp()
+        get_entity_cache()
+    if documents is None:
+        documents = iter_resume_texts(resume_folder)
+
+    _worker_task = (unique_vacancy_entities, batch_size)
+    gc.collect()
+    gc.freeze()
+    try:
+        # Рабочий процесс начинает с пустой статистикой, иначе унаследованные
+        # замеры родителя были бы учтены повторно
+        with multiprocessing.get_context('fork').Pool(workers, instrumentation.reset) as pool:
+            for window in _iter_blocks(documents, batch_size * workers * STREAM_BLOCK_BATCHES):
+                for results, stats in pool.imap(_score_resume_block, _iter_blocks(window, batch_size)):
+                    if stats is not None:
+                        instrumentation.merge(*stats)
+                    yield from results
+    finally:
+        gc.unfreeze()
+        _worker_task = None
+
+
+def iter_deduplicated_scores(
+    resume_folder: str,
+    unique_vacancy_entities: Dict[str, Set[str]],
+    deduplicator: Deduplicator,
+    batch_size: int = BATCH_SIZE,
+    n_process: Optional[int] = None,
+    workers: int = 1
+) -> Iterator[ResumeScore]:
+    """
+    Оценивает резюме из папки, обрабатывая каждую группу дубликатов один раз.
+
+    Каждый файл читается один раз: при чтении он проходит через deduplicator,
+    уникальные резюме передаются на оценку, а дубликаты получают результат
+    представителя своей группы. Представитель всегда идет в папке раньше своих
+    дубликатов, поэтому к их очереди его результат уже известен. До конца
+    обхода для возможных дубликатов хранятся только сходство по меткам и общая
+    близость уникальных резюме, без сущностей, поэтому дубликаты возвращаются
+    с пустыми сущностями.
+
+    Args:
+        resume_folder (str): Путь к папке с резюме.
+        unique_vacancy_entities (Dict[str, Set[str]]): Сущности из вакансии.
+        deduplicator (Deduplicator): Поиск дубликатов; после обхода содержит
+            найденные группы для отчета.
+        batch_size (int): Размер пакета документов для nlp.pipe.
+        n_process (Optional[int]): Количество процессов для nlp.pipe.
+        workers (int): Количество рабочих процессов (см. iter_resume_scores_parallel).
+
+    Yields:
+        ResumeScore: Результат оценки резюме в порядке файлов в папке;
+            у дубликатов entities пустой.
+    """
+    # Прочитанные, но еще не возвращенные файлы в порядке папки
+    order: Deque[Tuple[int, str, Optional[DuplicateMatch]]] = deque()
+
+    def unique_documents() -> Iterator[Tuple[int, str, str]]:
+        for idx, resume_file, resume_text in iter_resume_texts(resume_folder):
+            with instrumentation.stage('dedup'):
+                match = deduplicator.add(resume_file, resume_text)
+            order.append((idx, resume_file, match))
+            if match is None:
+                yield idx, resume_file, resume_text
+            else:
+                instrumentation.count('duplicates')
+
+    if workers > 1:
+        scores = iter_resume_scores_parallel(
+            resume_folder, unique_vacancy_entities, workers, batch_size, unique_documents()
+        )
+    else:
+        scores = iter_resume_scores(
+            resume_folder, unique_vacancy_entities, batch_size, n_process, unique_documents()
+        )
+
+    # Результаты уникальных резюме без сущностей: память на резюме не зависит
+    # от объема его текста
+    unique_scores: Dict[str, ResumeScore] = {}
+
+    def leading_duplicates() -> Iterator[ResumeScore]:
+        while order and order[0][2] is not None:
+            idx, resume_file, match = order.popleft()
+            yield unique_scores[match.representative]._replace(idx=idx, filename=resume_file)
 
-    for resume in resume_list:
-        with open(resume, 'r', encoding='utf-8') as resume_file:
-            resume_text = resume_file.read()
-            resume_doc = nlp(resume_text)
-            resume_entity_text = get_entity_text(resume_doc)
+    for result in scores:
+        yield from leading_duplicates()
+        order.popleft()
+        unique_scores[result.filename] = result._replace(entities={})
+        yield result
+    yield from leading_duplicates()
 
+
+def score_incremental(
+    resume_folder: str,
+    unique_vacancy_entities: Dict[str, Set[str]],
+    manifest: ResumeManifest,
+    batch_size: int = BATCH_SIZE,
+    n_process: Optional[int] = None
+) -> Tuple[List[ResumeScore], Dict[str, int]]:
+    """
+    Оценивает папку резюме, обрабатывая моделью только новые и измененные файлы.
+
+    Файлы с прежними временем изменения и размером не читаются; файлы с
+    прежним хэшем содержимого не обрабатываются моделью. Удаленные файлы
+    исключаются из манифеста. Если сущности вакансии изменились, все резюме
+    переоцениваются по сохраненным сущностям без запуска модели.
+    Манифест обновляется на месте.
+
+    Args:
+        resume_folder (str): Путь к папке с резюме.
+        unique_vacancy_entities (Dict[str, Set[str]]): Сущности из вакансии.
+        manifest (ResumeManifest): Манифест предыдущего запуска.
+        batch_size (int): Размер пакета документов для nlp.pipe.
+        n_process (Optional[int]): Количество процессов для nlp.pipe.
+
+    Returns:
+        Tuple[List[ResumeScore], Dict[str, int]]: Результаты оценки всех резюме
+            в порядке файлов в папке и количество новых, измененных, удаленных,
+            неизмененных и переоцененных резюме.
+    """
+    vacancy_hash = entities_hash(unique_vacancy_entities)
+    rescore_all = manifest.vacancy_hash != vacancy_hash
+    stats = {'new': 0, 'changed': 0, 'deleted': 0, 'unchanged': 0, 'rescored': 0}
+
+    files = list(iter_resume_files(resume_folder))
+    present = {resume_file for _, resume_file in files}
+    for resume_file in [name for name in manifest.entries if name not in present]:
+        del manifest.entries[resume_file]
+        stats['deleted'] += 1
+
+    pending: List[Tuple[str, os.stat_result]] = []
+    for _, resume_file in files:
+        file_path = os.path.join(resume_folder, resume_file)
+        file_stat = os.stat(file_path)
+        entry = manifest.entries.get(resume_file)
+        if entry is None:
+            pending.append((resume_file, file_stat))
+            stats['new'] += 1
+        elif (entry.mtime_ns, entry.size) == (file_stat.st_mtime_ns, file_stat.st_size):
+            stats['unchanged'] += 1
+        elif entry.hash == text_hash(read_text(file_path)):
+            # Файл перезаписан без изменения содержимого
+            manifest.entries[resume_file] = entry._replace(
+                mtime_ns=file_stat.st_mtime_ns,
+                size=file_stat.st_size
+            )
+            stats['unchanged'] += 1
+        else:
+            pending.append((resume_file, file_stat))
+            stats['changed'] += 1
+
+    for block in _iter_blocks(pending, _stream_block_size(batch_size, n_process)):
+        resume_texts = [
+            read_text(os.path.join(resume_folder, resume_file))
+            for resume_file, _ in block
+        ]
+        resume_entities = extract_entities(
+            resume_texts,
+            batch_size=batch_size,
+            n_process=n_process
+        )
+        for (resume_file, file_stat), resume_text, resume_entity_text in zip(
+            block, resume_texts, resume_entities
+        ):
             similarity_dict = calculate_cosine_similarity(
                 unique_vacancy_entities,
                 resume_entity_text
             )
+            manifest.entries[resume_file] = ManifestEntry(
+                file_stat.st_mtime_ns,
+                file_stat.st_size,
+                text_hash(resume_text),
+                resume_entity_text,
+                similarity_dict,
+                calculate_average_similarity(similarity_dict)
+            )
 
-            total_similarity = sum(similarity_dict.values())
-            average_similarity = total_similarity / max(1, len(similarity_dict))
-            avg_list.append(average_similarity)
+    if rescore_all:
+        processed = {resume_file for resume_file, _ in pending}
+        for resume_file, entry in manifest.entries.items():
+            if resume_file in processed:
+                continue
+            similarity_dict = calculate_cosine_similarity(unique_vacancy_entities, entry.entities)
+            manifest.entries[resume_file] = entry._replace(
+                label_scores=similarity_dict,
+                score=calculate_average_similarity(similarity_dict)
+            )
+            stats['rescored'] += 1
+    manifest.vacancy_hash = vacancy_hash
 
-    return pd.DataFrame({
-        'Filename': resume_list,
-        'Similarity': avg_list
-    })
+    results = []
+    for idx, resume_file in files:
+        entry = manifest.entries[resume_file]
+        results.append(ResumeScore(idx, resume_file, entry.entities, entry.label_scores, entry.score))
+    return results, stats
+
+
+@instrumentation.timed('write')
+def write_results(results_path: str, results: Sequence[ResumeScore]) -> None:
+    """
+    Записывает результаты оценки в JSONL или CSV файл (по расширению).
+
+    Args:
+        results_path (str): Путь к файлу результатов.
+        results (Sequence[ResumeScore]): Результаты оценки.
+    """
+    if results_path.endswith('.csv'):
+        labels = sorted({label for result in results for label in result.label_scores})
+        with open(results_path, 'w', encoding='utf-8', newline='') as results_file:
+            writer = csv.writer(results_file)
+            writer.writerow(['filename', 'score', *labels])
+            for result in results:
+                writer.writerow([
+                    result.filename,
+                    result.score,
+                    *(result.label_scores.get(label, '') for label in labels)
+                ])
+    else:
+        with open(results_path, 'w', encoding='utf-8') as results_file:
+            for result in results:
+                results_file.write(json.dumps({
+                    'filename': result.filename,
+                    'score': result.score,
+                    'labels': result.label_scores
+                }, ensure_ascii=False) + '\n')
 
 
 def process_resumes(
     resume_folder: str,
     vacancy_doc: spacy.tokens.Doc,
-    unique_vacancy_entities: Dict[str, Set[str]]
+    unique_vacancy_entities: Dict[str, Set[str]],
+    batch_size: int = BATCH_SIZE,
+    n_process: Optional[int] = None,
+    top_k: int = TOP_K,
+    results_path: Optional[str] = RESULTS_PATH,
+    verbose: bool = False,
+    copy_scored: bool = False,
+    manifest_path: Optional[str] = None,
+    workers: int = 1,
+    deduplicate: bool = True,
+    near_duplicate_threshold: Optional[float] = None,
+    duplicates_path: Optional[str] = DUPLICATES_PATH
 ) -> Tuple[List[Tuple[str, float]], float, float]:
     """
     Обрабатывает резюме и рассчитывает метрики сходства.
 
+    Резюме читаются из папки потоково, а лучшие top_k результатов хранятся
+    в ограниченной куче и записываются в файл результатов.
+
     Args:
         resume_folder (str): Путь к папке с резюме.
         vacancy_doc (spacy.tokens.Doc): Документ вакансии.
         unique_vacancy_entities (Dict[str, Set[str]]): Сущности из вакансии.
+        batch_size (int): Размер пакета документов для nlp.pipe.
+        n_process (Optional[int]): Количество процессов для nlp.pipe.
+        top_k (int): Количество лучших резюме в файле результатов.
+        results_path (Optional[str]): Путь к файлу результатов (.jsonl или .csv);
+            None - не записывать результаты.
+        verbose (bool): Выводить ли сущности и сходство каждого резюме.
+        copy_scored (bool): Копировать ли резюме с ненулевой близостью в папку scored.
+        manifest_path (Optional[str]): Путь к манифесту инкрементального режима;
+            None - оценивать все резюме заново.
+        workers (int): Количество рабочих процессов для оценки всей папки
+            (см. iter_resume_scores_parallel); в инкрементальном режиме не используется.
+        deduplicate (bool): Оценивать ли точные дубликаты один раз; близость
+            при этом не меняется, а сущности дубликатов не выводятся. Для
+            каждого уникального резюме хранится хэш и сходство по меткам.
+            В инкрементальном режиме не используется.
+        near_duplicate_threshold (Optional[float]): Порог сходства Жаккара, при
+            котором почти дубликаты получают оценку первого резюме группы;
+            None - искать только точные дубликаты.
+        duplicates_path (Optional[str]): Путь к JSON отчету о дубликатах;
+            None - не записывать отчет.
 
     Returns:
         Tuple[List[Tuple[str, float]], float, float]: 
@@ -201,49 +1200,107 @@ def process_resumes(
     most_similar_resumes = []
     highest_similarity = -1.0
     highest_average_similarity = -1.0
+    deduplicator: Optional[Deduplicator] = None
+    top_heap: List[Tuple[float, int, ResumeScore]] = []
 
     scored_folder = 'scored'
-    if not os.path.exists(scored_folder):
+    if copy_scored and not os.path.exists(scored_folder):
         os.mkdir(scored_folder)
 
-    for idx, resume_file in enumerate(os.listdir(resume_folder)):
-        if resume_file.endswith('.txt'):
-            with open(os.path.join(resume_folder, resume_file), 'r', encoding='utf-8') as f:
-                resume_text = f.read()
-                resume_doc = nlp(resume_text)
-                resume_entity_text = get_entity_text(resume_doc)
-
-                print(f"Уникальные Entity из файла резюме - {resume_file}:")
-                for label, entities in resume_entity_text.items():
-                    print(f"{label}: {', '.join(entities)}")
-
-                similarity_dict = calculate_cosine_similarity(
-                    unique_vacancy_entities,
-                    resume_entity_text
-                )
-                total_similarity = sum(similarity_dict.values())
-                average_similarity = total_similarity / max(1, len(similarity_dict))
-
-                print("Сходство резюме по тегам:")
-                for label, similarity in similarity_dict.items():
-                    print(f"{label}: {similarity * 100:.2f}%")
-
-                print(f"Общая близость: {average_similarity * 100:.2f}%")
-                
-                if average_similarity > 0.0:
-                    new_filename = f"{idx + 1}_resume_score{int(average_similarity * 100)}.txt"
-                    new_filepath = os.path.join(scored_folder, new_filename)
-                    with open(new_filepath, 'w', encoding='utf-8') as scored_file:
-                        scored_file.write(resume_text)
-
-                if average_similarity > highest_average_similarity:
-                    highest_average_similarity = average_similarity
-                if average_similarity > highest_similarity:
-                    highest_similarity = average_similarity
-                    most_similar_resumes = [(resume_file, average_similarity)]
-                elif average_similarity == highest_similarity:
-                    most_similar_resumes.append((resume_file, average_similarity))
-                print()
+    if manifest_path is not None:
+        manifest = ResumeManifest.load(manifest_path, extraction_fingerprint())
+        resume_scores, stats = score_incremental(
+            resume_folder,
+            unique_vacancy_entities,
+            manifest,
+            batch_size=batch_size,
+            n_process=n_process
+        )
+        manifest.save(manifest_path)
+        print(
+            f"Манифест {manifest_path}: новых {stats['new']}, измененных {stats['changed']}, "
+            f"удаленных {stats['deleted']}, без изменений {stats['unchanged']}, "
+            f"переоценено без NLP {stats['rescored']}"
+        )
+    elif deduplicate or near_duplicate_threshold is not None:
+        deduplicator = Deduplicator(near_duplicate_threshold)
+        resume_scores = iter_deduplicated_scores(
+            resume_folder,
+            unique_vacancy_entities,
+            deduplicator,
+            batch_size=batch_size,
+            n_process=n_process,
+            workers=workers
+        )
+    elif workers > 1:
+        resume_scores = iter_resume_scores_parallel(
+            resume_folder,
+            unique_vacancy_entities,
+            workers,
+            batch_size=batch_size
+        )
+    else:
+        resume_scores = iter_resume_scores(
+            resume_folder,
+            unique_vacancy_entities,
+            batch_size=batch_size,
+            n_process=n_process
+        )
+
+    for result in resume_scores:
+        resume_file = result.filename
+        average_similarity = result.score
+
+        if verbose:
+            print(f"Уникальные Entity из файла резюме - {resume_file}:")
+            if deduplicator is not None and resume_file in deduplicator.matches:
+                # Сущности дубликата не хранятся, они совпадают с сущностями представителя
+                match = deduplicator.matches[resume_file]
+                print(f"Дубликат {match.representative} ({match.kind}, {match.similarity * 100:.1f}%)")
+            for label, entities in result.entities.items():
+                print(f"{label}: {', '.join(sorted(entities))}")
+
+            print("Сходство резюме по тегам:")
+            for label, similarity in result.label_scores.items():
+                print(f"{label}: {similarity * 100:.2f}%")
+
+            print(f"Общая близость: {average_similarity * 100:.2f}%")
+            print()
+
+        if copy_scored and average_similarity > 0.0:
+            new_filename = f"{result.idx + 1}_resume_score{int(average_similarity * 100)}.txt"
+            shutil.copyfile(
+                os.path.join(resume_folder, resume_file),
+                os.path.join(scored_folder, new_filename)
+            )
+
+        # При равной близости в куче остаются резюме, найденные раньше
+        heap_item = (average_similarity, -result.idx, result._replace(entities={}))
+        if len(top_heap) < top_k:
+            heapq.heappush(top_heap, heap_item)
+        elif top_k > 0 and heap_item[:2] > top_heap[0][:2]:
+            heapq.heapreplace(top_heap, heap_item)
+
+        if average_similarity > highest_average_similarity:
+            highest_average_similarity = average_similarity
+        if average_similarity > highest_similarity:
+            highest_similarity = average_similarity
+            most_similar_resumes = [(resume_file, average_similarity)]
+        elif average_similarity == highest_similarity:
+            most_similar_resumes.append((resume_file, average_similarity))
+
+    if deduplicator is not None:
+        print(
+            f"Дубликатов: {len(deduplicator.matches)} в {len(deduplicator.groups())} группах, "
+            f"оценены по первому резюме группы"
+        )
+        if duplicates_path is not None:
+            write_duplicate_report(duplicates_path, deduplicator)
+            print(f"Отчет о дубликатах записан в {duplicates_path}")
+
+    if results_path is not None:
+        top_results = [item[2] for item in sorted(top_heap, key=lambda item: item[:2], reverse=True)]
+        write_results(results_path, top_results)
 
     return most_similar_resumes, highest_similarity, highest_average_similarity
 
@@ -252,23 +1309,92 @@ def main() -> None:
     """
     Основная функция для обработки вакансий и резюме.
     """
-    with open('data_collector/vacancy.txt', 'r', encoding='utf-8') as vacancy_file:
-        vacancy_text = vacancy_file.read()
+    parser = argparse.ArgumentParser(description='Оценка резюме по вакансии')
+    parser.add_argument('--vacancy', default='data_collector/vacancy.txt',
+                        help='Файл вакансии')
+    parser.add_argument('--resume-folder', default='data_collector/resume',
+                        help='Папка с .txt резюме')
+    parser.add_argument('--top-k', type=int, default=TOP_K,
+                        help='Количество лучших резюме в файле результатов')
+    parser.add_argument('--results', default=RESULTS_PATH,
+                        help='Файл результатов (.jsonl или .csv)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Выводить сущности и сходство каждого резюме')
+    parser.add_argument('--copy-scored', action='store_true',
+                        help='Копировать резюме с ненулевой близостью в папку scored')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--n-process', type=int, default=None)
+    parser.add_argument('--no-dedup', action='store_true',
+                        help='Не объединять точные дубликаты резюме')
+    parser.add_argument('--near-duplicates', nargs='?', type=float,
+                        const=NEAR_DUPLICATE_THRESHOLD, default=None,
+                        help='Оценивать почти дубликаты (сходство Жаккара не ниже порога) один раз')
+    parser.add_argument('--duplicates-report', default=DUPLICATES_PATH,
+                        help='JSON отчет о группах дубликатов')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Количество процессов, создаваемых после загрузки модели')
+    parser.add_argument('--manifest', nargs='?', const=DEFAULT_MANIFEST_PATH, default=None,
+                        help='Инкрементальный режим: обрабатывать только новые и измененные резюме')
+    parser.add_argument('--skills', choices=SKILL_MODES, default='ner',
+                        help='Извлечение навыков: моделью, словарем или обоими способами')
+    parser.add_argument('--gazetteer', default=GAZETTEER_PATH,
+                        help='Словарь навыков для --skills rules/both')
+    parser.add_argument('--doc-store', default=None,
+                        help='Папка хранилища обработанных документов DocBin')
+    parser.add_argument('--profile', action='store_true',
+                        help='Собирать и выводить время этапов обработки')
+    parser.add_argument('--profile-dump', default=None,
+                        help='JSON файл со статистикой этапов (включает --profile)')
+    args = parser.parse_args()
+    if args.workers > 1 and args.manifest is not None:
+        parser.error('--workers не используется вместе с --manifest')
+    if args.near_duplicates is not None and args.manifest is not None:
+        parser.error('--near-duplicates не используется вместе с --manifest')
+    if args.workers > 1 and args.doc_store is not None:
+        parser.error('--workers не используется вместе с --doc-store')
+
+    if args.profile or args.profile_dump:
+        instrumentation.enable()
+
+    configure_skills(args.skills, args.gazetteer)
+    configure_doc_store(args.doc_store)
 
-    vacancy_doc = nlp(vacancy_text)
-    resume_folder = 'data_collector/resume'
+    vacancy_text = read_text(args.vacancy)
+    vacancy_doc, unique_vacancy_entities = parse_vacancy(vacancy_text)
 
-    print("Уникальные Entity из vacancy.txt:")
-    unique_vacancy_entities = get_entity_text(vacancy_doc)
+    print(f"Уникальные Entity из {os.path.basename(args.vacancy)}:")
     for label, entities in unique_vacancy_entities.items():
         print(f"{label}: {', '.join(entities)}")
     print()
 
     most_similar_resumes, highest_similarity, highest_average_similarity = process_resumes(
-        resume_folder,
+        args.resume_folder,
         vacancy_doc,
-        unique_vacancy_entities
+        unique_vacancy_entities,
+        batch_size=args.batch_size,
+        n_process=args.n_process,
+        top_k=args.top_k,
+        results_path=args.results,
+        verbose=args.verbose,
+        copy_scored=args.copy_scored,
+        manifest_path=args.manifest,
+        workers=args.workers,
+        deduplicate=not args.no_dedup,
+        near_duplicate_threshold=args.near_duplicates,
+        duplicates_path=args.duplicates_report
     )
+    flush_doc_store()
+
+    for resume_file, similarity in most_similar_resumes:
+        print(f"Наиболее похожее резюме: {resume_file} ({similarity * 100:.2f}%)")
+    print(f"Лучшие {args.top_k} резюме записаны в {args.results}")
+
+    if instrumentation.is_enabled():
+        print()
+        print(instrumentation.format_summary())
+        if args.profile_dump:
+            instrumentation.dump(args.profile_dump)
+            print(f"Статистика этапов записана в {args.profile_dump}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,233 @@
+"""
+Модуль правилового извлечения навыков.
+Строит словарь навыков (CoreSkills, Skill) по размеченному корпусу и ищет
+их в тексте через PhraseMatcher за линейное время. Может использоваться
+вместо статистической модели NER или вместе с ней.
+
+Построение словаря из корня репозитория:
+    python skill_gazetteer.py --data json_data/jsons/all_pythons.jsonl --output skill_gazetteer.json
+"""
+
+import argparse
+import hashlib
+import json
+import string
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+import spacy
+from spacy.lang.ru.stop_words import STOP_WORDS
+from spacy.matcher import PhraseMatcher
+from spacy.tokens import Doc, Span
+from spacy.util import filter_spans
+
+# Метки, извлекаемые словарем
+SKILL_LABELS = ('CoreSkills', 'Skill')
+
+# Путь к словарю навыков по умолчанию
+GAZETTEER_PATH = 'skill_gazetteer.json'
+
+# Режимы извлечения навыков: только модель, только словарь, модель и словарь
+SKILL_MODES = ('ner', 'rules', 'both')
+
+# Символы, которые отрезаются с краев размеченной фразы (ошибки границ разметки).
+# '+', '#' и точка в начале фразы входят в навыки (c++, c#, .net), точка в
+# конце отрезается отдельно
+PHRASE_EDGE_CHARS = string.whitespace + ',;:!?\'"«»“”„()[]{}<>|/\\*•·-–—_'
+
+
+def normalize_phrase(phrase: str) -> str:
+    """
+    Приводит размеченную фразу навыка к виду записи словаря.
+
+    Args:
+        phrase (str): Текст размеченной сущности.
+
+    Returns:
+        str: Фраза в нижнем регистре без пробелов и знаков препинания по краям,
+            например ', Postgre.' -> 'postgre'.
+    """
+    return phrase.lstrip(PHRASE_EDGE_CHARS).rstrip(PHRASE_EDGE_CHARS + '.').lower()
+
+
+def build_gazetteer(
+    data_path: str,
+    labels: Sequence[str] = SKILL_LABELS,
+    min_count: int = 2,
+    include: Optional[Callable[[str], bool]] = None
+) -> Dict[str, str]:
+    """
+    Собирает словарь навыков из размеченного JSONL корпуса.
+
+    Фразы нормализуются (см. normalize_phrase). Фраза попадает в словарь, если
+    размечена не менее min_count раз и не является стоп-словом или знаком
+    препинания (ошибки разметки); если фраза размечена разными метками,
+    выбирается самая частая.
+
+    Args:
+        data_path (str): Путь к JSONL файлу с ключами 'text' и 'entities'.
+        labels (Sequence[str]): Метки, фразы которых попадают в словарь.
+        min_count (int): Минимальное количество упоминаний фразы.
+        include (Optional[Callable[[str], bool]]): Отбор записей по тексту,
+            например только тренировочного набора. По умолчанию - все записи.
+
+    Returns:
+        Dict[str, str]: Фраза в нижнем регистре и ее метка.
+    """
+    counts: Dict[str, Counter] = defaultdict(Counter)
+    with open(data_path, 'r', encoding='utf-8') as data_file:
+        for line in data_file:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if include is not None and not include(item['text']):
+                continue
+            for entity in item['entities']:
+                if entity['label'] in labels:
+                    phrase = normalize_phrase(item['text'][entity['start_offset']:entity['end_offset']])
+                    if phrase:
+                        counts[phrase][entity['label']] += 1
+
+    return {
+        phrase: label_counts.most_common(1)[0][0]
+        for phrase, label_counts in sorted(counts.items())
+        if sum(label_counts.values()) >= min_count
+        and phrase not in STOP_WORDS
+        and any(char.isalnum() for char in phrase)
+    }
+
+
+def save_gazetteer(gazetteer: Dict[str, str], file_path: str) -> None:
+    """
+    Сохраняет словарь навыков в JSON файл.
+
+    Args:
+        gazetteer (Dict[str, str]): Фразы и метки.
+        file_path (str): Путь к JSON файлу.
+    """
+    with open(file_path, 'w', encoding='utf-8') as output_file:
+        json.dump(gazetteer, output_file, ensure_ascii=False, indent=0)
+
+
+def load_gazetteer(file_path: str = GAZETTEER_PATH) -> Dict[str, str]:
+    """
+    Загружает словарь навыков из JSON файла.
+
+    Args:
+        file_path (str): Путь к JSON файлу.
+
+    Returns:
+        Dict[str, str]: Фразы и метки.
+    """
+    with open(file_path, 'r', encoding='utf-8') as input_file:
+        return json.load(input_file)
+
+
+class SkillMatcher:
+    """
+    Поиск навыков из словаря в тексте без запуска модели NER.
+
+    Тексты токенизируются пустым конвейером SpaCy языка lang; сравнение
+    выполняется по токенам в нижнем регистре, из пересекающихся совпадений
+    остается самое длинное.
+    """
+
+    def __init__(self, gazetteer: Dict[str, str], lang: str = 'ru') -> None:
+        self.nlp = spacy.blank(lang)
+        self.labels = sorted(set(gazetteer.values()))
+        self.fingerprint = hashlib.sha256(
+            json.dumps(gazetteer, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        self.matcher = PhraseMatcher(self.nlp.vocab, attr='LOWER')
+
+        phrases_by_label: Dict[str, List[str]] = defaultdict(list)
+        for phrase, label in gazetteer.items():
+            phrases_by_label[label].append(phrase)
+        for label, phrases in sorted(phrases_by_label.items()):
+            self.matcher.add(label, list(self.nlp.tokenizer.pipe(phrases)))
+
+    def spans(self, doc: Doc) -> List[Span]:
+        """
+        Находит навыки в документе.
+
+        Args:
+            doc (Doc): Токенизированный документ.
+
+        Returns:
+            List[Span]: Непересекающиеся найденные навыки по порядку.
+        """
+        return filter_spans(self.matcher(doc, as_spans=True))
+
+    def entities(self, doc: Doc) -> Dict[str, Set[str]]:
+        """
+        Находит навыки в документе в формате get_entity_text.
+
+        Args:
+            doc (Doc): Токенизированный документ.
+
+        Returns:
+            Dict[str, Set[str]]: Словарь с метками и множествами навыков.
+        """
+        entity_text = defaultdict(set)
+        for span in self.spans(doc):
+            entity_text[span.label_].add(span.text.lower())
+        return entity_text
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 1000) -> Iterator[Dict[str, Set[str]]]:
+        """
+        Потоково находит навыки в текстах.
+
+        Args:
+            texts (Iterable[str]): Тексты документов.
+            batch_size (int): Размер пакета для токенизатора.
+
+        Yields:
+            Dict[str, Set[str]]: Навыки очередного текста.
+        """
+        for doc in self.nlp.tokenizer.pipe(texts, batch_size=batch_size):
+            yield self.entities(doc)
+
+
+def merge_entities(
+    entities: Dict[str, Set[str]],
+    skills: Dict[str, Set[str]]
+) -> Dict[str, Set[str]]:
+    """
+    Объединяет сущности модели и навыки, найденные словарем.
+
+    Args:
+        entities (Dict[str, Set[str]]): Сущности, найденные моделью.
+        skills (Dict[str, Set[str]]): Навыки, найденные словарем.
+
+    Returns:
+        Dict[str, Set[str]]: Объединенные сущности документа.
+    """
+    merged = defaultdict(set)
+    for entity_text in (entities, skills):
+        for label, values in entity_text.items():
+            merged[label].update(values)
+    return merged
+
+
+def main() -> None:
+    """
+    Строит словарь навыков по размеченному корпусу и сохраняет его.
+    """
+    parser = argparse.ArgumentParser(description='Построение словаря навыков')
+    parser.add_argument('--data', default='json_data/jsons/all_pythons.jsonl')
+    parser.add_argument('--output', default=GAZETTEER_PATH)
+    parser.add_argument('--min-count', type=int, default=2)
+    parser.add_argument('--labels', nargs='+', default=list(SKILL_LABELS))
+    args = parser.parse_args()
+
+    gazetteer = build_gazetteer(args.data, args.labels, args.min_count)
+    save_gazetteer(gazetteer, args.output)
+    label_counts = Counter(gazetteer.values())
+    print(
+        f"Словарь сохранен в {args.output}: "
+        + ', '.join(f"{label} {count}" for label, count in sorted(label_counts.items()))
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -3,12 +3,42 @@
 Обучает модель распознаванию именованных сущностей (NER) на русском языке.
 """
 
+import argparse
+import glob
+import hashlib
 import json
+import os
 import random
-from typing import Dict, List, Any, Tuple
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Sequence, Tuple, Union
 
 import spacy
+from spacy.scorer import get_ner_prf
+from spacy.tokens import Doc, DocBin
 from spacy.training import Example
+from spacy.util import compounding, filter_spans, minibatch
+
+from similarity import ner_pipeline_components
+
+# Размер пакета документов при оценке модели
+EVAL_BATCH_SIZE = 64
+
+# Папка с подготовленным корпусом DocBin (train/, dev/, test/, labels.json)
+CORPUS_DIR = 'corpus'
+
+# Количество документов в одном файле DocBin корпуса
+DOCBIN_SHARD_SIZE = 1000
+
+# Доли тренировочного, валидационного и тестового наборов
+SPLIT_RATIOS = (0.8, 0.1, 0.1)
+SPLIT_NAMES = ('train', 'dev', 'test')
+
+# Количество строк векторов, остающихся в облегченной модели, если NER
+# использует статические векторы
+SLIM_VECTOR_ROWS = 20000
+
+# Источник примеров: список в памяти или корпус, создающий новый поток примеров
+ExampleSource = Union[List[Example], Callable[[spacy.Language], Iterable[Example]]]
 
 
 def load_training_data(file_path: str) -> List[Dict[str, Any]]:
@@ -48,29 +78,243 @@ def split_data(data: List[Dict[str, Any]], split_ratio: float = 0.8) -> Tuple[Li
     return data[:split_index1], data[split_index1:split_index2], data[split_index2:]
 
 
-def evaluate_model(nlp: spacy.Language, data: List[Dict[str, Any]]) -> float:
+def make_examples(nlp: spacy.Language, data: List[Dict[str, Any]]) -> List[Example]:
     """
-    Оценивает модель по потерям на наборе данных.
+    Преобразует записи JSONL в обучающие примеры SpaCy.
+
+    Тексты токенизируются один раз, и примеры переиспользуются на всех итерациях.
 
     Args:
-        nlp (spacy.Language): Загруженная модель SpaCy.
-        data (List[Dict[str, Any]]): Набор данных для оценки.
+        nlp (spacy.Language): Модель SpaCy, токенизатор которой используется.
+        data (List[Dict[str, Any]]): Записи с ключами 'text' и 'entities'.
 
     Returns:
-        float: Значение функции потерь.
+        List[Example]: Обучающие примеры.
     """
-    losses = {}
+    examples = []
     for item in data:
-        text = item['text']
         annotations = {"entities": []}
         for entity in item['entities']:
             start = entity['start_offset']
             end = entity['end_offset']
             label = entity['label']
             annotations["entities"].append((start, end, label))
-        example = Example.from_dict(nlp.make_doc(text), annotations)
-        nlp.update([example], drop=0.3, losses=losses)
-    return losses.get("ner", 0.0)
+        examples.append(Example.from_dict(nlp.make_doc(item['text']), annotations))
+    return examples
+
+
+def split_name(text: str, seed: int = 0,
+               ratios: Sequence[float] = SPLIT_RATIOS) -> str:
+    """
+    Детерминированно определяет набор данных для текста по хэшу текста и зерну.
+
+    Разбиение не зависит от порядка записей и не требует знать их количество.
+
+    Args:
+        text (str): Текст записи.
+        seed (int): Зерно разбиения.
+        ratios (Sequence[float]): Доли наборов train, dev и test.
+
+    Returns:
+        str: 'train', 'dev' или 'test'.
+    """
+    digest = hashlib.sha256(f"{seed}:{text}".encode('utf-8')).digest()
+    position = int.from_bytes(digest[:8], 'big') / 2 ** 64 * sum(ratios)
+    for name, ratio in zip(SPLIT_NAMES, ratios):
+        if position < ratio:
+            return name
+        position -= ratio
+    return SPLIT_NAMES[-1]
+
+
+def make_reference_doc(nlp: spacy.Language, item: Dict[str, Any]) -> Tuple[Doc, int]:
+    """
+    Токенизирует запись JSONL и размечает в документе ее сущности.
+
+    Сущности, границы которых не совпадают с границами токенов, и
+    перекрывающиеся сущности отбрасываются.
+
+    Args:
+        nlp (spacy.Language): Модель SpaCy, токенизатор которой используется.
+        item (Dict[str, Any]): Запись с ключами 'text' и 'entities'.
+
+    Returns:
+        Tuple[Doc, int]: Размеченный документ и количество отброшенных сущностей.
+    """
+    doc = nlp.make_doc(item['text'])
+    spans = []
+    for entity in item['entities']:
+        span = doc.char_span(entity['start_offset'], entity['end_offset'], label=entity['label'])
+        if span is not None:
+            spans.append(span)
+    doc.ents = filter_spans(spans)
+    return doc, len(item['entities']) - len(doc.ents)
+
+
+def convert_to_docbin(nlp: spacy.Language, input_path: str, output_dir: str = CORPUS_DIR,
+                      seed: int = 0, ratios: Sequence[float] = SPLIT_RATIOS,
+                      shard_size: int = DOCBIN_SHARD_SIZE) -> Dict[str, int]:
+    """
+    Однократно преобразует размеченный JSONL в корпус DocBin.
+
+    Записи читаются потоково и распределяются по наборам train/dev/test
+    функцией split_name. Каждый набор сохраняется в свою папку файлами по
+    shard_size документов, метки сущностей - в labels.json.
+
+    Args:
+        nlp (spacy.Language): Модель SpaCy, токенизатор которой используется.
+        input_path (str): Путь к JSONL файлу с разметкой.
+        output_dir (str): Папка корпуса.
+        seed (int): Зерно разбиения.
+        ratios (Sequence[float]): Доли наборов train, dev и test.
+        shard_size (int): Количество документов в одном файле DocBin.
+
+    Returns:
+        Dict[str, int]: Количество документов в каждом наборе и отброшенных сущностей.
+    """
+    for name in SPLIT_NAMES:
+        split_dir = os.path.join(output_dir, name)
+        os.makedirs(split_dir, exist_ok=True)
+        for old_path in glob.glob(os.path.join(split_dir, '*.spacy')):
+            os.remove(old_path)
+
+    doc_bins = {name: DocBin(attrs=['ENT_IOB', 'ENT_TYPE']) for name in SPLIT_NAMES}
+    shards = {name: 0 for name in SPLIT_NAMES}
+    counts = {name: 0 for name in SPLIT_NAMES}
+    counts['dropped_entities'] = 0
+    labels = set()
+
+    def write_shard(name: str) -> None:
+        doc_bins[name].to_disk(os.path.join(output_dir, name, f'shard-{shards[name]:05d}.spacy'))
+        doc_bins[name] = DocBin(attrs=['ENT_IOB', 'ENT_TYPE'])
+        shards[name] += 1
+
+    with open(input_path, 'r', encoding='utf-8') as json_file:
+        for line in json_file:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            doc, dropped = make_reference_doc(nlp, item)
+            name = split_name(item['text'], seed, ratios)
+            doc_bins[name].add(doc)
+            counts[name] += 1
+            counts['dropped_entities'] += dropped
+            labels.update(entity['label'] for entity in item['entities'])
+            if len(doc_bins[name]) >= shard_size:
+                write_shard(name)
+
+    for name in SPLIT_NAMES:
+        if len(doc_bins[name]):
+            write_shard(name)
+    with open(os.path.join(output_dir, 'labels.json'), 'w', encoding='utf-8') as labels_file:
+        json.dump(sorted(labels), labels_file, ensure_ascii=False)
+    return counts
+
+
+def make_predicted_doc(nlp: spacy.Language, reference: Doc) -> Doc:
+    """
+    Создает документ для предсказания из токенов размеченного документа
+    без повторной токенизации текста.
+
+    Args:
+        nlp (spacy.Language): Модель SpaCy.
+        reference (Doc): Размеченный документ.
+
+    Returns:
+        Doc: Документ с теми же токенами без разметки.
+    """
+    return Doc(
+        nlp.vocab,
+        words=[token.text for token in reference],
+        spaces=[bool(token.whitespace_) for token in reference]
+    )
+
+
+class DocBinCorpus:
+    """
+    Потоковый читатель корпуса DocBin, созданного convert_to_docbin.
+
+    Каждый вызов возвращает новый поток примеров; в памяти одновременно
+    находится один файл DocBin. При shuffle порядок файлов и документов
+    внутри файла перемешивается на каждом проходе.
+    """
+
+    def __init__(self, path: str, shuffle: bool = False, seed: Optional[int] = None) -> None:
+        self.path = path
+        self.shuffle = shuffle
+        self._random = random.Random(seed)
+
+    def shard_paths(self) -> List[str]:
+        """
+        Возвращает файлы DocBin корпуса.
+
+        Returns:
+            List[str]: Пути к файлам .spacy в порядке сортировки.
+        """
+        if os.path.isfile(self.path):
+            return [self.path]
+        return sorted(glob.glob(os.path.join(self.path, '*.spacy')))
+
+    def __call__(self, nlp: spacy.Language) -> Iterator[Example]:
+        shard_paths = self.shard_paths()
+        if self.shuffle:
+            self._random.shuffle(shard_paths)
+        for shard_path in shard_paths:
+            references = list(DocBin().from_disk(shard_path).get_docs(nlp.vocab))
+            if self.shuffle:
+                self._random.shuffle(references)
+            for reference in references:
+                yield Example(make_predicted_doc(nlp, reference), reference)
+
+
+def evaluate_model(nlp: spacy.Language, examples: Iterable[Example],
+                   batch_size: int = EVAL_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Оценивает качество распознавания сущностей на наборе данных.
+
+    Модель только предсказывает сущности пакетами и не обновляет веса.
+    Примеры обрабатываются потоково: предсказанные пакеты сразу передаются
+    в spacy.scorer.get_ner_prf, который накапливает метрики по мере чтения.
+
+    Args:
+        nlp (spacy.Language): Загруженная модель SpaCy.
+        examples (Iterable[Example]): Примеры для оценки.
+        batch_size (int): Размер пакета документов.
+
+    Returns:
+        Dict[str, Any]: Метрики SpaCy: общие 'ents_p', 'ents_r', 'ents_f'
+            и по меткам в 'ents_per_type'.
+    """
+    def predicted_examples() -> Iterator[Example]:
+        with nlp.select_pipes(enable=[pipe for pipe in nlp.pipe_names if pipe == 'ner']):
+            for batch in minibatch(examples, size=batch_size):
+                docs = nlp.pipe(
+                    (make_predicted_doc(nlp, example.reference) for example in batch),
+                    batch_size=batch_size
+                )
+                for example, doc in zip(batch, docs):
+                    yield Example(doc, example.reference)
+
+    return get_ner_prf(predicted_examples())
+
+
+def print_scores(scores: Dict[str, Any]) -> None:
+    """
+    Выводит точность, полноту и F1 по каждой метке и в целом.
+
+    Args:
+        scores (Dict[str, Any]): Метрики, возвращенные evaluate_model.
+    """
+    print(f"{'Label':<32}{'P':>8}{'R':>8}{'F1':>8}")
+    for label, label_scores in sorted((scores.get('ents_per_type') or {}).items()):
+        print(
+            f"{label:<32}{label_scores['p'] * 100:>8.2f}"
+            f"{label_scores['r'] * 100:>8.2f}{label_scores['f'] * 100:>8.2f}"
+        )
+    print(
+        f"{'ALL':<32}{(scores.get('ents_p') or 0.0) * 100:>8.2f}"
+        f"{(scores.get('ents_r') or 0.0) * 100:>8.2f}{(scores.get('ents_f') or 0.0) * 100:>8.2f}"
+    )
 
 
 def setup_ner_pipe(nlp: spacy.Language, data: List[Dict[str, Any]]) -> None:
@@ -81,71 +325,243 @@ def setup_ner_pipe(nlp: spacy.Language, data: List[Dict[str, Any]]) -> None:
         nlp (spacy.Language): Модель SpaCy.
         data (List[Dict[str, Any]]): Данные для определения меток.
     """
+    setup_ner_labels(nlp, {entity['label'] for item in data for entity in item['entities']})
+
+
+def setup_ner_labels(nlp: spacy.Language, labels: Iterable[str]) -> None:
+    """
+    Добавляет компонент NER, если его нет, и регистрирует в нем метки.
+
+    Args:
+        nlp (spacy.Language): Модель SpaCy.
+        labels (Iterable[str]): Метки сущностей.
+    """
     if 'ner' not in nlp.pipe_names:
         ner = nlp.add_pipe('ner')
     else:
         ner = nlp.get_pipe('ner')
 
-    unique_labels = {entity['label'] for item in data for entity in item['entities']}
-    for label in unique_labels:
+    for label in labels:
         ner.add_label(label)
 
 
-def train_model(nlp: spacy.Language, train_data: List[Dict[str, Any]], 
-                validate_data: List[Dict[str, Any]], n_iterations: int = 200) -> None:
+def train_model(nlp: spacy.Language, train_examples: ExampleSource,
+                validate_examples: ExampleSource, n_iterations: int = 200,
+                batch_start: float = 4.0, batch_stop: float = 32.0,
+                batch_compound: float = 1.001, patience: int = 10) -> Dict[str, Any]:
     """
-    Обучает модель на предоставленных данных.
+    Обучает модель на предоставленных данных мини-пакетами.
+
+    Размер пакета растет от batch_start до batch_stop с множителем
+    batch_compound на каждый пакет. Обучение останавливается, если F1 на
+    валидации не улучшается patience итераций подряд; по окончании в модели
+    восстанавливаются веса NER лучшей итерации.
+
+    Примеры передаются списком или корпусом вроде DocBinCorpus, который
+    на каждой итерации заново читается с диска.
 
     Args:
         nlp (spacy.Language): Модель SpaCy для обучения.
-        train_data (List[Dict[str, Any]]): Данные для обучения.
-        validate_data (List[Dict[str, Any]]): Данные для валидации.
-        n_iterations (int): Количество итераций обучения.
+        train_examples (ExampleSource): Примеры для обучения.
+        validate_examples (ExampleSource): Примеры для валидации.
+        n_iterations (int): Максимальное количество итераций обучения.
+        batch_start (float): Начальный размер пакета.
+        batch_stop (float): Максимальный размер пакета.
+        batch_compound (float): Множитель размера пакета.
+        patience (int): Количество итераций без улучшения F1 до остановки.
+
+    Returns:
+        Dict[str, Any]: Метрики лучшей итерации на валидации.
     """
     other_pipes = [pipe for pipe in nlp.pipe_names if pipe != 'ner']
-    
+    best_scores: Dict[str, Any] = {}
+    best_f = -1.0
+    best_ner = None
+    stale_iterations = 0
+
     with nlp.disable_pipes(*other_pipes):
-        _ = nlp.begin_training()
+        optimizer = nlp.begin_training()
+        batch_sizes = compounding(batch_start, batch_stop, batch_compound)
         for itn in range(n_iterations):
             print(f"Starting iteration {itn}")
-            random.shuffle(train_data)
+            if callable(train_examples):
+                epoch_examples = train_examples(nlp)
+            else:
+                random.shuffle(train_examples)
+                epoch_examples = train_examples
             losses = {}
-            
-            for item in train_data:
-                text = item['text']
-                annotations = {"entities": []}
-                for entity in item['entities']:
-                    start = entity['start_offset']
-                    end = entity['end_offset']
-                    label = entity['label']
-                    annotations["entities"].append((start, end, label))
-                example = Example.from_dict(nlp.make_doc(text), annotations)
-                nlp.update([example], drop=0.3, losses=losses)
-
-            validate_loss = evaluate_model(nlp, validate_data)
-            print(f"Iteration {itn}: Validation loss: {validate_loss}")
+            n_words = 0
+            start = time.perf_counter()
+
+            for batch in minibatch(epoch_examples, size=batch_sizes):
+                nlp.update(batch, drop=0.3, sgd=optimizer, losses=losses)
+                n_words += sum(len(example.reference) for example in batch)
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"Iteration {itn}: {elapsed:.1f}s, {n_words / elapsed:.0f} words/sec, "
+                f"training loss: {losses.get('ner', 0.0):.3f}"
+            )
+
+            scores = evaluate_model(
+                nlp,
+                validate_examples(nlp) if callable(validate_examples) else validate_examples
+            )
+            validate_f = scores.get('ents_f') or 0.0
+            print(
+                f"Iteration {itn}: Validation P: {(scores.get('ents_p') or 0.0) * 100:.2f} "
+                f"R: {(scores.get('ents_r') or 0.0) * 100:.2f} F1: {validate_f * 100:.2f}"
+            )
+
+            if validate_f > best_f:
+                best_f = validate_f
+                best_scores = scores
+                best_ner = nlp.get_pipe('ner').to_bytes()
+                stale_iterations = 0
+            else:
+                stale_iterations += 1
+                if stale_iterations >= patience:
+                    print(f"Early stopping: no F1 improvement for {patience} iterations")
+                    break
+
+    if best_ner is not None:
+        nlp.get_pipe('ner').from_bytes(best_ner)
+    return best_scores
+
+
+def uses_static_vectors(section: Any) -> bool:
+    """
+    Проверяет, использует ли раздел конфигурации статические векторы словаря.
+
+    Args:
+        section (Any): Раздел конфигурации компонента или его вложенное значение.
+
+    Returns:
+        bool: True, если в разделе есть архитектура StaticVectors или
+            включен параметр include_static_vectors.
+    """
+    if isinstance(section, dict):
+        if section.get('include_static_vectors') is True:
+            return True
+        if 'StaticVectors' in str(section.get('@architectures', '')):
+            return True
+        return any(uses_static_vectors(value) for value in section.values())
+    if isinstance(section, (list, tuple)):
+        return any(uses_static_vectors(value) for value in section)
+    return False
+
+
+def export_slim_model(model_path: str, output_path: str,
+                      vector_rows: Optional[int] = SLIM_VECTOR_ROWS) -> Dict[str, Any]:
+    """
+    Сохраняет облегченную модель для оценки резюме: только компоненты NER
+    и векторизаторы, которые они слушают, без лишних векторов словаря.
+
+    Если оставшиеся компоненты не используют статические векторы, таблица
+    векторов удаляется полностью; иначе в ней остается vector_rows самых
+    частых строк, а остальные слова отображаются на ближайшие из них.
+    Сведения об удаленном записываются в meta.json в раздел 'slim'.
+
+    Args:
+        model_path (str): Путь к полной модели.
+        output_path (str): Путь для облегченной модели.
+        vector_rows (Optional[int]): Количество строк векторов, если они нужны NER;
+            None - оставить векторы без изменений.
+
+    Returns:
+        Dict[str, Any]: Раздел 'slim' метаданных сохраненной модели.
+    """
+    config = spacy.util.load_config(os.path.join(model_path, 'config.cfg'))
+    required = ner_pipeline_components(config)
+    removed = [name for name in config['nlp']['pipeline'] if name not in required]
+    nlp = spacy.load(model_path, exclude=removed)
+
+    vectors_before = nlp.vocab.vectors.shape
+    if not uses_static_vectors([config['components'][name] for name in required]):
+        nlp.vocab.reset_vectors(width=0)
+        vectors_action = 'dropped'
+    elif vector_rows is not None and vectors_before[0] > vector_rows:
+        nlp.vocab.prune_vectors(vector_rows)
+        vectors_action = 'pruned'
+    else:
+        vectors_action = 'kept'
+
+    slim = {
+        'source': os.path.abspath(model_path),
+        'removed_components': removed,
+        'vectors': {
+            'action': vectors_action,
+            'shape_before': list(vectors_before),
+            'shape_after': list(nlp.vocab.vectors.shape)
+        }
+    }
+    nlp.meta['slim'] = slim
+    nlp.meta['description'] = (
+        f"{nlp.meta.get('description') or ''} "
+        f"Inference-only NER export: removed components {removed or 'none'}, vectors {vectors_action}."
+    ).strip()
+    nlp.to_disk(output_path)
+    return slim
 
 
 def main() -> None:
     """
     Основная функция для обучения модели.
     """
-    # Загрузка модели и данных
-    nlp = spacy.load("ru_core_news_lg")
-    data = load_training_data("json_data/jsons/all_pythons.jsonl")
-    
-    # Разделение данных
-    train_data, validate_data, test_data = split_data(data)
-    
+    parser = argparse.ArgumentParser(description='Обучение NER модели SpaCy')
+    parser.add_argument('--data', default='json_data/jsons/all_pythons.jsonl',
+                        help='JSONL файл с разметкой')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Папка корпуса DocBin')
+    parser.add_argument('--base-model', default='ru_core_news_lg')
+    parser.add_argument('--output', default='nlp_model')
+    parser.add_argument('--seed', type=int, default=0, help='Зерно разбиения и перемешивания')
+    parser.add_argument('--convert', action='store_true',
+                        help='Пересоздать корпус DocBin, даже если он уже есть')
+    parser.add_argument('--slim-output', default=None,
+                        help='Папка облегченной модели только для NER')
+    parser.add_argument('--vector-rows', type=int, default=SLIM_VECTOR_ROWS,
+                        help='Строк векторов в облегченной модели, если они нужны NER')
+    parser.add_argument('--export-only', action='store_true',
+                        help='Не обучать, а только экспортировать модель --output в --slim-output')
+    args = parser.parse_args()
+
+    if args.export_only:
+        if args.slim_output is None:
+            parser.error('--export-only требует --slim-output')
+        print(export_slim_model(args.output, args.slim_output, args.vector_rows))
+        return
+
+    nlp = spacy.load(args.base_model)
+
+    # Разметка токенизируется и разделяется на наборы один раз
+    if args.convert or not os.path.exists(os.path.join(args.corpus, 'labels.json')):
+        counts = convert_to_docbin(nlp, args.data, args.corpus, seed=args.seed)
+        print(
+            f"Corpus {args.corpus}: train {counts['train']}, dev {counts['dev']}, "
+            f"test {counts['test']}, dropped entities {counts['dropped_entities']}"
+        )
+    with open(os.path.join(args.corpus, 'labels.json'), 'r', encoding='utf-8') as labels_file:
+        labels = json.load(labels_file)
+
+    train_corpus = DocBinCorpus(os.path.join(args.corpus, 'train'), shuffle=True, seed=args.seed)
+    validate_corpus = DocBinCorpus(os.path.join(args.corpus, 'dev'))
+    test_corpus = DocBinCorpus(os.path.join(args.corpus, 'test'))
+
     # Настройка и обучение модели
-    setup_ner_pipe(nlp, data)
-    initial_validate_loss = evaluate_model(nlp, validate_data)
-    print(f"Initial Validation loss: {initial_validate_loss}")
-    
-    train_model(nlp, train_data, validate_data)
-    
-    # Сохранение модели
-    nlp.to_disk('nlp_model')
+    setup_ner_labels(nlp, labels)
+    print("Initial validation scores:")
+    print_scores(evaluate_model(nlp, validate_corpus(nlp)))
+
+    best_scores = train_model(nlp, train_corpus, validate_corpus)
+    print("Best validation scores:")
+    print_scores(best_scores)
+    print("Test scores:")
+    print_scores(evaluate_model(nlp, test_corpus(nlp)))
+
+    # Сохранение модели с весами лучшей итерации
+    nlp.to_disk(args.output)
+    if args.slim_output is not None:
+        print(export_slim_model(args.output, args.slim_output, args.vector_rows))
 
 
 if __name__ == '__main__':
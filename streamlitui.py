@@ -3,25 +3,179 @@ Streamlit UI для приложения SMART.HR.
 Позволяет загружать и анализировать вакансии и резюме.
 """
 
+import json
+import os
+import threading
+from collections import OrderedDict
+
 import streamlit as st
-from typing import List, Optional
+import numpy as np
+import pandas as pd
+import spacy
+from streamlit.runtime.uploaded_file_manager import UploadedFile
+from typing import Dict, List, Optional, Set, Tuple
+
+import instrumentation
+from entity_cache import text_hash
+from matrix_scoring import apply_weights, label_score_matrix
+from scoring_service import ScoringClient
+from similarity import TAG_WEIGHTS, entities_to_frame, extract_entities, get_nlp
+
+# Адрес сервиса оценки. Если задан, сущности извлекает общий процесс сервиса
+# и модель в процессе Streamlit не загружается
+SCORING_URL = os.environ.get('SMARTHR_SCORING_URL')
+
+# Количество файлов, сущности которых хранятся в памяти процесса
+MAX_ENTITY_ENTRIES = 10000
+
+
+@st.cache_resource(show_spinner='Загрузка модели...')
+def load_model() -> spacy.Language:
+    """
+    Загружает модель SpaCy один раз на процесс Streamlit.
+
+    Returns:
+        spacy.Language: Модель с компонентами NER.
+    """
+    return get_nlp()
+
+
+def read_uploadedfile(uploadedfile: UploadedFile) -> str:
+    """
+    Читает текст загруженного файла из памяти без сохранения на диск.
+
+    Args:
+        uploadedfile (UploadedFile): Загруженный файл через Streamlit.
+
+    Returns:
+        str: Текст файла.
+    """
+    return uploadedfile.getvalue().decode('utf-8')
 
-from similarity import (
-    get_entity_vacancy_UI,
-    get_entity_resume_UI,
-    calculate_avg_cosine_similarity
-)
 
+@st.cache_resource
+def entity_memo() -> Tuple['OrderedDict[str, Dict[str, Set[str]]]', threading.Lock]:
+    """
+    Возвращает общие для сессий процесса сущности файлов по хэшу содержимого
+    и блокировку для доступа к ним.
 
-def save_uploadedfile(uploadedfile: st.UploadedFile) -> None:
+    Returns:
+        Tuple[OrderedDict[str, Dict[str, Set[str]]], threading.Lock]: Сущности
+            в порядке последнего обращения и блокировка.
     """
-    Сохраняет загруженный файл в текущую директорию.
+    return OrderedDict(), threading.Lock()
+
+
+def get_files_entities(texts: Dict[str, str]) -> Dict[str, Dict[str, Set[str]]]:
+    """
+    Извлекает сущности файлов. Результаты запоминаются по хэшу содержимого,
+    поэтому каждый файл обрабатывается моделью один раз, а все еще не
+    обработанные файлы передаются в extract_entities одним пакетом.
 
     Args:
-        uploadedfile (st.UploadedFile): Загруженный файл через Streamlit.
+        texts (Dict[str, str]): Хэш содержимого и текст каждого файла.
+
+    Returns:
+        Dict[str, Dict[str, Set[str]]]: Хэш содержимого и словарь с метками
+            и множествами сущностей файла.
     """
-    with open(uploadedfile.name, "wb") as f:
-        f.write(uploadedfile.getbuffer())
+    memo, lock = entity_memo()
+    entities: Dict[str, Dict[str, Set[str]]] = {}
+    with lock:
+        for content_hash in texts:
+            if content_hash in memo:
+                memo.move_to_end(content_hash)
+                entities[content_hash] = memo[content_hash]
+    missing = [content_hash for content_hash in texts if content_hash not in entities]
+
+    if missing:
+        missing_texts = [texts[content_hash] for content_hash in missing]
+        with st.spinner('Извлечение сущностей...'):
+            if SCORING_URL:
+                parsed = ScoringClient(SCORING_URL).entities(missing_texts)
+            else:
+                load_model()
+                parsed = [dict(entity_text) for entity_text in extract_entities(missing_texts)]
+        entities.update(zip(missing, parsed))
+        with lock:
+            memo.update(zip(missing, parsed))
+            while len(memo) > MAX_ENTITY_ENTRIES:
+                memo.popitem(last=False)
+    return entities
+
+
+@st.cache_data(show_spinner=False, max_entries=100000)
+def get_file_label_scores(
+    vacancy_hash: str,
+    resume_hash: str,
+    _vacancy_entities: Dict[str, Set[str]],
+    _resume_entities: Dict[str, Set[str]]
+) -> np.ndarray:
+    """
+    Рассчитывает сходство резюме с вакансией по меткам вакансии без весов.
+    Результат запоминается по хэшам содержимого вакансии и резюме, поэтому
+    изменение весов не требует повторного расчета.
+
+    Args:
+        vacancy_hash (str): Хэш содержимого вакансии.
+        resume_hash (str): Хэш содержимого резюме.
+        _vacancy_entities (Dict[str, Set[str]]): Сущности вакансии.
+        _resume_entities (Dict[str, Set[str]]): Сущности резюме.
+
+    Returns:
+        np.ndarray: Сходство по меткам вакансии в порядке сортировки меток.
+    """
+    _, label_scores = label_score_matrix([_vacancy_entities], [_resume_entities])
+    return label_scores[0, 0]
+
+
+def label_weight_sliders(labels: List[str]) -> Dict[str, float]:
+    """
+    Показывает ползунки весов меток на боковой панели.
+
+    Args:
+        labels (List[str]): Метки вакансии.
+
+    Returns:
+        Dict[str, float]: Выбранные веса меток.
+    """
+    with st.sidebar.expander('Веса меток', expanded=False):
+        return {
+            label: st.slider(
+                label,
+                min_value=0.0,
+                max_value=3.0,
+                value=float(TAG_WEIGHTS.get(label, 1.0)),
+                step=0.1,
+                key=f'weight_{label}'
+            )
+            for label in labels
+        }
+
+
+def show_instrumentation_panel() -> None:
+    """
+    Показывает статистику этапов обработки, накопленную в процессе Streamlit.
+    """
+    with st.expander('Время этапов', expanded=True):
+        st.dataframe(
+            data=instrumentation.summary_frame(),
+            hide_index=True,
+            use_container_width=True
+        )
+        st.write(instrumentation.summary()['counters'])
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button('Сбросить статистику'):
+                instrumentation.reset()
+                st.rerun()
+        with col2:
+            st.download_button(
+                'Скачать JSON',
+                data=json.dumps(instrumentation.summary(), ensure_ascii=False, indent=2),
+                file_name='stages.json',
+                mime='application/json'
+            )
 
 
 def main() -> None:
@@ -31,6 +185,11 @@ def main() -> None:
     """
     st.title('SMART.HR')
 
+    if st.sidebar.checkbox('Измерять время этапов'):
+        instrumentation.enable()
+    else:
+        instrumentation.disable()
+
     vacancy_uploader = st.file_uploader(
         label='Загрузите вакансию',
         accept_multiple_files=False
@@ -41,13 +200,17 @@ def main() -> None:
     )
 
     resume_list: List[str] = []
+    resume_hashes: Dict[str, str] = {}
+    resume_texts: Dict[str, str] = {}
     resume_selector: Optional[str] = None
 
     if resume_uploader is not None:
         for resume in resume_uploader:
-            save_uploadedfile(resume)
+            resume_text = read_uploadedfile(resume)
             resume_list.append(resume.name)
-        
+            resume_texts[resume.name] = resume_text
+            resume_hashes[resume.name] = text_hash(resume_text)
+
         resume_selector = st.selectbox(
             'Выбор резюме',
             resume_list,
@@ -56,11 +219,31 @@ def main() -> None:
             label_visibility='collapsed'
         )
 
+    vacancy_hash: Optional[str] = None
+    vacancy_entities: Dict[str, Set[str]] = {}
+
+    # Сущности всех нужных на странице файлов извлекаются одним пакетом:
+    # выбранного резюме, вакансии и, для оценки, всех резюме
+    needed_texts: Dict[str, str] = {}
+    if vacancy_uploader is not None:
+        vacancy_text = read_uploadedfile(vacancy_uploader)
+        vacancy_hash = text_hash(vacancy_text)
+        needed_texts[vacancy_hash] = vacancy_text
+        if resume_uploader:
+            needed_texts.update(
+                (resume_hashes[resume_name], resume_texts[resume_name]) for resume_name in resume_list
+            )
+    if resume_selector is not None:
+        needed_texts[resume_hashes[resume_selector]] = resume_texts[resume_selector]
+    file_entities = get_files_entities(needed_texts)
+    if vacancy_hash is not None:
+        vacancy_entities = file_entities[vacancy_hash]
+
     col1, col2 = st.columns(2)
 
     with col2:
         if resume_selector is not None:
-            df_resume = get_entity_resume_UI(resume_selector)
+            df_resume = entities_to_frame(file_entities[resume_hashes[resume_selector]])
             st.write('Резюме')
             st.dataframe(
                 data=df_resume,
@@ -70,9 +253,8 @@ def main() -> None:
 
     with col1:
         if vacancy_uploader is not None:
-            save_uploadedfile(vacancy_uploader)
             st.write('Вакансия')
-            df_vacancy = get_entity_vacancy_UI(vacancy_uploader.name)
+            df_vacancy = entities_to_frame(vacancy_entities)
             st.dataframe(
                 data=df_vacancy,
                 hide_index=True,
@@ -80,16 +262,32 @@ def main() -> None:
             )
 
     if resume_uploader and vacancy_uploader is not None:
-        df_similarity = calculate_avg_cosine_similarity(
-            vacancy_uploader.name,
-            resume_list
-        )
+        labels = sorted(label for label, values in vacancy_entities.items() if values)
+        label_scores = np.array([
+            get_file_label_scores(
+                vacancy_hash,
+                resume_hashes[resume_name],
+                vacancy_entities,
+                file_entities[resume_hashes[resume_name]]
+            )
+            for resume_name in resume_list
+        ]).reshape(len(resume_list), len(labels))
+
+        # Изменение весов пересчитывает только свертку матрицы резюме×метки
+        similarity_list, weighted = apply_weights(label_scores, labels, label_weight_sliders(labels))
+        df_similarity = pd.concat([
+            pd.DataFrame({'Filename': resume_list, 'Similarity': similarity_list}),
+            pd.DataFrame(weighted, columns=labels)
+        ], axis=1).sort_values('Similarity', ascending=False, kind='stable')
         st.dataframe(
             data=df_similarity,
             hide_index=True,
             use_container_width=True
         )
 
+    if instrumentation.is_enabled():
+        show_instrumentation_panel()
+
 
 if __name__ == '__main__':
     main()
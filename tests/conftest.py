@@ -0,0 +1,29 @@
+"""
+Общие данные тестов: корень репозитория в sys.path и сущности документов
+без загрузки модели SpaCy.
+"""
+
+import os
+import sys
+from typing import Dict, List, Set, Tuple
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import generate_corpus, gold_entities  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def corpus_entities() -> Tuple[List[Dict[str, Set[str]]], List[Dict[str, Set[str]]]]:
+    """
+    Сущности синтетического корпуса по разметке генератора.
+
+    Returns:
+        Tuple[List[Dict[str, Set[str]]], List[Dict[str, Set[str]]]]: Сущности
+            2500 резюме и 3 вакансий; резюме по CoreSkills больше одного блока
+            matrix_scoring.RESUME_BLOCK_SIZE.
+    """
+    resumes, vacancies = generate_corpus(2500, 3, seed=1, filler_lines=0)
+    return [gold_entities(doc) for doc in resumes], [gold_entities(doc) for doc in vacancies]
@@ -0,0 +1,86 @@
+"""
+Матричная оценка: разбиение резюме на блоки не меняет результат, а
+повторное взвешивание сохраненного сходства совпадает с полным расчетом.
+"""
+
+import numpy as np
+from scipy import sparse
+
+import similarity
+from matrix_scoring import (
+    apply_weights,
+    label_score_matrix,
+    load_label_scores,
+    save_label_scores,
+    score_matrix
+)
+from similarity import (
+    TAG_WEIGHTS,
+    calculate_average_similarity,
+    calculate_cosine_similarity,
+    count_similarity_matrix,
+    vectorize_entities
+)
+
+
+def test_count_similarity_matrix_keeps_inputs() -> None:
+    # Индексы намеренно не отсортированы, как в выводе CountVectorizer
+    vacancy = sparse.csr_matrix((np.array([1, 2, 3]), np.array([2, 0, 1]), np.array([0, 3])), shape=(1, 3))
+    resume = sparse.csr_matrix((np.array([1, 1]), np.array([1, 0]), np.array([0, 2])), shape=(1, 3))
+    vacancy_before, resume_before = vacancy.copy(), resume.copy()
+
+    first = count_similarity_matrix(vacancy, resume)
+    second = count_similarity_matrix(vacancy, resume)
+
+    for matrix, before in ((vacancy, vacancy_before), (resume, resume_before)):
+        np.testing.assert_array_equal(matrix.indices, before.indices)
+        np.testing.assert_array_equal(matrix.data, before.data)
+    np.testing.assert_array_equal(first, second)
+
+
+def test_vectorize_entities_sorted() -> None:
+    counts = vectorize_entities(['python django rest', 'go python', 'django celery python redis'])
+    assert counts.has_sorted_indices
+
+
+def test_blocks_match_single_block(corpus_entities) -> None:
+    resumes, vacancies = corpus_entities
+    resumes = resumes[:600]
+    labels, single = label_score_matrix(vacancies, resumes, block_size=10 ** 9)
+    for block_size in (1, 97, 1000):
+        block_labels, blocked = label_score_matrix(vacancies, resumes, block_size=block_size)
+        assert block_labels == labels
+        np.testing.assert_array_equal(blocked, single)
+
+
+def test_score_matrix_matches_pairs(corpus_entities) -> None:
+    resumes, vacancies = corpus_entities
+    resumes = resumes[:300]
+    total, _ = score_matrix(vacancies, resumes, block_size=500)
+    expected = np.array([
+        [calculate_average_similarity(calculate_cosine_similarity(vacancy, resume)) for resume in resumes]
+        for vacancy in vacancies
+    ])
+    np.testing.assert_allclose(total, expected, rtol=0, atol=1e-12)
+
+
+def test_rerank_matches_recompute(corpus_entities, tmp_path, monkeypatch) -> None:
+    resumes, vacancies = corpus_entities
+    resumes = resumes[:300]
+    weights = {'CoreSkills': 2.0, 'Skill': 0.5, 'Age': 0.0, 'Speciality': 3.0}
+
+    labels, label_scores = label_score_matrix(vacancies, resumes, block_size=500)
+    npz_path = str(tmp_path / 'labels.npz')
+    save_label_scores(npz_path, ['v'] * len(vacancies), ['r'] * len(resumes), labels, label_scores)
+    _, _, saved_labels, saved_scores = load_label_scores(npz_path)
+    reranked, _ = apply_weights(saved_scores, saved_labels, weights)
+
+    recomputed, _ = score_matrix(vacancies, resumes, weights=weights, block_size=97)
+    np.testing.assert_allclose(reranked, recomputed, rtol=0, atol=1e-12)
+
+    monkeypatch.setattr(similarity, 'TAG_WEIGHTS', {**TAG_WEIGHTS, **weights})
+    expected = np.array([
+        [calculate_average_similarity(calculate_cosine_similarity(vacancy, resume)) for resume in resumes]
+        for vacancy in vacancies
+    ])
+    np.testing.assert_allclose(reranked, expected, rtol=0, atol=1e-12)
@@ -0,0 +1,35 @@
+"""
+Поиск по ResumeIndex совпадает с попарным расчетом сходства, когда
+кандидаты не помещаются в один блок матричной оценки.
+"""
+
+import heapq
+
+import pytest
+
+from matrix_scoring import RESUME_BLOCK_SIZE
+from resume_index import ResumeIndex
+from similarity import calculate_average_similarity, calculate_cosine_similarity
+
+
+def test_query_matches_brute_force(corpus_entities) -> None:
+    resumes, vacancies = corpus_entities
+    # Попарный расчет по всему корпусу медленный, поэтому сверяется одна вакансия
+    vacancy = vacancies[0]
+    assert sum(len(entities.get('CoreSkills', ())) for entities in resumes) > RESUME_BLOCK_SIZE
+
+    index = ResumeIndex()
+    for idx, entities in enumerate(resumes):
+        index.add(f'resume{idx}.txt', entities)
+
+    expected = {
+        f'resume{idx}.txt': calculate_average_similarity(calculate_cosine_similarity(vacancy, entities))
+        for idx, entities in enumerate(resumes)
+    }
+    found = index.query(vacancy, top_k=50)
+
+    assert len(found) == 50
+    for resume_id, score in found:
+        assert score == pytest.approx(expected[resume_id], abs=1e-12)
+    best = heapq.nlargest(50, expected.values())
+    assert [score for _, score in found] == pytest.approx(best, abs=1e-12)
@@ -0,0 +1,85 @@
+"""
+Сходство сущностей в similarity.py совпадает с прежним расчетом, в котором
+для каждой пары сущностей обучался отдельный TfidfVectorizer.
+"""
+
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Set
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from conftest import ROOT
+from similarity import TAG_WEIGHTS, calculate_cosine_similarity
+from skill_gazetteer import SkillMatcher, build_gazetteer
+
+DATA_DIR = os.path.join(ROOT, 'data_collector')
+ANNOTATIONS_PATH = os.path.join(ROOT, 'json_data', 'jsons', 'all_pythons.jsonl')
+
+
+def reference_cosine_similarity(
+    vacancy_entities: Dict[str, Set[str]],
+    resume_entities: Dict[str, Set[str]]
+) -> Dict[str, float]:
+    """
+    Прежний попарный расчет сходства из calculate_cosine_similarity.
+    Пара без терминов, на которой TfidfVectorizer падает, дает нулевое сходство.
+    """
+    similarity_dict = {}
+    for label, vacancy_entity_list in vacancy_entities.items():
+        resume_entity_list = resume_entities.get(label, [])
+        similarity_list = []
+        for vacancy_entity in vacancy_entity_list:
+            max_similarity = 0.0
+            for resume_entity in resume_entity_list:
+                try:
+                    tfidf_matrix = TfidfVectorizer().fit_transform([vacancy_entity, resume_entity])
+                except ValueError:
+                    continue
+                similarity = cosine_similarity(tfidf_matrix[0], tfidf_matrix[1])[0][0]
+                max_similarity = max(max_similarity, similarity)
+            similarity_list.append(max_similarity)
+        if similarity_list:
+            entity_similarity = sum(similarity_list) / len(similarity_list)
+            similarity_dict[label] = min(entity_similarity * TAG_WEIGHTS[label], 1.0)
+    return similarity_dict
+
+
+def sample_entities(text: str, matcher: SkillMatcher) -> Dict[str, Set[str]]:
+    """
+    Сущности образца без модели: навыки из словаря и строки текста как
+    длинные сущности с цифрами и знаками препинания.
+    """
+    entities = defaultdict(set, matcher.entities(matcher.nlp.make_doc(text)))
+    lines = [line.strip().lower() for line in text.splitlines() if line.strip()]
+    entities['Speciality'].update(lines[:5])
+    entities['WorkExperience'].update([line for line in lines if re.search(r'\d', line)][:10])
+    return entities
+
+
+@pytest.fixture(scope='module')
+def samples() -> List[Dict[str, Set[str]]]:
+    matcher = SkillMatcher(build_gazetteer(ANNOTATIONS_PATH))
+    paths = [os.path.join(DATA_DIR, 'vacancy.txt')] + sorted(
+        os.path.join(DATA_DIR, 'resume', name)
+        for name in os.listdir(os.path.join(DATA_DIR, 'resume'))
+    )
+    documents = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as text_file:
+            documents.append(sample_entities(text_file.read(), matcher))
+    return documents
+
+
+def test_matches_per_pair_tfidf(samples: List[Dict[str, Set[str]]]) -> None:
+    vacancy, *resumes = samples
+    pairs = [(vacancy, resume) for resume in resumes] + [(resume, vacancy) for resume in resumes]
+    for first, second in pairs:
+        expected = reference_cosine_similarity(first, second)
+        actual = calculate_cosine_similarity(first, second)
+        assert actual.keys() == expected.keys()
+        for label, value in expected.items():
+            assert actual[label] == pytest.approx(value, abs=1e-12)
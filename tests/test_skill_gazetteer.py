@@ -0,0 +1,48 @@
+"""
+Словарь навыков не содержит фраз с пробелами и знаками препинания по краям,
+которые попадают в разметку из-за ошибок границ сущностей.
+"""
+
+import json
+
+from skill_gazetteer import SkillMatcher, build_gazetteer, normalize_phrase
+
+
+def write_annotations(file_path: str, text: str, spans) -> None:
+    entities = [
+        {'start_offset': start, 'end_offset': end, 'label': label}
+        for start, end, label in spans
+    ]
+    with open(file_path, 'w', encoding='utf-8') as data_file:
+        data_file.write(json.dumps({'text': text, 'entities': entities}, ensure_ascii=False) + '\n')
+
+
+def test_normalize_phrase() -> None:
+    assert normalize_phrase(', Postgre') == 'postgre'
+    assert normalize_phrase(' «Docker», ') == 'docker'
+    assert normalize_phrase('python.') == 'python'
+    for skill in ('c++', 'c#', '.net', 'node.js'):
+        assert normalize_phrase(skill) == skill
+
+
+def test_build_gazetteer_strips_edges(tmp_path) -> None:
+    text = 'Навыки: python, postgre, c++; опыт .net.'
+    spans = [
+        (8, 15, 'CoreSkills'),    # 'python,'
+        (14, 23, 'CoreSkills'),   # ', postgre'
+        (16, 23, 'CoreSkills'),   # 'postgre'
+        (25, 29, 'CoreSkills'),   # 'c++;'
+        (25, 28, 'CoreSkills'),   # 'c++'
+        (35, 40, 'Skill'),        # '.net.'
+        (35, 39, 'Skill'),        # '.net'
+        (6, 7, 'Skill'),          # ':'
+        (6, 7, 'Skill')
+    ]
+    data_path = str(tmp_path / 'data.jsonl')
+    write_annotations(data_path, text, spans)
+
+    gazetteer = build_gazetteer(data_path, min_count=2)
+    assert gazetteer == {'c++': 'CoreSkills', 'postgre': 'CoreSkills', '.net': 'Skill'}
+
+    entities = SkillMatcher(gazetteer).pipe(['Работал с PostgreSQL и Postgre, знаю C++'])
+    assert next(entities) == {'CoreSkills': {'postgre', 'c++'}}